@@ -0,0 +1,325 @@
+# android2flutter/batch.py
+"""
+プロジェクト単位のバッチ変換。
+
+res/layout 以下の全レイアウトを 1 プロセスで変換する。
+values（ResourceResolver）と Java ソースは一度だけ読み込み、全画面で共有する。
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from . import log, metrics, profiler
+from .cache import ScreenCache, screen_key, sources_fingerprint
+from .parser import scan_budget
+from .parser.java_index import JavaIndex
+from .parser.resource_resolver import ResourceResolver
+from .parser.xml_parser import parse_layout_xml
+from .translator.generator import _dart_file_from_class, _gather_java_files, render_screen
+from .translator.shared_widgets import MIN_NODES, SHARED_FILE, SharedWidgets
+from .translator.sublayouts import LayoutLibrary
+from .translator.tokens import TOKENS_FILE, DesignTokens
+
+# レイアウト名の接頭辞のうち、クラス名から落とすもの（activity_login -> Login）
+_STRIP_LAYOUT_PREFIXES = ("activity_",)
+
+# =============================================================
+# Project discovery
+# =============================================================
+
+def locate_project_dirs(project_root: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Android プロジェクトのルートから (res ディレクトリ, java ソースルート) を探す。
+    例: <root>/app/src/main/res, <root>/app/src/main/java
+    """
+    candidates = [
+        os.path.join(project_root, "app", "src", "main"),
+        os.path.join(project_root, "src", "main"),
+        project_root,
+    ]
+    for base in candidates:
+        res_dir = os.path.join(base, "res")
+        if os.path.isdir(os.path.join(res_dir, "layout")):
+            java_dir = os.path.join(base, "java")
+            return res_dir, (java_dir if os.path.isdir(java_dir) else None)
+
+    # 標準構成でなければ res/layout を持つ最初のディレクトリを採用
+    for root, dirs, _ in os.walk(project_root):
+        dirs.sort()
+        if os.path.basename(root) == "res" and "layout" in dirs:
+            java_dir = os.path.join(os.path.dirname(root), "java")
+            return root, (java_dir if os.path.isdir(java_dir) else None)
+    return None, None
+
+def discover_layouts(res_dir: str) -> List[str]:
+    """res/layout/*.xml を名前順で返す（layout-land 等の修飾付きディレクトリは対象外）"""
+    layout_dir = os.path.join(res_dir, "layout")
+    if not os.path.isdir(layout_dir):
+        return []
+    return [
+        os.path.join(layout_dir, fn)
+        for fn in sorted(os.listdir(layout_dir))
+        if fn.endswith(".xml")
+    ]
+
+def layout_name_of(xml_path: str) -> str:
+    """res/layout/activity_login.xml -> activity_login（R.layout.* の名前）"""
+    return os.path.splitext(os.path.basename(xml_path))[0]
+
+def class_name_for_layout(layout_path: str, class_prefix: str = "Converted") -> str:
+    """
+    レイアウトファイル名 → 出力クラス名
+      activity_login.xml  -> ConvertedLogin
+      fragment_profile.xml -> ConvertedFragmentProfile
+    Java 側の XxxActivity → {prefix}Xxx の遷移先命名と揃える。
+    """
+    name = layout_name_of(layout_path)
+    for pre in _STRIP_LAYOUT_PREFIXES:
+        if name.startswith(pre) and len(name) > len(pre):
+            name = name[len(pre):]
+            break
+    pascal = "".join(p[:1].upper() + p[1:] for p in name.replace("-", "_").split("_") if p)
+    return f"{class_prefix}{pascal}"
+
+def plan_screens(res_dir: str, out_dir: str, class_prefix: str = "Converted") -> List[Tuple[str, str, str]]:
+    """[(xml_path, output_path, class_name)] を作る"""
+    plan: List[Tuple[str, str, str]] = []
+    for xml_path in discover_layouts(res_dir):
+        cls = class_name_for_layout(xml_path, class_prefix)
+        plan.append((xml_path, os.path.join(out_dir, _dart_file_from_class(cls)), cls))
+    return plan
+
+def screen_class_files(plan: List[Tuple[str, str, str]]) -> Dict[str, str]:
+    """画面クラス → 出力 Dart ファイル名（遷移先 import 用。実行ごとに 1 度だけ作る）"""
+    return {cls: os.path.basename(out_path) for (_, out_path, cls) in plan}
+
+# =============================================================
+# Batch run
+# =============================================================
+
+# 全画面で共有する入力（resolver / java_sources / java_index / java_root / class_files / tokens / layouts / shared /
+# scan_budget）。
+# layouts だけは変換済みレイアウトのキャッシュとして書き足される（ワーカー内で閉じる）。
+# 並列実行時は fork で継承させるか、initializer でワーカーごとに 1 度だけ渡す（タスク毎には送らない）。
+_SHARED: Dict = {}
+
+def _init_worker(shared: Dict) -> None:
+    _SHARED.clear()
+    _SHARED.update(shared)
+    # spawn のワーカーは親のプロファイラ・カウンタ・ログレベルを引き継がないので作り直す
+    # （fork なら引き継いだものをそのまま使う）
+    if shared.get("profile") is not None and profiler.active() is None:
+        profiler.enable(trace_memory=shared["profile"])
+    if shared.get("metrics") and metrics.active() is None:
+        metrics.enable()
+    if "log_level" in shared:
+        log.set_level(shared["log_level"])
+    # --scan-budget もモジュール変数なので spawn のワーカーでは設定し直す
+    if "scan_budget" in shared:
+        scan_budget.set_default_budget(shared["scan_budget"])
+
+Result = Tuple[str, Optional[str], List[str], Optional[Dict], Optional[Dict], List[Tuple[str, str]]]
+
+def _convert_one(task: Tuple[str, str, str]) -> Result:
+    """
+    1 画面を変換する（直列・並列共通）。
+    return: (xml_path, error or None, 依存する他のレイアウト XML,
+             --profile 時はこの画面の計測結果, --metrics 時はこの画面のカウンタ,
+             この画面の変換中に走査予算で打ち切った Java [(path or label, reason)])
+    """
+    xml_path, out_path, cls = task
+    name = layout_name_of(xml_path)
+    index = _SHARED.get("java_index")
+    skipped_before = len(index.skipped) if index is not None else 0
+    with profiler.screen(name), metrics.screen(name):
+        xml_path, err, deps = _convert_screen(xml_path, out_path, cls)
+    prof = profiler.active()
+    counters = metrics.active()
+    return (xml_path, err, deps, (prof.screen_record(name) if prof is not None else None),
+            (counters.screen_record(name) if counters is not None else None),
+            list(index.skipped[skipped_before:]) if index is not None else [])
+
+def _convert_screen(xml_path: str, out_path: str, cls: str) -> Tuple[str, Optional[str], List[str]]:
+    resolver = _SHARED.get("resolver")
+    try:
+        ir, _ = parse_layout_xml(xml_path, resolver=resolver)
+        deps = render_screen(
+            ir=ir,
+            resolver=resolver,
+            logic_map={},
+            java_path=_SHARED.get("java_root"),
+            output_path=out_path,
+            class_name=cls,
+            java_sources=_SHARED.get("java_sources"),
+            java_index=_SHARED.get("java_index"),
+            layout_name=layout_name_of(xml_path),
+            class_files=_SHARED.get("class_files"),
+            tokens=_SHARED.get("tokens"),
+            layouts=_SHARED.get("layouts"),
+            shared=_SHARED.get("shared"),
+        )
+        return xml_path, None, deps
+    except Exception as e:
+        log.error(f"{xml_path}: {e}")
+        return xml_path, str(e), []
+
+def _run_parallel(plan: List[Tuple[str, str, str]], shared: Dict, jobs: int) -> List[Result]:
+    if "fork" in multiprocessing.get_all_start_methods():
+        # fork: 親の _SHARED をそのまま継承（pickle 不要）
+        _init_worker(shared)
+        pool = ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("fork"))
+    else:
+        pool = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(shared,))
+    # map は入力順で結果を返すので、集計・出力順は直列実行と同一になる
+    chunksize = max(1, len(plan) // (jobs * 4))
+    with pool:
+        return list(pool.map(_convert_one, plan, chunksize=chunksize))
+
+def run_batch(res_dir: str, out_dir: str, java_root: Optional[str] = None,
+              values_dir: Optional[str] = None, class_prefix: str = "Converted",
+              jobs: int = 1, cache: Optional[ScreenCache] = None,
+              res_config: Tuple[str, ...] = (), share_min_nodes: int = MIN_NODES) -> Dict:
+    """
+    全レイアウトを変換し、集計結果を返す。
+    jobs: 2 以上なら ProcessPoolExecutor で画面単位に並列化
+    cache: 指定時は入力ハッシュが前回と同じ画面を丸ごとスキップ（None ならキャッシュ無効）。
+           values* のパース結果も同じディレクトリに保存して再利用する
+    res_config: リソースの構成修飾子（('ja', 'night') 等）
+    share_min_nodes: 複数のレイアウトに現れる、これ以上のビュー数の部分木を shared_widgets.dart に
+                     まとめる（0 なら共有しない）
+    return: {"screens", "ok", "cached", "failed": [(xml_path, error)], "elapsed", "throughput"}
+    """
+    started = time.perf_counter()
+
+    values_dir = values_dir or os.path.join(res_dir, "values")
+    with profiler.phase("resource_load"):
+        resolver = ResourceResolver(values_dir if os.path.isdir(values_dir) else None, config=res_config,
+                                    cache_dir=cache.cache_dir if cache is not None else None)
+
+    java_sources: Optional[List[str]] = None
+    java_index: Optional[JavaIndex] = None
+    if java_root and os.path.exists(java_root):
+        with profiler.phase("java_gather"):
+            java_files = _gather_java_files(java_root)
+            java_sources = [src for (_, src) in java_files]
+        with profiler.phase("java_index"):
+            java_index = JavaIndex.build(java_sources, [p for (p, _) in java_files])
+    log.info(f"Shared inputs loaded: values={values_dir}, java files={len(java_sources or [])}")
+
+    plan = plan_screens(res_dir, out_dir, class_prefix)
+    class_files = screen_class_files(plan)
+    # 色・寸法・文字列・テキストスタイルは tokens.dart に 1 度だけ書き、各画面はそれを参照する
+    with profiler.phase("tokens"):
+        tokens = DesignTokens.from_resolver(resolver)
+        if TOKENS_FILE in class_files.values():
+            log.warn(f"A screen is generated as {TOKENS_FILE}; design tokens are not used in this run")
+            tokens = None
+        else:
+            tokens.write(out_dir)
+    # 同じ形で繰り返される部分木は shared_widgets.dart に 1 度だけ書き、各画面はそれを参照する
+    shared_widgets: Optional[SharedWidgets] = None
+    if share_min_nodes > 0:
+        if SHARED_FILE in class_files.values():
+            log.warn(f"A screen is generated as {SHARED_FILE}; shared widgets are not used in this run")
+        else:
+            with profiler.phase("shared_scan"):
+                shared_widgets = SharedWidgets.scan(
+                    discover_layouts(res_dir), resolver, min_nodes=share_min_nodes,
+                    cache_dir=cache.cache_dir if cache is not None else None,
+                )
+                if shared_widgets.names:
+                    shared_widgets.write(out_dir, tokens)
+    # item / include 先のレイアウトは実行中 1 度だけ変換し、使う画面すべてで共有する（並列時はワーカーごと）
+    layouts = LayoutLibrary(os.path.join(res_dir, "layout"), resolver, tokens, java_index, shared_widgets)
+    shared = {"resolver": resolver, "java_sources": java_sources, "java_index": java_index,
+              "java_root": java_root, "class_files": class_files, "tokens": tokens, "layouts": layouts,
+              "shared": shared_widgets}
+    prof = profiler.active()
+    if prof is not None:
+        shared["profile"] = prof.trace_memory
+    counters = metrics.active()
+    shared["metrics"] = counters is not None
+    shared["log_level"] = log.level()
+    shared["scan_budget"] = scan_budget.DEFAULT_FILE_BUDGET
+
+    # ---- キャッシュ判定（親プロセスでのみ行い、manifest の書き込み競合を避ける）----
+    keys: Dict[str, Optional[str]] = {}
+    todo = plan
+    if cache is not None:
+        values_fp = resolver.fingerprint()
+        all_java_fp = sources_fingerprint(java_sources)
+        # 画面の増減で遷移先 import が変わるので、クラス → ファイル表もキーに含める。
+        # 共有する部分木の集合が変わると置き換わる位置も変わるので、それも含める。
+        # --scan-budget が変わると打ち切られる Java も変わるので、予算も含める
+        screens_fp = sources_fingerprint(
+            [f"{c}={f}" for c, f in sorted(class_files.items())]
+            + [shared_widgets.fingerprint() if shared_widgets is not None else "no-shared"]
+            + [f"scan_budget={scan_budget.DEFAULT_FILE_BUDGET}"]
+        )
+        todo = []
+        for task in plan:
+            xml_path, out_path, cls = task
+            # 画面が実際に読む Java（inflate しているクラス + 参照先）だけをキーに含める
+            related = java_index.related_sources(layout_name_of(xml_path)) if java_index else None
+            java_fp = all_java_fp if related is None else sources_fingerprint(
+                [java_index.paths[i] or "" for i in related] + [java_sources[i] for i in related]
+            )
+            keys[out_path] = screen_key(xml_path, cls, out_path, values_fp, java_fp, screens_fp)
+            if cache.is_fresh(out_path, keys[out_path]):
+                log.info(f"up to date: {out_path}", tag="CACHE")
+            else:
+                todo.append(task)
+
+    jobs = max(1, min(jobs or 1, len(todo) or 1))
+    if jobs > 1:
+        log.info(f"Converting {len(todo)} screens with {jobs} worker processes")
+        results = _run_parallel(todo, shared, jobs)
+    else:
+        _init_worker(shared)
+        results = [_convert_one(task) for task in todo]
+
+    failed = [(path, err) for (path, err, _, _, _, _) in results if err is not None]
+    # 並列実行時の画面ごとの計測・カウンタ・打ち切りはワーカー側にあるので、結果と一緒に受け取ったものを取り込む
+    for (path, _, _, record, counted, skipped) in results:
+        if prof is not None and record is not None:
+            prof.merge_screen(layout_name_of(path), record)
+        if counters is not None and counted is not None:
+            counters.merge_screen(layout_name_of(path), counted)
+        if jobs > 1 and java_index is not None:
+            java_index.skipped.extend(skipped)
+    if cache is not None:
+        for (xml_path, out_path, _), (_, err, deps, _, _, skipped) in zip(todo, results):
+            if err is not None:
+                continue
+            if skipped:
+                # 打ち切った走査の結果は残さず、次回もう一度変換する
+                log.info(f"not cached (Java scan truncated): {out_path}", tag="CACHE")
+                continue
+            cache.store(out_path, keys.get(out_path), deps)
+        cache.save()
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "screens": len(plan),
+        "ok": len(plan) - len(failed),
+        "cached": len(plan) - len(todo),
+        "failed": failed,
+        "skipped_java": list(java_index.skipped) if java_index else [],
+        "elapsed": elapsed,
+        "throughput": (len(plan) / elapsed) if elapsed > 0 else 0.0,
+    }
+    print_summary(summary)
+    return summary
+
+def print_summary(summary: Dict) -> None:
+    print(
+        f"[SUMMARY] screens={summary['screens']} ok={summary['ok']} cached={summary.get('cached', 0)} "
+        f"failed={len(summary['failed'])} "
+        f"elapsed={summary['elapsed']:.2f}s throughput={summary['throughput']:.1f} screens/sec"
+    )
+    for (path, err) in summary["failed"]:
+        log.error(f"{path}: {err}", tag="FAILED")
+    for (path, reason) in summary.get("skipped_java", []):
+        log.warn(f"{path}: {reason}", tag="SKIPPED")
@@ -0,0 +1,10 @@
+// grow: case x
+// コロンの無い case の連続（case ラベルのパターンが走り直さないこと）
+class CaseRun implements View.OnClickListener {
+    public void onClick(View v) {
+        switch (v.getId()) {
+            @GROW@
+            case R.id.btn: go(); break;
+        }
+    }
+}
@@ -0,0 +1,3 @@
+// grow: class Foo extends Bar
+// 本体の無い class 宣言の連続
+@GROW@;
@@ -0,0 +1,7 @@
+// grow: { if (a) (
+// 対応の取れない深い入れ子
+class Deep {
+    void onClick(View v) {
+        @GROW@
+    }
+}
@@ -0,0 +1,7 @@
+// grow: .child(0)
+// 長いチェーンの末尾でリスナー登録
+class LongChainListener {
+    void run() {
+        root@GROW@.setOnClickListener(v -> { doIt(); });
+    }
+}
@@ -0,0 +1,8 @@
+// grow: .get(i)
+// 長いメソッドチェーンの後に setOnClickListener が来ない（旧 TARGET パターンが二乗で後戻りした形）
+class LongChain {
+    void run() {
+        Object o = builder@GROW@ ;
+        o.toString();
+    }
+}
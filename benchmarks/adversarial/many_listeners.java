@@ -0,0 +1,22 @@
+// 通常形のリスナー登録をファイル丸ごと繰り返す（件数に対して線形であること）
+class ManyListeners extends AppCompatActivity implements View.OnClickListener {
+    void onCreate(Bundle b) {
+        setContentView(R.layout.activity_many);
+        Button a = findViewById(R.id.btnA);
+        Button c = a;
+        a.setOnClickListener(v -> { startActivity(new Intent(this, NextActivity.class)); });
+        c.setOnClickListener(v -> open());
+        findViewById(R.id.btnB).setOnClickListener(this::open);
+        ((Button) findViewById(R.id.btnC)).setOnClickListener(this);
+        binding.btnD.setOnClickListener(new View.OnClickListener() {
+            @Override
+            public void onClick(View v) { if (ok) { done(); } }
+        });
+    }
+    public void onClick(View v) {
+        switch (v.getId()) {
+            case R.id.btnC: go(); break;
+        }
+    }
+    private void open() { /* } */ String s = "}"; }
+}
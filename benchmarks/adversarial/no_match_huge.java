@@ -0,0 +1,3 @@
+// マッチするものが何も無い大きなファイル（全パターンが素通りで線形であること）
+final int[] table = new int[] {1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16};
+final String label = "plain string with words and no listeners";
@@ -0,0 +1,6 @@
+// grow: /* open comment without close
+// 閉じないブロックコメントが大量に続く
+class Unterminated {
+    void a() { }
+}
+@GROW@
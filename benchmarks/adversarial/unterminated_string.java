@@ -0,0 +1,5 @@
+// grow: String s = "never closed \\ \n
+// 閉じない文字列リテラルとエスケープの連続
+class UnterminatedString {
+@GROW@
+}
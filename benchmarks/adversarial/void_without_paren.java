@@ -0,0 +1,5 @@
+// grow: void m(
+// 閉じ括弧の無いメソッド宣言もどきの連続
+class VoidRun {
+@GROW@
+}
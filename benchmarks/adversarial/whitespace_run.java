@@ -0,0 +1,6 @@
+// grow: ' '
+// 長い空白の連続（\s+void のような先頭 \s+ は開始位置ごとに走り直して二乗になる）
+class WhitespaceRun {
+    int x =@GROW@1;
+    void@GROW@tail() { }
+}
@@ -0,0 +1,200 @@
+# android2flutter/benchmarks/pipeline.py
+"""
+変換パイプラインのベンチマーク（合成プロジェクト上で各段の所要時間を測り、基準値と比較する）。
+
+シナリオごとに benchmarks/synthetic.py でプロジェクトを作り、次の段を REPEATS 回ずつ測って最良値を取る:
+  parse_layout_xml                   全レイアウトの XML → IR
+  extract_click_handlers_from_java   全 Java ファイルのハンドラ抽出
+  translate_node                     全 IR → Widget 木
+  render_screen                      1 画面の生成（Java 解析・変換・整形・書き込み）を全画面分
+  run_batch                          バッチ変換全体（キャッシュなし）
+
+結果は JSON（--json）に書き、--baseline の JSON と段ごとに比べて
+（今回 / 基準）が 1 + --threshold を超えたら失敗とする（MIN_SIGNAL 未満の段は判定しない）。
+基準値はマシンに依存するので、同じマシンで --save-baseline して使う（リポジトリには置かない）。
+--baseline を指定しなければ benchmarks/baseline.json があるときだけ比べ、
+指定したのにファイルが無ければ比較できないので失敗とする。
+
+  python -m android2flutter.benchmarks.pipeline [--scenario small] [--json out.json]
+      [--baseline benchmarks/baseline.json] [--save-baseline benchmarks/baseline.json] [--threshold 0.25]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..batch import run_batch
+from ..parser.java_index import JavaIndex
+from ..parser.resource_resolver import ResourceResolver
+from ..parser.xml_parser import parse_layout_xml
+from ..translator.generator import extract_click_handlers_from_java, render_screen
+from ..translator.layout_rules import translate_node
+from ..translator.sublayouts import LayoutLibrary
+from .synthetic import SyntheticSpec, generate_project
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+REPEATS = 3
+MIN_SIGNAL = 0.005   # これより速い段は（秒）ノイズとみなして判定しない
+
+SCENARIOS: Dict[str, SyntheticSpec] = {
+    "small": SyntheticSpec(layouts=20, views=30, depth=3, java_files=20, values=50),
+    "deep": SyntheticSpec(layouts=10, views=200, depth=12, java_files=10, values=50),
+    "wide": SyntheticSpec(layouts=200, views=40, depth=3, java_files=200, values=500),
+    "lambda_only": SyntheticSpec(layouts=40, views=40, depth=4, java_files=40, listener_styles=("lambda",)),
+    "switch_only": SyntheticSpec(layouts=40, views=40, depth=4, java_files=40, listener_styles=("switch",)),
+}
+
+def _best_time(fn: Callable[[], object], repeats: int = REPEATS) -> float:
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()  # 1 回目は正規表現のコンパイルやキャッシュの準備を含むので捨てる
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def _stages(spec: SyntheticSpec, work_dir: str) -> Tuple[Dict[str, Tuple[Callable[[], object], int]], Dict]:
+    """{段の名前: (測る関数, 処理単位の数)} と、プロジェクトの規模"""
+    proj = generate_project(os.path.join(work_dir, "project"), spec)
+    out_dir = os.path.join(work_dir, "out")
+    with contextlib.redirect_stdout(io.StringIO()):
+        resolver = ResourceResolver(proj.values_dir)
+        irs = [parse_layout_xml(p, resolver=resolver)[0] for p in proj.layouts]
+        sources = []
+        for p in proj.java_files:
+            with open(p, "r", encoding="utf-8") as f:
+                sources.append(f.read())
+        index = JavaIndex.build(sources, list(proj.java_files))
+    names = [os.path.splitext(os.path.basename(p))[0] for p in proj.layouts]
+
+    def parse_all():
+        for p in proj.layouts:
+            parse_layout_xml(p, resolver=resolver)
+
+    def handlers_all():
+        for sid, src in enumerate(sources):
+            extract_click_handlers_from_java(src, "Converted", index=index, source_id=sid)
+
+    def translate_all():
+        for ir in irs:
+            translate_node(ir, resolver)
+
+    def render_all():
+        layouts = LayoutLibrary(proj.layout_dir, resolver, java_index=index)
+        for ir, name in zip(irs, names):
+            render_screen(ir, resolver, {}, proj.java_root, os.path.join(out_dir, f"{name}.dart"),
+                          f"Bench{name.title().replace('_', '')}", java_sources=sources, java_index=index,
+                          layout_name=name, layouts=layouts)
+
+    def batch():
+        run_batch(proj.res_dir, os.path.join(work_dir, "batch_out"), java_root=proj.java_root)
+
+    n_views = sum(1 for p in proj.layouts for line in open(p, encoding="utf-8") if line.lstrip().startswith("<")
+                  and not line.lstrip().startswith(("</", "<?")))
+    size = {"layouts": len(proj.layouts), "views": n_views, "java_files": len(proj.java_files),
+            "java_bytes": sum(len(s) for s in sources)}
+    stages = {
+        "parse_layout_xml": (parse_all, len(proj.layouts)),
+        "extract_click_handlers_from_java": (handlers_all, len(sources)),
+        "translate_node": (translate_all, len(irs)),
+        "render_screen": (render_all, len(irs)),
+        "run_batch": (batch, len(irs)),
+    }
+    return stages, size
+
+def run(scenarios: List[str], repeats: int = REPEATS) -> Dict:
+    results: Dict[str, Dict] = {}
+    for name in scenarios:
+        spec = SCENARIOS[name]
+        with tempfile.TemporaryDirectory(prefix=f"a2f-bench-{name}-") as work_dir:
+            stages, size = _stages(spec, work_dir)
+            timings = {}
+            for stage, (fn, units) in stages.items():
+                sec = _best_time(fn, repeats)
+                timings[stage] = {"seconds": sec, "units": units,
+                                  "us_per_unit": (sec / units * 1e6) if units else 0.0}
+                print(f"[BENCH] {name:<12} {stage:<34} {sec * 1000:9.2f} ms  ({units} units)")
+        results[name] = {"spec": spec.as_dict(), "size": size, "stages": timings}
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeats": repeats,
+        "scenarios": results,
+    }
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> Tuple[List[Dict], bool]:
+    """段ごとに 今回 / 基準 を出す。基準に無いシナリオ・段は比較しない"""
+    rows: List[Dict] = []
+    ok = True
+    for name, cur in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        if base.get("spec") != cur["spec"]:
+            print(f"[WARN] Scenario {name} differs from the baseline's spec; not compared")
+            continue
+        for stage, t in cur["stages"].items():
+            b = base["stages"].get(stage)
+            if b is None:
+                continue
+            ratio = t["seconds"] / max(b["seconds"], 1e-9)
+            measured = max(t["seconds"], b["seconds"]) >= MIN_SIGNAL
+            passed = (not measured) or ratio <= 1.0 + threshold
+            ok = ok and passed
+            rows.append({"scenario": name, "stage": stage, "baseline": b["seconds"], "current": t["seconds"],
+                         "ratio": round(ratio, 3), "measured": measured, "passed": passed})
+    return rows, ok
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark the conversion pipeline on synthetic Android projects.")
+    ap.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                    help="Scenario to run (repeatable; default: all)")
+    ap.add_argument("--repeats", type=int, default=REPEATS, help="Runs per stage; the best time is kept")
+    ap.add_argument("--json", help="Write results as JSON to this path")
+    ap.add_argument("--baseline",
+                    help="Baseline JSON to compare against; fails when the file does not exist "
+                         "(default: benchmarks/baseline.json if present, otherwise no comparison)")
+    ap.add_argument("--save-baseline", dest="save_baseline", metavar="PATH",
+                    help="Write this run's results as the new baseline")
+    ap.add_argument("--threshold", type=float, default=0.25,
+                    help="Fail when a stage is slower than baseline by more than this fraction (0.25 = 25%%)")
+    args = ap.parse_args(argv)
+    if args.baseline and not os.path.exists(args.baseline):
+        print(f"[ERROR] Baseline not found: {args.baseline} (create one with --save-baseline)")
+        return 2
+    baseline_path = args.baseline or (DEFAULT_BASELINE if os.path.exists(DEFAULT_BASELINE) else None)
+
+    current = run(args.scenario or list(SCENARIOS), max(1, args.repeats))
+    ok = True
+    if baseline_path:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows, ok = compare(current, baseline, args.threshold)
+        for r in rows:
+            flag = "ok  " if r["passed"] else "FAIL"
+            note = "" if r["measured"] else " (below noise floor)"
+            print(f"[{flag}] {r['scenario']:<12} {r['stage']:<34} {r['current'] * 1000:9.2f} ms  "
+                  f"x{r['ratio']:.2f} vs baseline{note}")
+        current["comparison"] = {"baseline": baseline_path, "threshold": args.threshold, "passed": ok, "rows": rows}
+        print("[SUMMARY] " + ("no regressions against baseline" if ok else "regression against baseline detected"))
+    else:
+        print(f"[INFO] No baseline at {DEFAULT_BASELINE}; nothing to compare")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=1)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({k: v for k, v in current.items() if k != "comparison"}, f, indent=1)
+        print(f"[DONE] Saved baseline: {args.save_baseline}")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
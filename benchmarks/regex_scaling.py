@@ -0,0 +1,135 @@
+# android2flutter/benchmarks/regex_scaling.py
+"""
+Java 走査パターンのスケーリング検査（敵対的入力コーパス）。
+
+benchmarks/adversarial/*.java の各入力を 1x, 2x, 4x, 8x に拡大して
+レキサ・索引・ハンドラ抽出と各パターン単体の所要時間を測り、
+log-log の傾き（時間の伸び / 入力の伸び）が閾値を超えたら失敗とする。
+
+コーパスの書式:
+  先頭行が "// grow: <断片>" のファイルは本文中の @GROW@ を断片の繰り返しで置き換える
+  （断片は '...' で囲めて、\\n 等のエスケープ可）。それ以外はファイル全体を繰り返す。
+
+  python -m android2flutter.benchmarks.regex_scaling [--json out.json] [--max-slope 1.5]
+"""
+import argparse
+import codecs
+import contextlib
+import io
+import json
+import math
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+from ..parser import java_index, java_lexer, listeners
+from ..parser.java_index import JavaIndex
+from ..parser.java_lexer import LexedSource
+from ..translator import generator
+from ..translator.generator import extract_click_handlers_from_java
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "adversarial")
+SCALES = (1, 2, 4, 8)
+BASE_CHARS = 40_000     # 1x のおおよその入力サイズ
+MIN_SIGNAL = 0.005      # 最大サイズでもこれより速ければ（秒）ノイズとみなして判定しない
+REPEATS = 3
+
+# 単体で測るパターン（ファイル全体に対して finditer するもの）
+PATTERNS = {
+    "lexer._TOKEN_RE": java_lexer._TOKEN_RE,
+    "lexer._CASE_LABEL_RE": java_lexer._CASE_LABEL_RE,
+    "index._SYMBOL_RE": java_index._SYMBOL_RE,
+    "listeners.CLICK.callback_re": listeners.CLICK.callback_re,
+    "generator._SWITCH_GETID_RE": generator._SWITCH_GETID_RE,
+    "generator._IF_GETID_RE": generator._IF_GETID_RE,
+}
+
+def load_corpus(corpus_dir: str = CORPUS_DIR) -> Dict[str, Callable[[int], str]]:
+    """{name: build(n) -> java_text}"""
+    corpus: Dict[str, Callable[[int], str]] = {}
+    for fn in sorted(os.listdir(corpus_dir)):
+        if not fn.endswith(".java"):
+            continue
+        with open(os.path.join(corpus_dir, fn), "r", encoding="utf-8") as f:
+            text = f.read()
+        first, _, rest = text.partition("\n")
+        if first.startswith("// grow:"):
+            frag = first[len("// grow:"):].strip()
+            if len(frag) >= 2 and frag[0] == frag[-1] == "'":
+                frag = frag[1:-1]
+            frag = codecs.decode(frag, "unicode_escape")
+            unit = max(1, len(frag))
+            base = max(1, BASE_CHARS // unit)
+            corpus[fn] = (lambda body, frag, base: lambda n: body.replace("@GROW@", frag * (base * n)))(rest, frag, base)
+        else:
+            base = max(1, BASE_CHARS // max(1, len(text)))
+            corpus[fn] = (lambda text, base: lambda n: text * (base * n))(text, base)
+    return corpus
+
+def _best_time(fn: Callable[[], object]) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def _stages(text: str) -> Dict[str, Callable[[], object]]:
+    def handlers():
+        with contextlib.redirect_stdout(io.StringIO()):
+            extract_click_handlers_from_java(text, "Converted")
+    stages: Dict[str, Callable[[], object]] = {
+        "LexedSource": lambda: LexedSource(text),
+        "JavaIndex.build": lambda: JavaIndex.build([text], budget=0),
+        "extract_click_handlers_from_java": handlers,
+    }
+    for name, pat in PATTERNS.items():
+        stages[name] = (lambda p: lambda: sum(1 for _ in p.finditer(text)))(pat)
+    return stages
+
+def _slope(sizes: List[int], times: List[float]) -> float:
+    t0, t1 = max(times[0], 1e-6), max(times[-1], 1e-6)
+    return math.log(t1 / t0) / math.log(sizes[-1] / sizes[0])
+
+def run(max_slope: float = 1.5) -> Tuple[List[Dict], bool]:
+    results: List[Dict] = []
+    ok = True
+    for name, build in load_corpus().items():
+        inputs = [build(n) for n in SCALES]
+        sizes = [len(t) for t in inputs]
+        timings: Dict[str, List[float]] = {}
+        for text in inputs:
+            for stage, fn in _stages(text).items():
+                timings.setdefault(stage, []).append(_best_time(fn))
+        for stage, times in timings.items():
+            slope = _slope(sizes, times)
+            measured = times[-1] >= MIN_SIGNAL
+            passed = (not measured) or slope <= max_slope
+            ok = ok and passed
+            results.append({
+                "input": name, "stage": stage, "sizes": sizes, "seconds": times,
+                "slope": round(slope, 3), "measured": measured, "passed": passed,
+            })
+    return results, ok
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Check that Java extraction patterns scale linearly on adversarial inputs.")
+    ap.add_argument("--json", help="Write results as JSON to this path")
+    ap.add_argument("--max-slope", type=float, default=1.5,
+                    help="Fail when log(time)/log(size) between 1x and 8x exceeds this (1.0 = linear, 2.0 = quadratic)")
+    args = ap.parse_args(argv)
+
+    results, ok = run(args.max_slope)
+    for r in results:
+        flag = "ok  " if r["passed"] else "FAIL"
+        note = "" if r["measured"] else " (below noise floor)"
+        print(f"[{flag}] {r['input']:<30} {r['stage']:<34} {r['seconds'][-1] * 1000:8.2f} ms  slope={r['slope']:.2f}{note}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"max_slope": args.max_slope, "passed": ok, "results": results}, f, indent=1)
+    print("[SUMMARY] " + ("all extraction patterns scale linearly" if ok else "super-linear extraction detected"))
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
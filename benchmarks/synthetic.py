@@ -0,0 +1,239 @@
+# android2flutter/benchmarks/synthetic.py
+"""
+ベンチマーク用の合成 Android プロジェクト生成器（決定的: 同じ spec なら同じバイト列）。
+
+  <root>/app/src/main/res/layout/activity_screenNNN.xml   ネストした LinearLayout / FrameLayout と
+                                                           TextView / Button / EditText / ImageView
+  <root>/app/src/main/res/values/{colors,strings,dimens}.xml
+  <root>/app/src/main/java/com/bench/ScreenNNNActivity.java
+      setContentView + findViewById + setOnClickListener。リスナーの書き方は
+      lambda / anonymous（new View.OnClickListener）/ method_ref（this::onX）/ switch（switch (v.getId())）
+      を listener_styles から順番に使う
+
+  python -m android2flutter.benchmarks.synthetic OUT_DIR [--layouts 50] [--views 40] [--depth 4] ...
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+LISTENER_STYLES = ("lambda", "anonymous", "method_ref", "switch")
+
+class SyntheticSpec(NamedTuple):
+    layouts: int = 20                 # レイアウト（= 画面）の数
+    views: int = 30                   # 1 レイアウトあたりのビュー数（ViewGroup を含む）
+    depth: int = 3                    # ViewGroup の入れ子の深さ
+    java_files: int = 20              # Activity の数（layouts より少なければ残りの画面は Java なし）
+    listener_styles: Tuple[str, ...] = LISTENER_STYLES
+    values: int = 50                  # color / string / dimen それぞれの数
+    seed: int = 1
+
+    def as_dict(self) -> Dict:
+        d = self._asdict()
+        d["listener_styles"] = list(self.listener_styles)
+        return d
+
+class SyntheticProject(NamedTuple):
+    root: str
+    res_dir: str
+    layout_dir: str
+    values_dir: str
+    java_root: str
+    layouts: List[str]
+    java_files: List[str]
+
+_ANDROID = 'xmlns:android="http://schemas.android.com/apk/res/android"'
+_LEAVES = ("TextView", "Button", "EditText", "ImageView")
+_ID_PREFIX = {"TextView": "tv", "Button": "btn", "EditText": "et", "ImageView": "iv"}
+
+def _screen_name(i: int) -> str:
+    return f"screen{i:03d}"
+
+def _pascal(name: str) -> str:
+    return name[:1].upper() + name[1:]
+
+# =============================================================
+# res/values
+# =============================================================
+
+def _values_files(spec: SyntheticSpec, rnd: random.Random) -> Dict[str, str]:
+    colors = "\n".join(f'    <color name="c{i}">#FF{rnd.randrange(0x1000000):06X}</color>' for i in range(spec.values))
+    strings = "\n".join(f'    <string name="s{i}">Label {i}</string>' for i in range(spec.values))
+    dimens = "\n".join(f'    <dimen name="d{i}">{4 + i % 24}dp</dimen>' for i in range(spec.values))
+    wrap = '<?xml version="1.0" encoding="utf-8"?>\n<resources>\n{}\n</resources>\n'
+    return {"colors.xml": wrap.format(colors), "strings.xml": wrap.format(strings), "dimens.xml": wrap.format(dimens)}
+
+# =============================================================
+# res/layout
+# =============================================================
+
+def _leaf(kind: str, vid: str, spec: SyntheticSpec, rnd: random.Random) -> str:
+    v = max(1, spec.values)
+    if kind == "TextView":
+        return (f'<TextView android:id="@+id/{vid}" android:text="@string/s{rnd.randrange(v)}" '
+                f'android:textColor="@color/c{rnd.randrange(v)}" android:textSize="{12 + rnd.randrange(10)}sp"/>')
+    if kind == "Button":
+        return (f'<Button android:id="@+id/{vid}" android:text="@string/s{rnd.randrange(v)}" '
+                f'android:layout_marginBottom="@dimen/d{rnd.randrange(v)}"/>')
+    if kind == "EditText":
+        return (f'<EditText android:id="@+id/{vid}" android:hint="@string/s{rnd.randrange(v)}" '
+                f'android:layout_width="match_parent"/>')
+    return f'<ImageView android:id="@+id/{vid}" android:layout_width="48dp" android:layout_height="48dp"/>'
+
+def _layout_xml(spec: SyntheticSpec, rnd: random.Random) -> Tuple[str, List[str]]:
+    """return: (XML, ボタンの id 一覧)"""
+    counter = [0]
+    buttons: List[str] = []
+    budget = [max(1, spec.views) - 1]  # ルートの分を引く
+
+    def group(level: int, indent: str) -> List[str]:
+        lines: List[str] = []
+        while budget[0] > 0:
+            budget[0] -= 1
+            counter[0] += 1
+            # 浅いところほど ViewGroup を作りやすくする
+            if level < spec.depth and budget[0] > 2 and rnd.random() < 0.3:
+                tag = "LinearLayout" if rnd.random() < 0.7 else "FrameLayout"
+                orient = ' android:orientation="horizontal"' if rnd.random() < 0.4 else ' android:orientation="vertical"'
+                pad = f' android:padding="@dimen/d{rnd.randrange(max(1, spec.values))}"'
+                lines.append(f'{indent}<{tag}{orient if tag == "LinearLayout" else ""}{pad}>')
+                lines.extend(group(level + 1, indent + "    "))
+                lines.append(f"{indent}</{tag}>")
+            else:
+                kind = _LEAVES[rnd.randrange(len(_LEAVES))]
+                vid = f"{_ID_PREFIX[kind]}{counter[0]}"
+                if kind == "Button":
+                    buttons.append(vid)
+                lines.append(indent + _leaf(kind, vid, spec, rnd))
+            # 子の数はランダムに打ち切る（残りは親の兄弟に回る）
+            if level > 0 and rnd.random() < 0.25:
+                break
+        return lines
+
+    body = group(0, "    ")
+    xml = (f'<?xml version="1.0" encoding="utf-8"?>\n'
+           f'<LinearLayout {_ANDROID} android:orientation="vertical" '
+           f'android:layout_width="match_parent" android:layout_height="match_parent">\n'
+           + "\n".join(body) + "\n</LinearLayout>\n")
+    return xml, buttons
+
+# =============================================================
+# java
+# =============================================================
+
+def _click_body(i: int, spec: SyntheticSpec, rnd: random.Random, indent: str) -> str:
+    choice = rnd.randrange(3)
+    if choice == 0 and spec.java_files > 1:
+        target = _pascal(_screen_name(rnd.randrange(spec.java_files)))
+        return (f"{indent}Intent intent = new Intent({_pascal(_screen_name(i))}Activity.this, {target}Activity.class);\n"
+                f"{indent}startActivity(intent);")
+    if choice == 1:
+        return f'{indent}Toast.makeText(this, "Clicked {i}", Toast.LENGTH_SHORT).show();'
+    return f"{indent}finish();"
+
+def _java_source(i: int, buttons: List[str], spec: SyntheticSpec, rnd: random.Random) -> str:
+    name = _screen_name(i)
+    cls = f"{_pascal(name)}Activity"
+    styles = spec.listener_styles or LISTENER_STYLES
+    wiring, methods, switch_cases = [], [], []
+    for k, vid in enumerate(buttons):
+        style = styles[(i + k) % len(styles)]
+        var = f"b{k}"
+        wiring.append(f"        Button {var} = findViewById(R.id.{vid});")
+        if style == "lambda":
+            wiring.append(f"        {var}.setOnClickListener(v -> {{\n{_click_body(i, spec, rnd, ' ' * 12)}\n        }});")
+        elif style == "anonymous":
+            wiring.append(f"        {var}.setOnClickListener(new View.OnClickListener() {{\n"
+                          f"            @Override\n"
+                          f"            public void onClick(View v) {{\n{_click_body(i, spec, rnd, ' ' * 16)}\n"
+                          f"            }}\n"
+                          f"        }});")
+        elif style == "method_ref":
+            method = f"on{_pascal(vid)}Clicked"
+            wiring.append(f"        {var}.setOnClickListener(this::{method});")
+            methods.append(f"    private void {method}(View v) {{\n{_click_body(i, spec, rnd, ' ' * 8)}\n    }}")
+        else:  # switch
+            wiring.append(f"        {var}.setOnClickListener(this);")
+            switch_cases.append(f"            case R.id.{vid}:\n{_click_body(i, spec, rnd, ' ' * 16)}\n"
+                                f"                break;")
+    implements = " implements View.OnClickListener" if switch_cases else ""
+    if switch_cases:
+        methods.append("    @Override\n    public void onClick(View v) {\n        switch (v.getId()) {\n"
+                       + "\n".join(switch_cases) + "\n        }\n    }")
+    return (f"package com.bench;\n\n"
+            f"import android.content.Intent;\nimport android.os.Bundle;\nimport android.view.View;\n"
+            f"import android.widget.Button;\nimport android.widget.Toast;\n\n"
+            f"public class {cls} extends AppCompatActivity{implements} {{\n"
+            f"    @Override\n    protected void onCreate(Bundle savedInstanceState) {{\n"
+            f"        super.onCreate(savedInstanceState);\n"
+            f"        setContentView(R.layout.activity_{name});\n"
+            + "\n".join(wiring) + ("\n" if wiring else "")
+            + "    }\n"
+            + "".join(f"\n{m}\n" for m in methods)
+            + "}\n")
+
+# =============================================================
+# project
+# =============================================================
+
+def _write(path: str, text: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+def generate_project(root: str, spec: SyntheticSpec = SyntheticSpec()) -> SyntheticProject:
+    """root 以下に合成プロジェクトを作る（root は作り直す）"""
+    for style in spec.listener_styles:
+        if style not in LISTENER_STYLES:
+            raise ValueError(f"unknown listener style: {style} (expected one of {', '.join(LISTENER_STYLES)})")
+    if os.path.exists(root):
+        shutil.rmtree(root)
+    main = os.path.join(root, "app", "src", "main")
+    res_dir = os.path.join(main, "res")
+    layout_dir = os.path.join(res_dir, "layout")
+    values_dir = os.path.join(res_dir, "values")
+    java_root = os.path.join(main, "java")
+    java_dir = os.path.join(java_root, "com", "bench")
+    for d in (layout_dir, values_dir, java_dir):
+        os.makedirs(d, exist_ok=True)
+
+    rnd = random.Random(spec.seed)
+    for fn, text in _values_files(spec, rnd).items():
+        _write(os.path.join(values_dir, fn), text)
+
+    layouts, java_files = [], []
+    for i in range(spec.layouts):
+        name = _screen_name(i)
+        xml, buttons = _layout_xml(spec, rnd)
+        path = os.path.join(layout_dir, f"activity_{name}.xml")
+        _write(path, xml)
+        layouts.append(path)
+        if i < spec.java_files:
+            jpath = os.path.join(java_dir, f"{_pascal(name)}Activity.java")
+            _write(jpath, _java_source(i, buttons, spec, rnd))
+            java_files.append(jpath)
+    return SyntheticProject(root, res_dir, layout_dir, values_dir, java_root, layouts, java_files)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    d = SyntheticSpec()
+    ap = argparse.ArgumentParser(description="Generate a deterministic synthetic Android project for benchmarks.")
+    ap.add_argument("out", help="Project root to (re)create")
+    ap.add_argument("--layouts", type=int, default=d.layouts)
+    ap.add_argument("--views", type=int, default=d.views, help="Views per layout")
+    ap.add_argument("--depth", type=int, default=d.depth, help="Maximum ViewGroup nesting depth")
+    ap.add_argument("--java-files", dest="java_files", type=int, default=d.java_files)
+    ap.add_argument("--listener-styles", dest="listener_styles", default=",".join(d.listener_styles),
+                    help=f"Comma-separated subset of {','.join(LISTENER_STYLES)}")
+    ap.add_argument("--values", type=int, default=d.values, help="Number of colors / strings / dimens each")
+    ap.add_argument("--seed", type=int, default=d.seed)
+    args = ap.parse_args(argv)
+    spec = SyntheticSpec(args.layouts, args.views, args.depth, args.java_files,
+                         tuple(s.strip() for s in args.listener_styles.split(",") if s.strip()),
+                         args.values, args.seed)
+    proj = generate_project(args.out, spec)
+    print(f"[DONE] Generated {len(proj.layouts)} layouts and {len(proj.java_files)} Java files under {proj.root}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
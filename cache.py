@@ -0,0 +1,122 @@
+# android2flutter/cache.py
+"""
+画面単位のインクリメンタルキャッシュ（.a2f-cache/）。
+
+各画面のキーは render_screen が実際に使う入力のハッシュ:
+  生成器自身のソース / values（ResourceResolver の内容）/ Java ソース / 画面クラス一覧 /
+  レイアウト XML / クラス名 / 出力先
+キーが一致し、出力ファイルも前回書いた内容のままなら生成・書き込みともにスキップする。
+画面が変換中に読んだ他のレイアウト（リストの item レイアウト・<include> 先）は依存として記録し、その内容も照合する。
+"""
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+
+from . import log
+
+CACHE_DIR_NAME = ".a2f-cache"
+_MANIFEST = "screens.json"
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_generator_fp: Optional[str] = None
+
+def _sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def _sha256_file(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return _sha256_bytes(f.read())
+    except OSError:
+        return None
+
+def generator_fingerprint() -> str:
+    """生成器のバージョン = パッケージ内の .py / テンプレートの内容ハッシュ（プロセス内で 1 度だけ計算）"""
+    global _generator_fp
+    if _generator_fp is None:
+        h = hashlib.sha256()
+        for root, dirs, files in os.walk(_PACKAGE_DIR):
+            dirs[:] = sorted(d for d in dirs if not d.startswith(".") and d != "__pycache__")
+            for fn in sorted(files):
+                if fn.endswith((".py", ".j2")):
+                    p = os.path.join(root, fn)
+                    h.update(os.path.relpath(p, _PACKAGE_DIR).encode("utf-8"))
+                    h.update((_sha256_file(p) or "").encode("ascii"))
+        _generator_fp = h.hexdigest()
+    return _generator_fp
+
+def sources_fingerprint(sources: Optional[Iterable[str]]) -> str:
+    """Java ソース群のハッシュ（順序込み。None と空リストは区別する）"""
+    if sources is None:
+        return "none"
+    h = hashlib.sha256()
+    for src in sources:
+        h.update(_sha256_bytes(src.encode("utf-8")).encode("ascii"))
+    return h.hexdigest()
+
+def screen_key(xml_path: str, class_name: str, output_path: str,
+               values_fp: str, java_fp: str, screens_fp: str = "") -> Optional[str]:
+    xml_hash = _sha256_file(xml_path)
+    if xml_hash is None:
+        return None
+    h = hashlib.sha256()
+    for part in (generator_fingerprint(), values_fp, java_fp, screens_fp, xml_hash, class_name,
+                 os.path.abspath(output_path)):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+class ScreenCache:
+    """
+    cache_dir/screens.json に {出力パス: {"key", "output", "deps": {XML パス: ハッシュ}}} を保存する。
+    read=False（--rebuild）ならヒット判定をせず全画面を作り直し、結果だけ書き戻す。
+    """
+    def __init__(self, cache_dir: str, read: bool = True):
+        self.cache_dir = cache_dir
+        self.read = read
+        self.entries: Dict[str, Dict] = {}
+        self._dirty = False
+        path = os.path.join(cache_dir, _MANIFEST)
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except Exception as e:
+                log.warn(f"Ignoring unreadable cache manifest {path}: {e}")
+                self.entries = {}
+
+    def is_fresh(self, output_path: str, key: Optional[str]) -> bool:
+        if not self.read or key is None:
+            return False
+        entry = self.entries.get(os.path.abspath(output_path))
+        if not entry or entry.get("key") != key:
+            return False
+        # 依存レイアウトが変わった場合も作り直す
+        if any(_sha256_file(p) != h for p, h in entry.get("deps", {}).items()):
+            return False
+        # 出力が消された / 手で書き換えられた場合は作り直す
+        return _sha256_file(output_path) == entry.get("output")
+
+    def store(self, output_path: str, key: Optional[str], deps: Optional[List[str]] = None) -> None:
+        if key is None:
+            return
+        out_hash = _sha256_file(output_path)
+        if out_hash is None:
+            return
+        entry = {"key": key, "output": out_hash}
+        if deps:
+            entry["deps"] = {p: _sha256_file(p) for p in deps}
+        self.entries[os.path.abspath(output_path)] = entry
+        self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = os.path.join(self.cache_dir, _MANIFEST)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+        self._dirty = False
@@ -0,0 +1,46 @@
+# android2flutter/log.py
+"""
+レベル付きの診断ログ（--log-level）。
+
+既定は info。レベル未満の行は出さない（% 書式の引数は出力するときだけ書式化する）。
+引数の組み立て自体が重いもの（id の一覧等）は呼び出し側で if log.enabled(log.DEBUG): ... と囲む。
+  debug : ハンドラ / id の対応付けの詳細
+  info  : [INFO] / [CONFIG] / [DONE] / [CACHE] / [WATCH] の進捗（tag= で付け替える）
+  warn  : [WARN] / [SKIPPED]
+  error : [ERROR] / [FAILED]（常に出る）
+明示的に頼まれた報告（[SUMMARY] / [METRICS] / [PROFILE]）はレベルに関係なく print する。
+"""
+from typing import Dict
+
+DEBUG, INFO, WARN, ERROR = 10, 20, 30, 40
+LEVELS: Dict[str, int] = {"debug": DEBUG, "info": INFO, "warn": WARN, "error": ERROR}
+
+_level = INFO
+
+def set_level(level) -> None:
+    """level: "debug" / "info" / "warn" / "error" または数値"""
+    global _level
+    _level = LEVELS[level.lower()] if isinstance(level, str) else int(level)
+
+def level() -> int:
+    return _level
+
+def enabled(lv: int) -> bool:
+    return _level <= lv
+
+def _emit(lv: int, tag: str, msg: str, args) -> None:
+    if _level <= lv:
+        print(f"[{tag}] " + (msg % args if args else msg))
+
+def debug(msg: str, *args) -> None:
+    """debug("layout %r -> %d files", name, n)（書式化は出力するときだけ）"""
+    _emit(DEBUG, "DEBUG", msg, args)
+
+def info(msg: str, *args, tag: str = "INFO") -> None:
+    _emit(INFO, tag, msg, args)
+
+def warn(msg: str, *args, tag: str = "WARN") -> None:
+    _emit(WARN, tag, msg, args)
+
+def error(msg: str, *args, tag: str = "ERROR") -> None:
+    _emit(ERROR, tag, msg, args)
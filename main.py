@@ -1,44 +1,213 @@
 # android2flutter/main.py
 import argparse
+import cProfile
 import os
 import sys
 
+from . import log, metrics, profiler
+from .parser.resource_resolver import ResourceResolver
+from .parser.resource_table import parse_config
+from .parser.scan_budget import DEFAULT_FILE_BUDGET, set_default_budget
 from .parser.xml_parser import parse_layout_xml
 from .translator.generator import render_screen
+from .translator.shared_widgets import MIN_NODES
+from .translator.sublayouts import LayoutLibrary
+
+def _run_batch_mode(args, parser):
+    from .batch import locate_project_dirs, run_batch
+    from .cache import CACHE_DIR_NAME, ScreenCache
+
+    res_dir = args.res_root
+    java_root = args.java_root or args.java
+    if args.project:
+        found_res, found_java = locate_project_dirs(args.project)
+        res_dir = res_dir or found_res
+        java_root = java_root or found_java
+    if not res_dir or not os.path.isdir(res_dir):
+        parser.error("could not locate a res directory (use --res-root or --project)")
+    if not args.out_dir:
+        parser.error("--out-dir is required in batch mode")
+
+    res_config = parse_config(args.res_config)
+    log.info(f"res= {res_dir}", tag="CONFIG")
+    log.info(f"values= {args.values or os.path.join(res_dir, 'values')}", tag="CONFIG")
+    log.info(f"res_config= {','.join(res_config) or '<default>'}", tag="CONFIG")
+    log.info(f"java_path= {java_root or '<none>'}", tag="CONFIG")
+    log.info(f"out_dir= {args.out_dir}", tag="CONFIG")
+    log.info(f"class_prefix= {args.class_prefix}", tag="CONFIG")
+    if args.jobs <= 0:
+        args.jobs = os.cpu_count() or 1
+    log.info(f"jobs= {args.jobs}", tag="CONFIG")
+
+    log.info(f"share_min_nodes= {args.share_min_nodes}", tag="CONFIG")
+
+    if args.watch:
+        from .watch import ProjectWatcher
+        ProjectWatcher(
+            res_dir=res_dir,
+            out_dir=args.out_dir,
+            java_root=java_root,
+            values_dir=args.values,
+            class_prefix=args.class_prefix,
+            interval=args.poll_interval,
+            res_config=res_config,
+            share_min_nodes=args.share_min_nodes,
+        ).run()
+        return
+
+    cache = None
+    if not args.no_cache:
+        cache_dir = args.cache_dir or CACHE_DIR_NAME
+        cache = ScreenCache(cache_dir, read=not args.rebuild)
+        log.info(f"cache= {cache_dir}{' (rebuild)' if args.rebuild else ''}", tag="CONFIG")
+    else:
+        log.info("cache= <disabled>", tag="CONFIG")
+
+    summary = run_batch(
+        res_dir=res_dir,
+        out_dir=args.out_dir,
+        java_root=java_root,
+        values_dir=args.values,
+        class_prefix=args.class_prefix,
+        jobs=args.jobs,
+        cache=cache,
+        res_config=res_config,
+        share_min_nodes=args.share_min_nodes,
+    )
+    if summary["failed"]:
+        sys.exit(2)
 
 def main():
     parser = argparse.ArgumentParser(
         prog="python -m android2flutter.main",
         description=(
             "Convert Android XML + Java logic into Flutter Dart code.\n"
-            "You can pass either --java (single file) or --java-root (scan entire src)."
+            "You can pass either --java (single file) or --java-root (scan entire src).\n"
+            "Use --res-root or --project to convert every layout in res/layout in one run."
         ),
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
-    parser.add_argument("--xml", required=True, help="Path to layout XML (e.g. res/layout/activity_main.xml)")
+    parser.add_argument("--xml", help="Path to layout XML (e.g. res/layout/activity_main.xml)")
     parser.add_argument("--values", help="Path to res/values directory for resource resolution")
+    parser.add_argument("--res-config", dest="res_config",
+                        help="Resource configuration qualifiers, e.g. 'ja,night,sw600dp,v31' (selects values-ja / values-night / values-sw600dp overrides; "
+                             "values-vN is used only when an API level vM >= N is given)")
     parser.add_argument("--java", help="Path to a single Java file for logic extraction")
     parser.add_argument("--java-root", dest="java_root", help="Path to Java source root (e.g. app/src/main/java)")
-    parser.add_argument("--out", required=True, help="Output Dart file path (e.g. Converted/converted_main.dart)")
-    parser.add_argument("--class", dest="class_name", required=True, help="Output Dart class name (e.g. ConvertedMain)")
+    parser.add_argument("--out", help="Output Dart file path (e.g. Converted/converted_main.dart)")
+    parser.add_argument("--class", dest="class_name", help="Output Dart class name (e.g. ConvertedMain)")
+
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument("--res-root", dest="res_root", help="Path to res directory; converts every layout in res/layout")
+    batch.add_argument("--project", help="Path to Android project root (res and java roots are located automatically)")
+    batch.add_argument("--out-dir", dest="out_dir", help="Output directory for generated Dart files")
+    batch.add_argument("--class-prefix", dest="class_prefix", default="Converted",
+                       help="Prefix for generated class names (activity_login.xml -> <prefix>Login)")
+    batch.add_argument("--jobs", "-j", type=int, default=1,
+                       help="Number of worker processes (0 = one per CPU core)")
+    batch.add_argument("--cache-dir", dest="cache_dir",
+                       help="Incremental cache directory (default: ./.a2f-cache)")
+    batch.add_argument("--no-cache", dest="no_cache", action="store_true",
+                       help="Disable the incremental cache (neither read nor written)")
+    batch.add_argument("--rebuild", action="store_true",
+                       help="Regenerate every screen, ignoring cache hits, and refresh the cache")
+    batch.add_argument("--share-min-nodes", dest="share_min_nodes", type=int, default=MIN_NODES,
+                       help="Emit subtrees of at least this many views that repeat across layouts once, "
+                            "as shared widgets in shared_widgets.dart (0 = disable)")
+    batch.add_argument("--watch", action="store_true",
+                       help="Keep running and regenerate only the screens affected by file changes")
+    batch.add_argument("--poll-interval", dest="poll_interval", type=float, default=0.1,
+                       help="Polling interval in seconds for --watch")
+
+    prof = parser.add_argument_group("profiling")
+    prof.add_argument("--profile", metavar="JSON",
+                      help="Record wall/CPU time per conversion phase and per screen, and write it as JSON")
+    prof.add_argument("--profile-memory", dest="profile_memory", action="store_true",
+                      help="Also record tracemalloc peak memory per phase (slows the run down)")
+    prof.add_argument("--profile-pstats", dest="profile_pstats", metavar="PATH",
+                      help="Also run cProfile and dump the stats to PATH (.pstats; main process only)")
+    prof.add_argument("--profile-collapsed", dest="profile_collapsed", metavar="PATH",
+                      help="Also write per-phase collapsed stacks to PATH (for flamegraph.pl / speedscope)")
+
+    diag = parser.add_argument_group("diagnostics")
+    diag.add_argument("--metrics", metavar="PATH",
+                      help="Write conversion coverage counters (fallback views, listener patterns, unresolved "
+                           "targets, stubs, resource misses) per screen; .ndjson/.jsonl = one line per screen, "
+                           "otherwise one JSON document")
+    diag.add_argument("--log-level", dest="log_level", choices=sorted(log.LEVELS, key=log.LEVELS.get),
+                      default="info", help="Diagnostic log level (debug adds handler/id matching details; warn hides "
+                                               "progress lines; error shows only errors)")
+
+    parser.add_argument("--scan-budget", dest="scan_budget", type=float, default=DEFAULT_FILE_BUDGET,
+                        help="Per-file time budget in seconds for Java scanning; slower files are skipped and reported (0 = unlimited)")
 
     args = parser.parse_args()
+    set_default_budget(args.scan_budget)
+    log.set_level(args.log_level)
+
+    counters = metrics.enable() if args.metrics else None
+    try:
+        if args.profile or args.profile_pstats or args.profile_collapsed:
+            _run_profiled(args, parser)
+        else:
+            _run(args, parser)
+    finally:
+        if counters is not None:
+            counters.print_summary()
+            counters.write(args.metrics)
+            metrics.disable()
+
+def _run_profiled(args, parser) -> None:
+    """--profile: 変換全体をプロファイラ（と cProfile）の下で実行し、終わったら結果を書き出す"""
+    prof = profiler.enable(trace_memory=args.profile_memory)
+    cprof = cProfile.Profile() if args.profile_pstats else None
+    if cprof is not None:
+        cprof.enable()
+    try:
+        _run(args, parser)
+    finally:
+        if cprof is not None:
+            cprof.disable()
+            profiler.write_pstats(cprof, args.profile_pstats)
+        prof.print_summary()
+        if args.profile:
+            prof.write_json(args.profile)
+        if args.profile_collapsed:
+            prof.write_collapsed(args.profile_collapsed)
+        profiler.disable()
+
+def _run(args, parser) -> None:
+    if args.res_root or args.project:
+        _run_batch_mode(args, parser)
+        return
+
+    if not (args.xml and args.out and args.class_name):
+        parser.error("--xml, --out and --class are required (or use --res-root/--project for batch mode)")
 
     # 優先順位: --java-root > --java
     java_path = args.java_root or args.java
     if args.java_root and args.java:
-        print("[INFO] Both --java and --java-root provided; using --java-root.")
+        log.info("Both --java and --java-root provided; using --java-root.")
 
-    print(f"[CONFIG] xml= {args.xml}")
-    print(f"[CONFIG] values= {args.values or '<none>'}")
-    print(f"[CONFIG] java_path= {java_path or '<none>'}")
-    print(f"[CONFIG] out= {args.out}")
-    print(f"[CONFIG] class= {args.class_name}")
+    log.info(f"xml= {args.xml}", tag="CONFIG")
+    log.info(f"values= {args.values or '<none>'}", tag="CONFIG")
+    res_config = parse_config(args.res_config)
+    log.info(f"res_config= {','.join(res_config) or '<default>'}", tag="CONFIG")
+    log.info(f"java_path= {java_path or '<none>'}", tag="CONFIG")
+    log.info(f"out= {args.out}", tag="CONFIG")
+    log.info(f"class= {args.class_name}", tag="CONFIG")
 
+    layout_name = os.path.splitext(os.path.basename(args.xml))[0]
+    with profiler.screen(layout_name), metrics.screen(layout_name):
+        _convert_single(args, java_path, res_config, layout_name)
+
+def _convert_single(args, java_path, res_config, layout_name) -> None:
     try:
-        ir, resolver = parse_layout_xml(args.xml, args.values)
+        with profiler.phase("resource_load"):
+            resolver = ResourceResolver(args.values, config=res_config) if args.values else None
+        ir, resolver = parse_layout_xml(args.xml, resolver=resolver)
     except Exception as e:
-        print(f"[ERROR] Failed to parse XML: {e}")
+        log.error(f"Failed to parse XML: {e}")
         sys.exit(1)
 
     logic_map = {}
@@ -51,11 +220,13 @@ def main():
             java_path=java_path,
             output_path=args.out,
             class_name=args.class_name,
+            layout_name=layout_name,
+            # リストの item レイアウトは同じディレクトリから探す
+            layouts=LayoutLibrary(os.path.dirname(os.path.abspath(args.xml)), resolver),
         )
     except Exception as e:
-        print(f"[ERROR] Generation failed: {e}")
+        log.error(f"Generation failed: {e}")
         sys.exit(2)
 
 if __name__ == "__main__":
     main()
-
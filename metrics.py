@@ -0,0 +1,170 @@
+# android2flutter/metrics.py
+"""
+--metrics: 変換の網羅状況をカウンタとして画面ごとに集め、JSON / NDJSON で書き出す。
+
+カウンタは本処理の分岐点で count(名前, キー) するだけで、別パスで数え直すことはしない。
+--metrics を付けないときは count が何もしない関数呼び出しになる（profiler と同じく共有の無効状態）。
+
+カウンタ（名前 → キー → 回数）:
+  views               翻訳したビュー（キー: XML のタグ）
+  fallback_views      /* TODO: translate ... */ の SizedBox に落ちたビュー（キー: XML のタグ）
+  listener_patterns   抽出できたリスナーの書き方（lambda / anonymous / expr_lambda / method_ref /
+                      this_switch / onclick_fallback / xml_onclick）
+  unresolved_targets  setOnClickListener の対象を R.id に結び付けられなかった式、
+                      this デリゲートで onClick に分岐が無かった id
+  untranslated_listeners  setOnClickListener 以外の登録（setOnLongClickListener 等。キー: setter 名）
+  handlers_dropped    抽出したハンドラのうち画面のレイアウトに無い R.id のもの
+  stub_handlers       生成したスタブ（button: Java にハンドラが無いボタン /
+                      sublayout: item / include 先のボタン / no_logic: 本体を変換できなかったハンドラ）
+  resource_misses     解決できなかった @color / @string / @dimen ... 参照（キー: 参照文字列。
+                      同じ属性を何度も解決するので画面ごとに 1 回だけ数える。共有部分木の走査など
+                      画面の外での解決は <run> に数える）
+
+item / include 先のレイアウトは実行中 1 度だけ変換するので、その中のビューは最初に使った画面に数える。
+
+出力:
+  JSON    {"totals": {名前: {キー: 回数}}, "run": {...}, "screens": {画面: {...}}}
+  NDJSON  1 行 1 画面（{"screen": ..., "counters": {...}}）と、最後に {"screen": "<total>", ...}
+          （パスが .ndjson / .jsonl のとき）
+"""
+import contextlib
+import json
+import os
+from typing import Dict, Optional
+
+from . import log
+
+VIEWS = "views"
+FALLBACK_VIEWS = "fallback_views"
+LISTENER_PATTERNS = "listener_patterns"
+UNRESOLVED_TARGETS = "unresolved_targets"
+UNTRANSLATED_LISTENERS = "untranslated_listeners"
+HANDLERS_DROPPED = "handlers_dropped"
+STUB_HANDLERS = "stub_handlers"
+RESOURCE_MISSES = "resource_misses"
+
+RUN_SCOPE = "<run>"   # 画面に属さないもの（共有入力の読み込み等）
+TOTAL_SCOPE = "<total>"
+
+_NULL = contextlib.nullcontext()
+
+Counters = Dict[str, Dict[str, int]]
+
+class Metrics:
+    def __init__(self):
+        # scope（画面名 or RUN_SCOPE）→ カウンタ名 → キー → 回数
+        self.scopes: Dict[str, Counters] = {}
+        self._scope = RUN_SCOPE
+
+    def count(self, name: str, key: str = "", n: int = 1) -> None:
+        counters = self.scopes.get(self._scope)
+        if counters is None:
+            counters = self.scopes[self._scope] = {}
+        c = counters.get(name)
+        if c is None:
+            c = counters[name] = {}
+        c[key] = c.get(key, 0) + n
+
+    def note(self, name: str, key: str) -> None:
+        """画面ごとに 1 回だけ数える（2 回目以降は何もしない）"""
+        counters = self.scopes.setdefault(self._scope, {})
+        counters.setdefault(name, {}).setdefault(key, 1)
+
+    @contextlib.contextmanager
+    def screen(self, name: str):
+        """この中のカウントを画面 name のものとして記録する"""
+        prev, self._scope = self._scope, name
+        try:
+            yield
+        finally:
+            self._scope = prev
+
+    def screen_record(self, name: str) -> Counters:
+        """1 画面分のカウンタ（並列実行時にワーカーから親へ返す）"""
+        return self.scopes.get(name, {})
+
+    def merge_screen(self, name: str, record: Counters) -> None:
+        self.scopes[name] = record
+
+    # ---------------------------------------------------------
+    # reports
+    # ---------------------------------------------------------
+    def totals(self) -> Counters:
+        out: Counters = {}
+        for counters in self.scopes.values():
+            for name, c in counters.items():
+                t = out.setdefault(name, {})
+                for k, n in c.items():
+                    t[k] = t.get(k, 0) + n
+        return {name: dict(sorted(c.items(), key=lambda kv: (-kv[1], kv[0]))) for name, c in sorted(out.items())}
+
+    def report(self) -> Dict:
+        totals = self.totals()
+        views = sum(totals.get(VIEWS, {}).values())
+        fallback = sum(totals.get(FALLBACK_VIEWS, {}).values())
+        return {
+            "coverage": {"views": views, "fallback_views": fallback,
+                         "translated_ratio": round(1.0 - fallback / views, 4) if views else 1.0},
+            "totals": totals,
+            "run": self.scopes.get(RUN_SCOPE, {}),
+            "screens": {name: c for name, c in sorted(self.scopes.items()) if name != RUN_SCOPE},
+        }
+
+    def write(self, path: str) -> None:
+        """拡張子が .ndjson / .jsonl なら 1 行 1 画面、それ以外は JSON 1 つ"""
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        rep = self.report()
+        with open(path, "w", encoding="utf-8") as f:
+            if path.endswith((".ndjson", ".jsonl")):
+                for name, counters in rep["screens"].items():
+                    f.write(json.dumps({"screen": name, "counters": counters}, ensure_ascii=False) + "\n")
+                if rep["run"]:
+                    f.write(json.dumps({"screen": RUN_SCOPE, "counters": rep["run"]}, ensure_ascii=False) + "\n")
+                f.write(json.dumps({"screen": TOTAL_SCOPE, "coverage": rep["coverage"], "counters": rep["totals"]},
+                                   ensure_ascii=False) + "\n")
+            else:
+                json.dump(rep, f, indent=1, ensure_ascii=False)
+        log.info(f"Wrote metrics: {path}", tag="DONE")
+
+    def print_summary(self) -> None:
+        rep = self.report()
+        cov = rep["coverage"]
+        print(f"[METRICS] views={cov['views']} fallback={cov['fallback_views']} "
+              f"translated={cov['translated_ratio'] * 100:.1f}%")
+        for name in (LISTENER_PATTERNS, UNTRANSLATED_LISTENERS, UNRESOLVED_TARGETS, HANDLERS_DROPPED, STUB_HANDLERS,
+                     RESOURCE_MISSES):
+            c = rep["totals"].get(name)
+            if c:
+                top = ", ".join(f"{k or '-'}={n}" for k, n in list(c.items())[:5])
+                print(f"[METRICS]   {name:<22} {sum(c.values()):<5} ({top}{', ...' if len(c) > 5 else ''})")
+
+# =============================================================
+# process-wide switch
+# =============================================================
+
+_active: Optional[Metrics] = None
+
+def enable() -> Metrics:
+    global _active
+    _active = Metrics()
+    return _active
+
+def disable() -> None:
+    global _active
+    _active = None
+
+def active() -> Optional[Metrics]:
+    return _active
+
+def count(name: str, key: str = "", n: int = 1) -> None:
+    """count(FALLBACK_VIEWS, "MaterialCardView")（--metrics が無ければ何もしない）"""
+    if _active is not None:
+        _active.count(name, key, n)
+
+def note(name: str, key: str) -> None:
+    if _active is not None:
+        _active.note(name, key)
+
+def screen(name: str):
+    return _active.screen(name) if _active is not None else _NULL
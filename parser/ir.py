@@ -0,0 +1,117 @@
+# android2flutter/parser/ir.py
+"""
+レイアウト IR のノード型。
+
+1 ビュー = IRNode（__slots__）。属性は Attrs に持たせ、
+  - キー集合（"形"）はプロジェクト全体で共有（同じ属性の組を持つビューは 1 つのキー表を使い回す）
+  - 値は tuple（layout_width="match_parent" 等の頻出値は sys.intern で共有）
+  - 子が無いビューの children は共有の空 tuple
+にして、ビュー 1 つにつき dict 3 つ分かかっていた入れ物のメモリを小さくする。
+
+移行用の互換アクセサ:
+  node.get("attrs", {}) / node["type"] / node["children"] は従来の dict IR と同じ値を返し、
+  Attrs は読み取り専用の Mapping（.get / [] / in / .items()）として振る舞う。
+新しいコードは node.type / node.attrs / node.attr("id") / iter_nodes(ir) を使う。
+"""
+import sys
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+_intern = sys.intern
+
+# 属性キーの組 -> (keys, {key: index})
+_SHAPES: Dict[Tuple[str, ...], Tuple[Tuple[str, ...], Dict[str, int]]] = {}
+
+def _shape(keys: Tuple[str, ...]) -> Tuple[Tuple[str, ...], Dict[str, int]]:
+    shape = _SHAPES.get(keys)
+    if shape is None:
+        keys = tuple(_intern(k) for k in keys)
+        shape = (keys, {k: i for i, k in enumerate(keys)})
+        _SHAPES[keys] = shape
+    return shape
+
+class Attrs(Mapping):
+    """読み取り専用の属性表（キー表は同じ形のビュー間で共有）"""
+    __slots__ = ("_shape", "_values")
+
+    def __init__(self, items: Optional[List[Tuple[str, str]]] = None):
+        items = items or []
+        self._shape = _shape(tuple(k for k, _ in items))
+        self._values = tuple(_intern(v) for _, v in items)
+
+    def __getitem__(self, key: str) -> str:
+        return self._values[self._shape[1][key]]
+
+    def get(self, key: str, default=None):
+        i = self._shape[1].get(key)
+        return default if i is None else self._values[i]
+
+    def __contains__(self, key) -> bool:
+        return key in self._shape[1]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._shape[0])
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def items(self):
+        return zip(self._shape[0], self._values)
+
+    def values(self):
+        return self._values
+
+    def __repr__(self) -> str:
+        return f"Attrs({dict(self.items())!r})"
+
+    def __reduce__(self):
+        return (Attrs, (list(self.items()),))
+
+EMPTY_ATTRS = Attrs()
+
+class IRNode:
+    __slots__ = ("type", "attrs", "children")
+
+    def __init__(self, type: str, attrs: Attrs = EMPTY_ATTRS, children=()):
+        self.type = _intern(type)   # e.g., LinearLayout / TextView
+        self.attrs = attrs
+        self.children = children    # パース中は list、完了時に tuple へ
+
+    def attr(self, name: str, default=None):
+        return self.attrs.get(name, default)
+
+    # ---------------------------------------------------------
+    # dict IR 互換（node.get("attrs", {}) / node["children"]）
+    # ---------------------------------------------------------
+    def get(self, key: str, default=None):
+        if key in IRNode.__slots__:
+            return getattr(self, key)
+        return default
+
+    def __getitem__(self, key: str):
+        if key in IRNode.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        return key in IRNode.__slots__
+
+    def to_dict(self) -> Dict:
+        """デバッグ出力用の従来形式（{"type","attrs","children"}）"""
+        return {"type": self.type, "attrs": dict(self.attrs.items()),
+                "children": [c.to_dict() for c in self.children]}
+
+    def __repr__(self) -> str:
+        return f"IRNode({self.type!r}, {len(self.attrs)} attrs, {len(self.children)} children)"
+
+def freeze_children(node: IRNode) -> None:
+    """パース完了時に children を tuple にする（子なしは共有の空 tuple）"""
+    node.children = tuple(node.children) if node.children else ()
+
+def iter_nodes(root: IRNode) -> Iterator[IRNode]:
+    """前順（ソース順）で全ノードを返す。再帰しないので深いレイアウトでも使える"""
+    stack = [root]
+    while stack:
+        n = stack.pop()
+        yield n
+        stack.extend(reversed(n.children))
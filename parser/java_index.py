@@ -0,0 +1,360 @@
+# android2flutter/parser/java_index.py
+"""
+プロジェクト全体の Java シンボル索引。
+
+Java ソース群を 1 パスずつ走査して（コメント・文字列はレキサで除外済み）、以下を辞書に登録する:
+  - メソッド宣言（メソッド名 / Class.method → 位置と本体）
+  - findViewById 代入（変数名 → R.id 名）
+  - リスナー登録 setOnXxxListener( の位置・コールバック宣言・別名代入 a = b;（ListenerScan）
+  - R.id 参照（id 名 → 出現位置）
+  - クラス宣言と Activity クラス
+  - レイアウトとクラスの対応（setContentView / inflate(R.layout.x) / XxxBinding.inflate）
+  - リスト系ビューのアダプタ（view.setAdapter(new XxxAdapter(...)) / setLayoutManager(new GridLayoutManager(.., n))）
+ハンドラ解決時のメソッド本体検索はすべて O(1) の辞書引きになる。
+"""
+import re
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from .. import log
+from .java_lexer import LexedSource
+from .listeners import ListenerScan
+from .scan_budget import ScanBudget, ScanBudgetExceeded
+
+# 1 ファイル 1 回の finditer で全シンボルを拾う合成パターン（ハンドラ抽出もこの結果だけを使い、再走査しない）
+# 各分岐は開始位置ごとに有界（長い空白・連鎖・閉じ忘れで二乗にならない）。
+# クラスの extends 句は正規表現で食わず、宣言直後の有限範囲だけを別に見る。
+_SYMBOL_RE = re.compile(
+    r'\bclass\s+(?P<cls>\w+)'
+    r'|\bvoid\s+(?P<meth>\w+)\s*\([^(){};]*\)\s*\{'
+    r'|\bboolean\s+(?P<bcb>on[A-Z]\w*)\s*\('
+    r'|\b(?P<bvar>\w+)\s*=\s*(?:\(\s*\w+\s*\)\s*)?findViewById\(\s*R\.id\.(?P<bid>\w+)\s*\)'
+    r'|\b(?:setContentView|inflate)\s*\(\s*(?:[\w.]+\s*,\s*)?R\.layout\.(?P<lay>\w+)'
+    r'|\b(?P<bind>[A-Z]\w*)Binding\s*\.\s*inflate\b'
+    r'|\b(?P<avar>\w+)\s*\.\s*setAdapter\s*\(\s*(?:new\s+(?P<anew>[A-Z]\w*)|(?P<aref>\w+)\s*\))'
+    r'|\b(?P<lmvar>\w+)\s*\.\s*setLayoutManager\s*\(\s*new\s+(?P<lm>\w*)LayoutManager\s*\('
+    r'|\b(?P<nvar>\w+)\s*=\s*new\s+(?P<ncls>[A-Z]\w*)'
+    r'|\b(?P<alias>\w+)\s*=\s*(?P<asrc>\w+)\s*;'
+    r'|\.\s*(?P<lsn>setOn\w+Listener)\s*\('
+    r'|\bR\.id\.(?P<rid>\w+)'
+)
+_EXTENDS_ACTIVITY_RE = re.compile(r'\bextends\s+(?:[\w.]*\.)?\w*Activity\b')
+_EXTENDS_RE = re.compile(r'\bextends\s+(?:[\w.]*\.)?(\w+)')
+_CLASS_HEADER_MAX = 400  # class 宣言から { までを見る最大文字数
+_CLASS_REF_RE = re.compile(r'\b[A-Z]\w*')
+# new XxxAdapter(...) の引数中のレイアウト（ArrayAdapter(this, R.layout.item, data) 等）
+_CTOR_ARGS_MAX = 300
+_CTOR_LAYOUT_RE = re.compile(r'\b(android\.)?R\.layout\.(\w+)')
+# GridLayoutManager(this, 2) の列数
+_SPAN_RE = re.compile(r'[^(),;]*,\s*(\d+)\s*[,)]')
+# (android.R.layout か, レイアウト名)
+CtorLayout = Optional[Tuple[bool, str]]
+
+def _binding_to_layout(binding_base: str) -> str:
+    """ActivityLogin(Binding) -> activity_login"""
+    return re.sub(r'(?<=[a-z0-9])([A-Z])', r'_\1', binding_base).lower()
+
+class SourceLoc(NamedTuple):
+    source_id: int   # JavaIndex.sources のインデックス
+    pos: int         # ソース内オフセット
+
+class ListAdapter(NamedTuple):
+    adapter_class: Optional[str]   # XxxAdapter（不明なら None）
+    item_layout: Optional[str]     # 1 行分のレイアウト名（不明なら None）
+    framework_layout: bool         # android.R.layout.simple_list_item_1 等
+    grid_span: Optional[int]       # GridLayoutManager の列数（リストなら None）
+
+class MethodDef(NamedTuple):
+    name: str
+    class_name: str
+    loc: SourceLoc
+    body: str        # { } の中身（strip 済み）
+
+class JavaIndex:
+    def __init__(self):
+        self.sources: List[str] = []
+        self.lexed: List[LexedSource] = []
+        self.paths: List[Optional[str]] = []
+        self.classes: Dict[str, SourceLoc] = {}
+        self.activity_classes: Set[str] = set()
+        # メソッド名 → 宣言（ソース順）。先頭が「最初に見つかる定義」
+        self.methods: Dict[str, List[MethodDef]] = {}
+        self.qualified_methods: Dict[str, MethodDef] = {}
+        # ファイル毎のメソッド（同一ファイル優先の解決用）
+        self.file_methods: List[Dict[str, MethodDef]] = []
+        # ファイル毎の 変数名 → R.id 名
+        self.view_bindings: List[Dict[str, str]] = []
+        # ファイル毎のリスナー登録箇所・コールバック宣言・別名代入
+        self.listener_scans: List[ListenerScan] = []
+        self.id_refs: Dict[str, List[SourceLoc]] = {}
+        # レイアウト名 → それを inflate するクラス（出現順、重複なし）
+        self.layout_owners: Dict[str, List[str]] = {}
+        # クラス名 → extends している親クラス名（索引内に無いクラス名もそのまま）
+        self.superclasses: Dict[str, str] = {}
+        # クラス名 → (source_id, 本体の { , 対応する })
+        self.class_spans: Dict[str, Tuple[int, int, int]] = {}
+        # ファイル毎の inflate(R.layout.x) の位置 [(pos, layout)]
+        self.inflates: List[List[Tuple[int, str]]] = []
+        # ファイル毎の 変数名 → setAdapter の引数 (new したクラス, 変数参照, コンストラクタ引数のレイアウト)
+        self.adapter_calls: List[Dict[str, Tuple[Optional[str], Optional[str], CtorLayout]]] = []
+        # ファイル毎の 変数名 → new したクラス（x = new Xxx(...)）
+        self.new_vars: List[Dict[str, Tuple[str, CtorLayout]]] = []
+        # ファイル毎の 変数名 → (LayoutManager の種類 "Grid" / "Linear" ..., 列数)
+        self.layout_managers: List[Dict[str, Tuple[str, Optional[int]]]] = []
+        # ファイル毎の「参照している既知クラス」（遅延計算）
+        self._class_refs: Dict[int, Set[str]] = {}
+        # 走査予算を超えて打ち切ったファイル [(path or label, reason)]
+        self.skipped: List[Tuple[str, str]] = []
+
+    @classmethod
+    def build(cls, sources: List[str], paths: Optional[List[str]] = None,
+              budget: Optional[float] = None) -> "JavaIndex":
+        index = cls()
+        for i, src in enumerate(sources):
+            index.add_source(src, paths[i] if paths else None, budget)
+        return index
+
+    def add_source(self, src: str, path: Optional[str] = None, budget: Optional[float] = None) -> int:
+        """
+        1 ファイルを索引に追加する。budget（秒）を超えたファイルは打ち切って skipped に記録し、
+        中身の無いファイルとして扱う（source_id の並びは保つ）。
+        """
+        sid = len(self.sources)
+        label = path or f"<java source #{sid}>"
+        self.sources.append(src)
+        self.paths.append(path)
+        try:
+            self._index_source(sid, src, ScanBudget(label, budget))
+        except ScanBudgetExceeded as e:
+            log.warn(f"Skipping Java file: {e}")
+            self.skipped.append((label, str(e)))
+            self._forget(sid)
+            self.lexed.append(LexedSource(""))
+            self.file_methods.append({})
+            self.view_bindings.append({})
+            self.listener_scans.append(ListenerScan())
+            self.inflates.append([])
+            self.adapter_calls.append({})
+            self.new_vars.append({})
+            self.layout_managers.append({})
+        return sid
+
+    def _forget(self, sid: int) -> None:
+        """打ち切ったファイルから途中まで登録したシンボルを取り除く"""
+        del self.lexed[sid:]
+        del self.file_methods[sid:]
+        del self.view_bindings[sid:]
+        del self.listener_scans[sid:]
+        del self.inflates[sid:]
+        del self.adapter_calls[sid:]
+        del self.new_vars[sid:]
+        del self.layout_managers[sid:]
+        for name in [c for c, span in self.class_spans.items() if span[0] == sid]:
+            del self.class_spans[name]
+        for name in [c for c, loc in self.classes.items() if loc.source_id == sid]:
+            del self.classes[name]
+            self.superclasses.pop(name, None)
+            self.activity_classes.discard(name)
+        for defs in self.methods.values():
+            defs[:] = [d for d in defs if d.loc.source_id != sid]
+        for key in [k for k, d in self.qualified_methods.items() if d.loc.source_id == sid]:
+            del self.qualified_methods[key]
+        for locs in self.id_refs.values():
+            locs[:] = [loc for loc in locs if loc.source_id != sid]
+        live = set(self.classes)
+        for owners in self.layout_owners.values():
+            owners[:] = [c for c in owners if c in live]
+
+    def _index_source(self, sid: int, src: str, budget: ScanBudget) -> None:
+        lexed = LexedSource(src, budget)
+        self.lexed.append(lexed)
+        file_methods: Dict[str, MethodDef] = {}
+        bindings: Dict[str, str] = {}
+        inflates: List[Tuple[int, str]] = []
+        adapter_calls: Dict[str, Tuple[Optional[str], Optional[str], CtorLayout]] = {}
+        new_vars: Dict[str, Tuple[str, CtorLayout]] = {}
+        layout_managers: Dict[str, Tuple[str, Optional[int]]] = {}
+        self.file_methods.append(file_methods)
+        self.view_bindings.append(bindings)
+        listeners = ListenerScan(bindings)
+        self.listener_scans.append(listeners)
+        self.inflates.append(inflates)
+        self.adapter_calls.append(adapter_calls)
+        self.new_vars.append(new_vars)
+        self.layout_managers.append(layout_managers)
+        code = lexed.code
+
+        def ctor_layout(start: int) -> CtorLayout:
+            end = code.find(";", start, start + _CTOR_ARGS_MAX)
+            lm = _CTOR_LAYOUT_RE.search(code, start, end if end >= 0 else start + _CTOR_ARGS_MAX)
+            return (bool(lm.group(1)), lm.group(2)) if lm else None
+        # メソッド・inflate 呼び出しはそれを囲む一番内側のクラスに属する。
+        # 開いているクラスを (名前, 閉じ括弧の位置) のスタックで持ち、走査位置が閉じ括弧を過ぎたら外す
+        open_classes: List[Tuple[str, int]] = []
+        current_class = ""
+
+        for m in _SYMBOL_RE.finditer(code):
+            budget.check()
+            if open_classes and open_classes[-1][1] < m.start():
+                while open_classes and open_classes[-1][1] < m.start():
+                    open_classes.pop()
+                current_class = open_classes[-1][0] if open_classes else ""
+            if m.group("cls"):
+                current_class = m.group("cls")
+                self.classes.setdefault(current_class, SourceLoc(sid, m.start()))
+                header_end = code.find("{", m.end(), m.end() + _CLASS_HEADER_MAX)
+                if header_end >= 0 and _EXTENDS_ACTIVITY_RE.search(code, m.end(), header_end):
+                    self.activity_classes.add(current_class)
+                em = _EXTENDS_RE.search(code, m.end(), header_end) if header_end >= 0 else None
+                if em:
+                    self.superclasses.setdefault(current_class, em.group(1))
+                close = lexed.closing(header_end) if header_end >= 0 else None
+                if close is not None:
+                    self.class_spans.setdefault(current_class, (sid, header_end, close))
+                # 本体の範囲が分からないクラスはファイルの終わりまで開いているとみなす
+                open_classes.append((current_class, close if close is not None else len(code)))
+            elif m.group("meth"):
+                name = m.group("meth")
+                listeners.add_callback(code, name, m.start())
+                body = lexed.block_text(m.end() - 1)
+                if body is None:
+                    continue
+                mdef = MethodDef(name, current_class, SourceLoc(sid, m.start()), body)
+                file_methods.setdefault(name, mdef)
+                self.methods.setdefault(name, []).append(mdef)
+                if current_class:
+                    self.qualified_methods.setdefault(f"{current_class}.{name}", mdef)
+            elif m.group("bvar"):
+                bindings[m.group("bvar")] = m.group("bid")
+                self.id_refs.setdefault(m.group("bid"), []).append(SourceLoc(sid, m.start("bid")))
+            elif m.group("lay") or m.group("bind"):
+                layout = m.group("lay") or _binding_to_layout(m.group("bind"))
+                inflates.append((m.start(), layout))
+                owners = self.layout_owners.setdefault(layout, [])
+                if current_class and current_class not in owners:
+                    owners.append(current_class)
+            elif m.group("avar"):
+                anew = m.group("anew")
+                adapter_calls[m.group("avar")] = (anew, m.group("aref"), ctor_layout(m.end()) if anew else None)
+            elif m.group("lmvar"):
+                sm = _SPAN_RE.match(code, m.end(), m.end() + _CTOR_ARGS_MAX)
+                layout_managers[m.group("lmvar")] = (m.group("lm"), int(sm.group(1)) if sm else None)
+            elif m.group("nvar"):
+                new_vars[m.group("nvar")] = (m.group("ncls"), ctor_layout(m.end()))
+            elif m.group("alias"):
+                listeners.aliases.append((m.group("alias"), m.group("asrc")))
+            elif m.group("lsn"):
+                listeners.add_site(m.group("lsn"), m.start(), m.end() - 1)
+            elif m.group("bcb"):
+                listeners.add_callback(code, m.group("bcb"), m.start())
+            elif m.group("rid"):
+                self.id_refs.setdefault(m.group("rid"), []).append(SourceLoc(sid, m.start("rid")))
+
+    # ---------------------------------------------------------
+    # lookups
+    # ---------------------------------------------------------
+    def find_method(self, name: str, source_id: Optional[int] = None,
+                    scope: Optional[Set[int]] = None) -> Optional[MethodDef]:
+        """
+        メソッド定義を引く。name は "method" または "Class.method"。
+        source_id を渡すと同一ファイルの定義を優先する。
+        scope を渡すとその source_id 集合の中だけから探す。
+        """
+        if "." in name:
+            return self.qualified_methods.get(name)
+        if source_id is not None and 0 <= source_id < len(self.file_methods):
+            mdef = self.file_methods[source_id].get(name)
+            if mdef:
+                return mdef
+        for mdef in self.methods.get(name, ()):
+            if scope is None or mdef.loc.source_id in scope:
+                return mdef
+        return None
+
+    def find_method_body(self, name: str, source_id: Optional[int] = None,
+                         scope: Optional[Set[int]] = None) -> Optional[str]:
+        mdef = self.find_method(name, source_id, scope)
+        return mdef.body if mdef else None
+
+    def referenced_classes(self, source_id: int) -> Set[str]:
+        """そのファイルが名前で参照している既知クラス（親クラス・new・static 呼び出し等）"""
+        refs = self._class_refs.get(source_id)
+        if refs is None:
+            refs = set(_CLASS_REF_RE.findall(self.lexed[source_id].code)) & self.classes.keys()
+            self._class_refs[source_id] = refs
+        return refs
+
+    def class_chain(self, class_name: str) -> List[str]:
+        """class_name と、索引内にあるその親クラスを近い順に（MainActivity → BaseActivity → ...）"""
+        chain: List[str] = []
+        name: Optional[str] = class_name
+        while name and name in self.classes and name not in chain:
+            chain.append(name)
+            name = self.superclasses.get(name)
+        return chain
+
+    def related_sources(self, layout_name: Optional[str]) -> Optional[List[int]]:
+        """
+        画面のハンドラ抽出で見るべきファイル:
+          レイアウトを inflate するクラスとその親クラス（BaseActivity 等。android:onClick / this::method の
+          メソッドが親にあることが多い）+ それらが参照するクラス
+        参照先のうち他の Activity（Intent の遷移先等）は別画面のものなので含めない（id 衝突の原因になる）。
+        対応が見つからなければ None（呼び出し側は全ファイルにフォールバック）
+        """
+        owners = [c for c in self.layout_owners.get(layout_name, ()) if c in self.classes] if layout_name else []
+        if not owners:
+            return None
+        screen = {sc for c in owners for sc in self.class_chain(c)}
+        sids = {self.classes[c].source_id for c in screen}
+        for sid in sorted(sids):
+            for cls in self.referenced_classes(sid):
+                if cls not in self.activity_classes:
+                    sids.add(self.classes[cls].source_id)
+        return sorted(sids)
+
+    def bindings_for(self, source_id: int) -> Dict[str, str]:
+        return self.view_bindings[source_id] if 0 <= source_id < len(self.view_bindings) else {}
+
+    def listeners_for(self, source_id: int) -> ListenerScan:
+        return self.listener_scans[source_id] if 0 <= source_id < len(self.listener_scans) else ListenerScan()
+
+    def class_item_layout(self, class_name: str) -> Optional[str]:
+        """クラス本体（内側のクラスを含む）で最初に inflate しているレイアウト（アダプタの 1 行分）"""
+        span = self.class_spans.get(class_name)
+        if span is None:
+            return None
+        sid, start, end = span
+        for pos, layout in self.inflates[sid]:
+            if start < pos < end:
+                return layout
+        return None
+
+    def list_adapter(self, view_id: str, scope: Optional[Set[int]] = None) -> Optional[ListAdapter]:
+        """
+        リスト系ビュー（R.id.<view_id>）に setAdapter しているアダプタと 1 行分のレイアウト。
+        変数は findViewById の代入先・id と同名の変数（ViewBinding の binding.rvItems 等）で照合する。
+        """
+        camel = re.sub(r'_(\w)', lambda mm: mm.group(1).upper(), view_id)
+        sids = sorted(scope) if scope is not None else range(len(self.sources))
+        for sid in sids:
+            bindings = self.view_bindings[sid]
+            for var, (anew, aref, layout) in self.adapter_calls[sid].items():
+                if var not in (view_id, camel) and bindings.get(var) != view_id:
+                    continue
+                cls = anew
+                if aref:
+                    cls, layout = self.new_vars[sid].get(aref, (None, None))
+                if layout is None and cls:
+                    item = self.class_item_layout(cls)
+                    layout = (False, item) if item else None
+                kind, span = self.layout_managers[sid].get(var, ("", None))
+                return ListAdapter(
+                    adapter_class=cls,
+                    item_layout=layout[1] if layout else None,
+                    framework_layout=bool(layout and layout[0]),
+                    grid_span=(span or 2) if kind.endswith("Grid") else None,
+                )
+        return None
+
+    def id_locations(self, view_id: str) -> List[Tuple[Optional[str], int]]:
+        """R.id.<view_id> の出現位置を (path, offset) で返す"""
+        return [(self.paths[loc.source_id], loc.pos) for loc in self.id_refs.get(view_id, [])]
@@ -0,0 +1,184 @@
+# android2flutter/parser/java_lexer.py
+"""
+Java ソースの軽量レキサ（線形時間）。
+
+1 回の走査でコメント・文字列・文字リテラルを読み飛ばし、
+  - code : コメントとリテラルの中身を空白で潰したソース（位置は元ソースと同じ）
+  - pairs: 開き括弧 ( { [ の位置 → 対応する閉じ括弧の位置
+を作る。メソッド本体・ラムダ本体・匿名クラス本体・switch の case の切り出しは
+すべてこの対応表を引くだけなので、ネストした } で途中切れしない。
+"""
+import bisect
+import re
+from typing import Dict, List, Optional, Tuple
+
+from .scan_budget import ScanBudget
+
+# 各分岐はバックトラックしない形（未終端のコメント/文字列は末尾・行末までを 1 トークンとする）
+_TOKEN_RE = re.compile(
+    r'//[^\n]*'
+    r'|/\*(?:.*?\*/|.*)'
+    r'|"""(?:.*?"""|.*)'
+    r'|"(?:[^"\\\n]|\\.)*"?'
+    r"|'(?:[^'\\\n]|\\.)*'?"
+    r'|[(){}\[\]]',
+    re.DOTALL,
+)
+_OPEN_FOR = {")": "(", "}": "{", "]": "["}
+_IDENT_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_$")
+
+def _blank(s: str) -> str:
+    """改行は残して（行番号を保つ）それ以外を空白に"""
+    return re.sub(r'[^\n]', ' ', s)
+
+_BUDGET_CHECK_EVERY = 4096  # 何トークン毎に時間予算を確認するか
+_MAX_EXPR_SPAN = 2000       # expression_start が遡る最大文字数（長大なメソッドチェーン対策）
+
+class LexedSource:
+    def __init__(self, text: str, budget: Optional[ScanBudget] = None):
+        self.text = text
+        self.pairs: Dict[int, int] = {}
+        self.rpairs: Dict[int, int] = {}
+
+        pieces: List[str] = []
+        last = 0
+        stack: List[Tuple[str, int]] = []
+        for n, m in enumerate(_TOKEN_RE.finditer(text)):
+            if budget is not None and n % _BUDGET_CHECK_EVERY == 0:
+                budget.check()
+            tok = m.group(0)
+            start = m.start()
+            if len(tok) == 1 and tok in "({[":
+                stack.append((tok, start))
+                continue
+            if len(tok) == 1 and tok in ")}]":
+                want = _OPEN_FOR[tok]
+                # 対応の崩れたソースでも先へ進めるよう、同種の開き括弧まで巻き戻す
+                while stack and stack[-1][0] != want:
+                    stack.pop()
+                if stack:
+                    _, o = stack.pop()
+                    self.pairs[o] = start
+                    self.rpairs[start] = o
+                continue
+            # コメント / 文字列: 区切り記号は残して中身を潰す
+            pieces.append(text[last:start])
+            if tok.startswith("//") or tok.startswith("/*"):
+                pieces.append(_blank(tok))
+            else:
+                q = 3 if tok.startswith('"""') else 1
+                closed = len(tok) >= 2 * q and tok.endswith(tok[:q])
+                inner_end = len(tok) - q if closed else len(tok)
+                pieces.append(tok[:q] + _blank(tok[q:inner_end]) + tok[inner_end:])
+            last = m.end()
+        pieces.append(text[last:])
+        self.code = "".join(pieces)
+
+    # ---------------------------------------------------------
+    # brace helpers
+    # ---------------------------------------------------------
+    def closing(self, open_pos: int) -> Optional[int]:
+        return self.pairs.get(open_pos)
+
+    def opening(self, close_pos: int) -> Optional[int]:
+        return self.rpairs.get(close_pos)
+
+    def block_text(self, open_pos: int) -> Optional[str]:
+        """open_pos の { ( [ から対応する閉じ括弧までの中身（元ソース、strip 済み）"""
+        close = self.pairs.get(open_pos)
+        if close is None:
+            return None
+        return self.text[open_pos + 1:close].strip()
+
+    def expression_start(self, end: int) -> int:
+        """
+        end（. や代入記号の位置）の直前にある式の開始位置を返す。
+        例: 'binding.btnLogin' / 'findViewById(R.id.x)' / '((Button) findViewById(R.id.x))'
+        """
+        code = self.code
+        j = end
+        start = end
+        limit = max(0, end - _MAX_EXPR_SPAN)
+        while j > limit:
+            i = j - 1
+            while i >= 0 and code[i].isspace():
+                i -= 1
+            op_end = i
+            # 呼び出し・添字・括弧式
+            while i >= limit and code[i] in ")]":
+                o = self.rpairs.get(i)
+                if o is None or o < limit:
+                    break
+                i = o - 1
+            while i >= limit and code[i] in _IDENT_CHARS:
+                i -= 1
+            if i == op_end:
+                break
+            start = i + 1
+            k = i
+            while k >= 0 and code[k].isspace():
+                k -= 1
+            if k >= 0 and code[k] == ".":
+                j = k
+                continue
+            break
+        return start
+
+    def top_level_ranges(self, start: int, end: int) -> List[Tuple[int, int]]:
+        """[start, end) 内で直下にある括弧ブロックの (open, close) 一覧（入れ子判定用）"""
+        ranges: List[Tuple[int, int]] = []
+        code = self.code
+        i = start
+        while i < end:
+            c = code[i]
+            if c in "({[":
+                close = self.pairs.get(i)
+                if close is None or close >= end:
+                    break
+                ranges.append((i, close))
+                i = close + 1
+                continue
+            i += 1
+        return ranges
+
+def is_nested(ranges: List[Tuple[int, int]], pos: int) -> bool:
+    """top_level_ranges の結果に対して pos がどれかのブロック内にあるか"""
+    k = bisect.bisect_right(ranges, (pos, float("inf"))) - 1
+    return k >= 0 and ranges[k][0] < pos <= ranges[k][1]
+
+# =============================================================
+# switch / case
+# =============================================================
+
+_CASE_LABEL_RE = re.compile(r'\b(?:case\s+(?:[\w.]*\.)?R\.id\.(\w+)\s*|case\s+[^:;{}]{1,200}|default\s*):')
+_BREAK_RE = re.compile(r'\bbreak\s*;')
+
+def switch_cases(lexed: LexedSource, open_brace: int) -> List[Tuple[List[str], str]]:
+    """
+    switch ブロック { ... } を case ごとに分ける。
+    return: [([id, ...], block_text)]   連続ラベル（case a: case b:）は同じ block を共有
+    block は直下の break; か次のラベルの手前まで。
+    """
+    close = lexed.closing(open_brace)
+    if close is None:
+        return []
+    start = open_brace + 1
+    nested = lexed.top_level_ranges(start, close)
+    labels = [m for m in _CASE_LABEL_RE.finditer(lexed.code, start, close) if not is_nested(nested, m.start())]
+    breaks = [m.start() for m in _BREAK_RE.finditer(lexed.code, start, close) if not is_nested(nested, m.start())]
+
+    out: List[Tuple[List[str], str]] = []
+    pending: List[str] = []
+    for i, lab in enumerate(labels):
+        if lab.group(1):
+            pending.append(lab.group(1))
+        next_label = labels[i + 1].start() if i + 1 < len(labels) else close
+        k = bisect.bisect_left(breaks, lab.end())
+        block_end = min(next_label, breaks[k]) if k < len(breaks) else next_label
+        block = lexed.text[lab.end():block_end].strip()
+        if not block and block_end == next_label and i + 1 < len(labels):
+            continue  # フォールスルー（次のラベルと本体を共有）
+        if pending:
+            out.append((pending, block))
+        pending = []
+    return out
@@ -0,0 +1,92 @@
+# android2flutter/parser/listeners.py
+"""
+View のリスナー登録（setOnXxxListener）の種類表と、1 ファイル分の走査結果。
+
+走査そのものは JavaIndex の 1 パス（_SYMBOL_RE の finditer）で行い、ヒットした位置をここの
+ListenerScan に振り分けるだけにする:
+  - setOnXxxListener( の呼び出し箇所（種類表にある setter のみ）
+  - コールバック宣言（void onClick(View v) { ... }。this デリゲートの分岐を探す範囲）
+  - findViewById 代入（変数名 → R.id 名）
+  - 別名代入（a = b;）
+新しいリスナーは register_listener(...) を 1 行足せばよく、ファイル全体の走査は増えない。
+"""
+import re
+from typing import Dict, List, NamedTuple, Optional, Pattern, Tuple
+
+_ALIAS_ROUNDS = 4   # 別名の伝播（a = b; b = c; ...）を何段までたどるか
+
+class ListenerKind(NamedTuple):
+    name: str             # "click" / "long_click" / "checked_change"
+    setter: str           # setOnClickListener
+    interface: str        # OnClickListener
+    callback: str         # onClick
+    anon_re: Pattern      # 引数の先頭が new View.OnClickListener() { か（match 用）
+    callback_re: Pattern  # コールバック宣言 void onClick(View v) {（match / search 用）
+
+LISTENERS: Dict[str, ListenerKind] = {}   # setter 名 → 種類
+CALLBACKS: Dict[str, ListenerKind] = {}   # コールバック名 → 種類
+
+def register_listener(name: str, setter: str, interface: str, callback: str,
+                      params: str = r'[^(){};]*') -> ListenerKind:
+    """params: コールバックの引数部分のパターン（既定は任意の引数列）"""
+    kind = ListenerKind(
+        name, setter, interface, callback,
+        re.compile(r'\s*new\s+(?:[\w.]+\.)?' + interface + r'\s*\(\s*\)\s*\{'),
+        re.compile(r'\b(?:void|boolean)\s+' + callback + r'\s*\(\s*' + params + r'\s*\)\s*\{'),
+    )
+    LISTENERS[setter] = kind
+    CALLBACKS[callback] = kind
+    return kind
+
+_VIEW_PARAM = r'(?:final\s+)?View\s+\w+'
+
+CLICK = register_listener("click", "setOnClickListener", "OnClickListener", "onClick", _VIEW_PARAM)
+LONG_CLICK = register_listener("long_click", "setOnLongClickListener", "OnLongClickListener", "onLongClick",
+                               _VIEW_PARAM)
+CHECKED_CHANGE = register_listener("checked_change", "setOnCheckedChangeListener", "OnCheckedChangeListener",
+                                   "onCheckedChanged")
+
+class ListenerSite(NamedTuple):
+    kind: ListenerKind
+    dot: int          # ".setOnXxxListener" の . の位置（対象の式はこの直前）
+    open_paren: int   # 引数の ( の位置
+
+class ListenerScan:
+    """1 ファイル分の走査結果（位置はすべて LexedSource.code 上）"""
+    __slots__ = ("sites", "callbacks", "bindings", "aliases")
+
+    def __init__(self, bindings: Optional[Dict[str, str]] = None):
+        self.sites: List[ListenerSite] = []           # 出現順
+        self.callbacks: Dict[str, List[int]] = {}     # 種類名 → コールバック本体の { の位置（出現順）
+        self.bindings: Dict[str, str] = bindings if bindings is not None else {}  # 変数名 → R.id 名
+        self.aliases: List[Tuple[str, str]] = []      # a = b; の (a, b)（出現順）
+
+    def add_site(self, setter: str, dot: int, open_paren: int) -> None:
+        kind = LISTENERS.get(setter)
+        if kind is not None:
+            self.sites.append(ListenerSite(kind, dot, open_paren))
+
+    def add_callback(self, code: str, name: str, start: int) -> None:
+        """start から始まるメソッド宣言が既知のコールバックなら本体の位置を記録する"""
+        kind = CALLBACKS.get(name)
+        if kind is None:
+            return
+        m = kind.callback_re.match(code, start)
+        if m:
+            self.callbacks.setdefault(kind.name, []).append(m.end() - 1)
+
+    def expr_to_id(self) -> Dict[str, str]:
+        """
+        式（変数名）→ R.id 名。findViewById 代入に、別名代入 a = b;（b が解決済みなら a も同じ id）を
+        出現順に _ALIAS_ROUNDS 段まで伝播させたもの。
+        """
+        expr2id = dict(self.bindings)
+        for _ in range(_ALIAS_ROUNDS):
+            changed = False
+            for left, right in self.aliases:
+                if right in expr2id and left not in expr2id:
+                    expr2id[left] = expr2id[right]
+                    changed = True
+            if not changed:
+                break
+        return expr2id
@@ -1,50 +1,188 @@
 # convert_tool/parser/resource_resolver.py
+import hashlib
+import json
 import os
+import re
+
 from lxml import etree
 
+from .. import log, metrics
+from .resource_table import ResourceTable
+
+# @color/x / @android:color/white / @+id/x ...
+_REF_RE = re.compile(r'^@\+?(?:(android):)?(\w+)/([\w.]+)$')
+# ?attr/colorPrimary / ?colorPrimary / ?android:attr/textColorPrimary
+_ATTR_RE = re.compile(r'^\?(?:(android):)?(?:attr/)?([\w.]+)$')
+
+# プロジェクトに定義が無い @android: / ?android:attr/ 参照の既定値（フレームワークの代表的なものだけ）
+_ANDROID_FALLBACKS = {
+    ("color", "white"): "#FFFFFFFF",
+    ("color", "black"): "#FF000000",
+    ("color", "transparent"): "#00000000",
+    ("color", "darker_gray"): "#FFAAAAAA",
+    ("color", "background_light"): "#FFFFFFFF",
+    ("color", "background_dark"): "#FF000000",
+    ("color", "holo_blue_light"): "#FF33B5E5",
+    ("color", "holo_blue_dark"): "#FF0099CC",
+    ("color", "holo_green_light"): "#FF99CC00",
+    ("color", "holo_red_light"): "#FFFF4444",
+    ("color", "holo_orange_light"): "#FFFFBB33",
+    ("string", "ok"): "OK",
+    ("string", "cancel"): "Cancel",
+    ("string", "yes"): "Yes",
+    ("string", "no"): "No",
+    ("attr", "android:textColorPrimary"): "#DE000000",
+    ("attr", "android:textColorSecondary"): "#8A000000",
+    ("attr", "android:colorBackground"): "#FFFAFAFA",
+    ("attr", "android:colorAccent"): "#FFFF4081",
+    ("attr", "android:colorPrimary"): "#FF3F51B5",
+}
+
+_UNRESOLVED = object()
+
+# 未定義なら「解決漏れ」として数える参照の型（@+id/ や @drawable/ は values に無いのが普通なので数えない）
+_VALUE_TYPES = frozenset({"color", "string", "dimen", "integer", "bool", "style", "attr", "array", "fraction"})
+
+def _ref_type(ref):
+    """'@color/x' -> 'color' / '?attr/x' -> 'attr'"""
+    m = _REF_RE.match(ref)
+    if m:
+        return m.group(2)
+    return "attr" if _ATTR_RE.match(ref) else None
+
+def _manifest_theme(values_dir):
+    """res/values の 2 つ上（src/main）にある AndroidManifest.xml の application テーマ名"""
+    res_dir = os.path.dirname(os.path.abspath(values_dir))
+    manifest = os.path.join(os.path.dirname(res_dir), "AndroidManifest.xml")
+    if not os.path.isfile(manifest):
+        return None
+    try:
+        root = etree.parse(manifest).getroot()
+    except Exception:
+        return None
+    app = root.find("application")
+    theme = app.get("{http://schemas.android.com/apk/res/android}theme") if app is not None else None
+    m = _REF_RE.match(theme or "")
+    return m.group(3) if m and m.group(2) == "style" and not m.group(1) else None
+
 class ResourceResolver:
-    def __init__(self, values_dir):
+    """
+    values_dir: res/values（同じ階層の values-ja / values-night ... も読む）
+    config    : 構成の修飾子（('ja', 'night') 等）。() なら修飾子なしの values だけが見える
+    cache_dir : リソース表のキャッシュ置き場（None ならキャッシュしない）
+    theme     : ?attr/ 参照を解決するテーマ（style 名）。None なら AndroidManifest / AppTheme から推定
+
+    resolve は参照を値に行き着くまでたどり（@color/primary → @color/brand_blue → #2196F3）、
+    結果を参照文字列ごとにメモする（resolver は構成ごとに 1 つなので、メモは (値, 構成) 単位）。
+    """
+    def __init__(self, values_dir, config=(), cache_dir=None, theme=None):
+        self.config = tuple(config or ())
+        self.table = ResourceTable.load(values_dir, cache_dir) if values_dir else ResourceTable()
+        self.values = self.table.select(self.config)
         self.colors = {}
         self.strings = {}
         self.dimens = {}
-        if values_dir and os.path.isdir(values_dir):
-            self._load_values(values_dir)
-
-    def _load_values(self, values_dir):
-        for fn in os.listdir(values_dir):
-            if not fn.endswith(".xml"): continue
-            path = os.path.join(values_dir, fn)
-            try:
-                root = etree.parse(path).getroot()
-            except Exception:
-                continue
-            for child in root:
-                tag = child.tag
-                name = child.get("name")
-                if not name: continue
-                text = (child.text or "").strip()
-                if tag == "color":
-                    # #AARRGGBB / #RRGGBB のどちらでも来る想定
-                    self.colors[name] = text
-                elif tag == "string":
-                    self.strings[name] = text
-                elif tag == "dimen":
-                    # "16dp" / "14sp" 等
-                    self.dimens[name] = text
+        by_type = {"color": self.colors, "string": self.strings, "dimen": self.dimens}
+        for (rtype, name), value in self.values.items():
+            d = by_type.get(rtype)
+            if d is not None:
+                d[name] = value
+        self.theme = theme or (_manifest_theme(values_dir) if values_dir else None) or self._default_theme()
+        self.theme_attrs = self.style_items(self.theme) if self.theme else {}
+        self._memo = {}
+        self._misses = set()  # 値の型の参照で未定義に行き着いたもの（--metrics 用）
+        self._reported_cycles = set()
+
+    # ---------------------------------------------------------
+    # styles / theme
+    # ---------------------------------------------------------
+    def _default_theme(self):
+        styles = sorted(name for (rtype, name) in self.values if rtype == "style")
+        if "AppTheme" in styles:
+            return "AppTheme"
+        return next((n for n in styles if n.startswith(("Theme.", "AppTheme"))), None)
+
+    def style_items(self, name):
+        """style とその親（parent 属性 or "A.B" の暗黙の親）の item をまとめる（子が優先）"""
+        items = {}
+        seen = set()
+        while name and name not in seen:
+            seen.add(name)
+            style = self.values.get(("style", name))
+            if style is None:
+                break  # フレームワーク側のテーマ（Theme.AppCompat 等）は追わない
+            parent, style_items = style
+            for k, v in style_items:
+                items.setdefault(k, v)
+            if parent:
+                m = _REF_RE.match(parent)
+                if m:
+                    name = None if m.group(1) else m.group(3)
+                else:
+                    name = parent
+            else:
+                name = name.rsplit(".", 1)[0] if "." in name else None
+        return items
+
+    def fingerprint(self):
+        """ 選択済みリソース表とテーマの内容ハッシュ（インクリメンタルキャッシュのキー用） """
+        payload = json.dumps([sorted([t, n, v] for (t, n), v in self.values.items()), self.theme],
+                             ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # ---------------------------------------------------------
+    # resolution
+    # ---------------------------------------------------------
+    def _lookup(self, ref):
+        """参照 1 段分の値。参照の形でなければ ref 自体、未定義なら _UNRESOLVED"""
+        m = _REF_RE.match(ref)
+        if m:
+            android, rtype, name = m.groups()
+            if android:
+                return _ANDROID_FALLBACKS.get((rtype, name), _UNRESOLVED)
+            return self.values.get((rtype, name), _UNRESOLVED)
+        m = _ATTR_RE.match(ref)
+        if m:
+            android, name = m.groups()
+            key = f"android:{name}" if android else name
+            v = self.theme_attrs.get(key)
+            if v is None and not android:
+                v = self.theme_attrs.get(f"android:{name}")  # AppCompat 以前の書き方
+            if v is None:
+                v = _ANDROID_FALLBACKS.get(("attr", f"android:{name}"), _UNRESOLVED)
+            return v
+        return ref
+
+    def _resolve_chain(self, val):
+        chain = [val]
+        cur = val
+        while True:
+            nxt = self._lookup(cur)
+            if nxt is _UNRESOLVED or not isinstance(nxt, str):
+                if nxt is _UNRESOLVED and _ref_type(cur) in _VALUE_TYPES:
+                    self._misses.add(val)
+                return val  # 未定義（@+id/ や @drawable/ 等も含む）・style は元の文字列のまま
+            if nxt is cur or not nxt.startswith(("@", "?")):
+                return nxt
+            if nxt in chain:
+                cycle = " -> ".join(chain + [nxt])
+                if cycle not in self._reported_cycles:
+                    self._reported_cycles.add(cycle)
+                    log.warn(f"Resource reference cycle: {cycle}")
+                return val
+            chain.append(nxt)
+            cur = nxt
 
     def resolve(self, val):
-        """ @color/primary → #RRGGBB / @dimen/margin → '16dp' ... """
-        if not isinstance(val, str): return val
-        if val.startswith("@color/"):
-            key = val.split("/", 1)[1]
-            return self.colors.get(key, val)
-        if val.startswith("@string/"):
-            key = val.split("/", 1)[1]
-            return self.strings.get(key, val)
-        if val.startswith("@dimen/"):
-            key = val.split("/", 1)[1]
-            return self.dimens.get(key, val)
-        return val
+        """ @color/primary → #RRGGBB / @dimen/margin → '16dp' / ?attr/colorPrimary → テーマの値 ... """
+        if not isinstance(val, str) or not val.startswith(("@", "?")):
+            return val
+        out = self._memo.get(val, _UNRESOLVED)
+        if out is _UNRESOLVED:
+            out = self._memo[val] = self._resolve_chain(val)
+        if out is val and val in self._misses:
+            metrics.note(metrics.RESOURCE_MISSES, val)
+        return out
 
     @staticmethod
     def parse_dimen_to_px(d):
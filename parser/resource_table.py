@@ -0,0 +1,226 @@
+# android2flutter/parser/resource_table.py
+"""
+res/values* 全体のリソース表。
+
+  values / values-ja / values-night / values-sw600dp ... をすべて読み、
+  (type, name) → {qualifier: value} の表にまとめる（qualifier "" が既定の values）。
+  構成（--res-config）ごとの選択結果は (type, name) → value の平坦な dict になり、解決は dict 引き 1 回。
+
+読み込み結果は cache_dir/resources.pickle にファイル単位で保存し、次回は
+mtime・サイズが同じファイルはそのまま、変わったファイルも内容ハッシュが同じなら再パースしない。
+修飾子の選択は Android の規則を簡略化したもの:
+  - 修飾子はすべて構成に含まれる必要がある（swNdp / wNdp / hNdp / vN は構成の値以下なら一致。
+    vN は構成に API レベル（v21 等）を明示したときだけ一致し、指定しなければ values-vN は使わない）
+  - 一致した中で修飾子の数が多いものを優先し、同数なら数値（sw600dp > sw320dp 等）の大きい方
+"""
+import hashlib
+import os
+import pickle
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from lxml import etree
+
+from .. import log
+
+_CACHE_FILE = "resources.pickle"
+_CACHE_VERSION = 2
+# 1 ファイル分の中身: [(type, name, value)]
+#   style の value は (parent, ((item_name, item_value), ...))。parent は未指定なら None
+FileEntries = List[Tuple[str, str, object]]
+
+_VALUE_TAGS = ("color", "string", "dimen", "integer", "bool")
+_NUMERIC_QUAL_RE = re.compile(r'^(sw|w|h)(\d+)dp$')
+_VERSION_QUAL_RE = re.compile(r'^v(\d+)$')
+
+def parse_config(spec: Optional[str]) -> Tuple[str, ...]:
+    """'ja,night,sw600dp' / 'ja-night' → ('ja', 'night', 'sw600dp')"""
+    if not spec:
+        return ()
+    return tuple(p for p in re.split(r'[,\s-]+', spec.strip()) if p)
+
+def _qualifier_of(dir_name: str, base_name: str) -> str:
+    """values-ja-night → 'ja-night'（base そのものは ''）"""
+    return dir_name[len(base_name) + 1:] if dir_name != base_name else ""
+
+def discover_values_dirs(values_dir: str) -> List[Tuple[str, str]]:
+    """
+    values_dir と同じ階層の修飾子付きディレクトリ（values-xx）を探す。
+    return: [(qualifier, path)]（'' が先頭、以降は名前順）
+    """
+    found: List[Tuple[str, str]] = []
+    if values_dir and os.path.isdir(values_dir):
+        found.append(("", values_dir))
+    parent = os.path.dirname(os.path.abspath(values_dir)) if values_dir else ""
+    base = os.path.basename(os.path.normpath(values_dir)) if values_dir else ""
+    if parent and base and os.path.isdir(parent):
+        for name in sorted(os.listdir(parent)):
+            path = os.path.join(parent, name)
+            if name.startswith(base + "-") and os.path.isdir(path):
+                found.append((_qualifier_of(name, base), path))
+    return found
+
+def _parse_values_file(path: str) -> FileEntries:
+    entries: FileEntries = []
+    try:
+        root = etree.parse(path).getroot()
+    except Exception:
+        return entries
+    for child in root:
+        tag = child.tag
+        if not isinstance(tag, str):
+            continue
+        name = child.get("name")
+        if not name:
+            continue
+        if tag == "item" and child.get("type") in _VALUE_TAGS:
+            tag = child.get("type")
+        if tag in _VALUE_TAGS:
+            # #AARRGGBB / "16dp" / 文字列 ... はそのまま（解決は resolver 側）
+            entries.append((tag, name, (child.text or "").strip()))
+        elif tag == "style":
+            items = tuple((it.get("name"), (it.text or "").strip())
+                          for it in child if it.tag == "item" and it.get("name"))
+            entries.append(("style", name, (child.get("parent"), items)))
+    return entries
+
+def _sha256_file(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+# =============================================================
+# qualifier matching
+# =============================================================
+
+def _qual_matches(part: str, config: Tuple[str, ...]) -> Optional[int]:
+    """修飾子 1 つが構成に合うか。return: 合えば優先度用の数値、合わなければ None"""
+    if part in config:
+        return 0
+    m = _NUMERIC_QUAL_RE.match(part)
+    if m:
+        kind, need = m.group(1), int(m.group(2))
+        for c in config:
+            cm = _NUMERIC_QUAL_RE.match(c)
+            if cm and cm.group(1) == kind and int(cm.group(2)) >= need:
+                return need
+        return None
+    m = _VERSION_QUAL_RE.match(part)
+    if m:
+        need = int(m.group(1))
+        for c in config:
+            cm = _VERSION_QUAL_RE.match(c)
+            if cm and int(cm.group(1)) >= need:
+                return need
+    return None
+
+def qualifier_score(qualifier: str, config: Tuple[str, ...]) -> Optional[Tuple[int, int]]:
+    """qualifier が config で選ばれうるなら (修飾子数, 数値の合計)、選ばれないなら None"""
+    if not qualifier:
+        return (0, 0)
+    total = 0
+    parts = qualifier.split("-")
+    for p in parts:
+        v = _qual_matches(p, config)
+        if v is None:
+            return None
+        total += v
+    return (len(parts), total)
+
+# =============================================================
+# table
+# =============================================================
+
+class ResourceTable:
+    def __init__(self):
+        # (type, name) → {qualifier: value}
+        self.entries: Dict[Tuple[str, str], Dict[str, object]] = {}
+        self.qualifiers: List[str] = []
+        self._selected: Dict[Tuple[str, ...], Dict[Tuple[str, str], object]] = {}
+
+    @classmethod
+    def from_files(cls, files: Iterable[Tuple[str, FileEntries]]) -> "ResourceTable":
+        """files: [(qualifier, entries)]（同じ qualifier 内は後勝ち）"""
+        table = cls()
+        quals = set()
+        for qual, entries in files:
+            quals.add(qual)
+            for (rtype, name, value) in entries:
+                table.entries.setdefault((rtype, name), {})[qual] = value
+        table.qualifiers = sorted(quals)
+        return table
+
+    def select(self, config: Tuple[str, ...] = ()) -> Dict[Tuple[str, str], object]:
+        """構成 config で見える (type, name) → value（構成ごとに 1 度だけ作る）"""
+        flat = self._selected.get(config)
+        if flat is not None:
+            return flat
+        scores = {q: qualifier_score(q, config) for q in self.qualifiers}
+        flat = {}
+        for key, by_qual in self.entries.items():
+            best = None
+            best_score = None
+            for q, v in by_qual.items():
+                sc = scores.get(q)
+                if sc is not None and (best_score is None or sc > best_score):
+                    best, best_score = v, sc
+            if best_score is not None:
+                flat[key] = best
+        self._selected[config] = flat
+        return flat
+
+    @classmethod
+    def load(cls, values_dir: str, cache_dir: Optional[str] = None) -> "ResourceTable":
+        """
+        values_dir とその修飾子付き兄弟ディレクトリを読む。
+        cache_dir を渡すとファイル単位のパース結果を再利用する（mtime・サイズ → 内容ハッシュの順で確認）
+        """
+        cached: Dict[str, Dict] = {}
+        cache_path = os.path.join(cache_dir, _CACHE_FILE) if cache_dir else None
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, "rb") as f:
+                    data = pickle.load(f)
+                if data.get("version") == _CACHE_VERSION:
+                    cached = data.get("files", {})
+            except Exception as e:
+                log.warn(f"Ignoring unreadable resource cache {cache_path}: {e}")
+
+        files: Dict[str, Dict] = {}
+        ordered: List[Tuple[str, FileEntries]] = []
+        parsed = 0
+        for qual, d in discover_values_dirs(values_dir):
+            for fn in sorted(os.listdir(d)):
+                if not fn.endswith(".xml"):
+                    continue
+                path = os.path.join(d, fn)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                stamp = (st.st_mtime_ns, st.st_size)
+                rec = cached.get(path)
+                if rec is not None and rec["stamp"] != stamp:
+                    sha = _sha256_file(path)
+                    rec = dict(rec, stamp=stamp) if sha == rec["sha"] else None
+                if rec is None:
+                    rec = {"stamp": stamp, "sha": _sha256_file(path), "entries": _parse_values_file(path)}
+                    parsed += 1
+                files[path] = rec
+                ordered.append((qual, rec["entries"]))
+
+        if cache_path and (parsed or files.keys() != cached.keys()
+                           or any(files[p]["stamp"] != cached[p]["stamp"] for p in files)):
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                tmp = cache_path + ".tmp"
+                with open(tmp, "wb") as f:
+                    pickle.dump({"version": _CACHE_VERSION, "files": files}, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, cache_path)
+            except OSError as e:
+                log.warn(f"Could not write resource cache {cache_path}: {e}")
+        if files:
+            log.info(f"Resource table: {len(files)} values files ({parsed} parsed, {len(files) - parsed} from cache)")
+        return cls.from_files(ordered)
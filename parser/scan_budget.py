@@ -0,0 +1,41 @@
+# android2flutter/parser/scan_budget.py
+"""
+Java 走査 1 ファイルあたりの時間予算。
+
+Python の re はマッチ途中で中断できないため、走査ループ（トークン・シンボル・リスナー箇所）の
+合間で締め切りを確認し、超えたらそのファイルを打ち切って報告する。
+各パターン自体は線形になるよう書いてあり（benchmarks/regex_scaling.py で検証）、
+1 回のマッチが予算を大きく超えることはない。
+"""
+import time
+from typing import Optional
+
+# 1 ファイルあたりの既定予算（秒）。--scan-budget で変更できる
+DEFAULT_FILE_BUDGET = 2.0
+
+class ScanBudgetExceeded(Exception):
+    def __init__(self, label: str, elapsed: float, budget: float):
+        super().__init__(f"scan budget exceeded for {label}: {elapsed:.2f}s > {budget:.2f}s")
+        self.label = label
+        self.elapsed = elapsed
+        self.budget = budget
+
+class ScanBudget:
+    """check() を走査ループ内で呼ぶ。budget が None / 0 以下なら無制限"""
+    __slots__ = ("label", "budget", "started", "deadline")
+
+    def __init__(self, label: str, budget: Optional[float] = None):
+        self.label = label
+        self.budget = DEFAULT_FILE_BUDGET if budget is None else budget
+        self.started = time.perf_counter()
+        self.deadline = self.started + self.budget if self.budget and self.budget > 0 else None
+
+    def check(self) -> None:
+        if self.deadline is not None:
+            now = time.perf_counter()
+            if now > self.deadline:
+                raise ScanBudgetExceeded(self.label, now - self.started, self.budget)
+
+def set_default_budget(seconds: float) -> None:
+    global DEFAULT_FILE_BUDGET
+    DEFAULT_FILE_BUDGET = seconds
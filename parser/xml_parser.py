@@ -1,39 +1,63 @@
 # convert_tool/parser/xml_parser.py
 from lxml import etree
+from ..profiler import phase
+from .ir import EMPTY_ATTRS, Attrs, IRNode, freeze_children
 from .resource_resolver import ResourceResolver
 
 import os
 
 
 ANDROID_NS = "{http://schemas.android.com/apk/res/android}"
+_NS_LEN = len(ANDROID_NS)
 
 def _attr(el, name, default=None):
     return el.get(ANDROID_NS + name, default)
 
-def _parse_node(el):
-    node = {
-        "type": el.tag.split('}')[-1],   # e.g., LinearLayout / TextView
-        "attrs": {},
-        "children": []
-    }
-    # すべてのandroid:属性を attrs に詰める
-    for k, v in el.attrib.items():
-        if k.startswith(ANDROID_NS):
-            node["attrs"][k.split('}')[-1]] = v
-    # 子
-    for child in el:
-        if isinstance(child.tag, str):  # コメント等スキップ
-            node["children"].append(_parse_node(child))
-    return node
+def _new_node(el):
+    # すべての android: 属性と、名前空間なしの属性（style 等）を attrs に詰める
+    attrs = [(k[_NS_LEN:], v) if k.startswith(ANDROID_NS) else (k, v)
+             for k, v in el.attrib.items() if k.startswith(ANDROID_NS) or k[0] != "{"]
+    return IRNode(el.tag.split('}')[-1], Attrs(attrs) if attrs else EMPTY_ATTRS, [])
 
-def parse_layout_xml(xml_path, values_dir=None):
+def _build_ir(source):
+    """
+    iterparse で要素が開いた時点で IR ノードを作り、閉じた時点で lxml 側を捨てる。
+    lxml の木と IR が同時に全体分メモリに載ることはなく、再帰もしないので Python の再帰上限にも当たらない。
+    ただし入れ子の深さは libxml2 自身の上限（huge_tree でも 2048 段）までで、それより深い XML は
+    XMLSyntaxError（Excessive depth in document: 2048）になる。
+    （コメント・処理命令は start/end イベントに出てこないのでそのまま読み飛ばされる）
+    """
+    stack = []
+    root = None
+    # huge_tree: libxml2 の既定の深さ（256 段）・テキストサイズの制限を緩める（深さは 2048 段が上限で、これは外せない）
+    for event, el in etree.iterparse(source, events=("start", "end"), huge_tree=True):
+        if event == "start":
+            node = _new_node(el)
+            if stack:
+                stack[-1].children.append(node)
+            else:
+                root = node
+            stack.append(node)
+        else:
+            freeze_children(stack.pop())
+            # 変換済みの要素と、すでに閉じた兄弟を親から外す
+            el.clear()
+            parent = el.getparent()
+            if parent is not None:
+                while el.getprevious() is not None:
+                    del parent[0]
+    return root
+
+def parse_layout_xml(xml_path, values_dir=None, resolver=None):
     """
     xml_path: res/layout/xxx.xml
     values_dir: res/values ディレクトリ
-    return: (ir: dict, resolver: ResourceResolver)
+    resolver: 読み込み済みの ResourceResolver（バッチ実行時に共有）。指定時は values_dir を読まない
+    return: (ir: IRNode, resolver: ResourceResolver)
     """
-    tree = etree.parse(xml_path)
-    root = tree.getroot()
-    ir = _parse_node(root)
-    resolver = ResourceResolver(values_dir) if values_dir else None
+    with phase("xml_parse"):
+        ir = _build_ir(xml_path)
+    if resolver is None and values_dir:
+        with phase("resource_load"):
+            resolver = ResourceResolver(values_dir)
     return ir, resolver
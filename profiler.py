@@ -0,0 +1,229 @@
+# android2flutter/profiler.py
+"""
+--profile: 変換の各フェーズの所要時間（wall / CPU）とメモリのピークを画面ごとに記録する。
+
+計測点はコード中の with phase("xml_parse"): ... で、プロファイラが無効のときは共有の nullcontext を
+返すだけなので通常の実行にはほぼコストがかからない。
+
+フェーズ（入れ子になるものは外側の時間に内側も含む）:
+  resource_load  values* の読み込み（ResourceResolver）
+  xml_parse      レイアウト XML → IR
+  java_gather    Java ソースの読み込み
+  java_index     JavaIndex の構築
+  tokens         tokens.dart の生成（バッチ実行時）
+  shared_scan    重複する部分木の走査と shared_widgets.dart の生成（バッチ実行時）
+  handlers       クリックハンドラの抽出（extract_click_handlers_from_java）
+  java_logic     Java のハンドラ本体 → Dart（convert_java_logic_to_dart。handlers の内側）
+  translate      IR → Widget 木（item / include 先のレイアウトを含む）
+  postprocess    スタブ生成・const 付与・整形・import
+  write          .dart の書き込み
+
+出力:
+  JSON         画面ごと・フェーズごとの calls / wall / cpu / self_wall（/ mem_peak_kb）と全体集計
+  collapsed    "画面;フェーズ;内側のフェーズ <self マイクロ秒>"（flamegraph.pl / speedscope 用）
+  pstats       cProfile の結果（--profile-pstats。並列実行時は親プロセスの分のみ）
+メモリ（tracemalloc）は計測自体が遅く時間の数字を歪めるので --profile-memory のときだけ取る。
+"""
+import contextlib
+import functools
+import json
+import os
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+from . import log
+
+RUN_SCOPE = "<run>"   # 画面に属さないフェーズ（共有入力の読み込み等）
+
+_NULL = contextlib.nullcontext()
+
+class _Frame:
+    __slots__ = ("name", "wall0", "cpu0", "child_wall", "mem0", "peak")
+
+    def __init__(self, name: str, mem0: int):
+        self.name = name
+        self.wall0 = time.perf_counter()
+        self.cpu0 = time.process_time()
+        self.child_wall = 0.0
+        self.mem0 = mem0
+        self.peak = mem0
+
+class PhaseProfiler:
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        # scope（画面名 or RUN_SCOPE）→ フェーズのパス（"handlers;java_logic"）→ 集計
+        self.scopes: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self.screen_wall: Dict[str, float] = {}
+        self._scope = RUN_SCOPE
+        self._stack: List[_Frame] = []
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    # ---------------------------------------------------------
+    # recording
+    # ---------------------------------------------------------
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        mem0 = 0
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # 内側で reset_peak する前に、外側のここまでのピークを退避
+                self._stack[-1].peak = max(self._stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            mem0 = current
+        frame = _Frame(name, mem0)
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - frame.wall0
+            cpu = time.process_time() - frame.cpu0
+            self._stack.pop()
+            path = ";".join([f.name for f in self._stack] + [name])
+            rec = self.scopes.setdefault(self._scope, {}).get(path)
+            if rec is None:
+                rec = self.scopes[self._scope][path] = self._new_record()
+            rec["calls"] += 1
+            rec["wall"] += wall
+            rec["cpu"] += cpu
+            rec["self_wall"] += wall - frame.child_wall
+            if self._stack:
+                self._stack[-1].child_wall += wall
+            if self.trace_memory:
+                peak = max(frame.peak, tracemalloc.get_traced_memory()[1])
+                rec["mem_peak_kb"] = max(rec["mem_peak_kb"], (peak - frame.mem0) / 1024)
+                if self._stack:
+                    self._stack[-1].peak = max(self._stack[-1].peak, peak)
+
+    def _new_record(self) -> Dict[str, float]:
+        rec = {"calls": 0, "wall": 0.0, "cpu": 0.0, "self_wall": 0.0}
+        if self.trace_memory:
+            rec["mem_peak_kb"] = 0.0
+        return rec
+
+    @contextlib.contextmanager
+    def screen(self, name: str):
+        """この中のフェーズを画面 name のものとして記録する"""
+        prev, self._scope = self._scope, name
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.screen_wall[name] = self.screen_wall.get(name, 0.0) + time.perf_counter() - started
+            self._scope = prev
+
+    def screen_record(self, name: str) -> Dict:
+        """1 画面分の記録（並列実行時にワーカーから親へ返す）"""
+        return {"wall": self.screen_wall.get(name, 0.0), "phases": self.scopes.get(name, {})}
+
+    def merge_screen(self, name: str, record: Dict) -> None:
+        self.screen_wall[name] = record["wall"]
+        self.scopes[name] = record["phases"]
+
+    # ---------------------------------------------------------
+    # reports
+    # ---------------------------------------------------------
+    def report(self) -> Dict:
+        totals: Dict[str, Dict[str, float]] = {}
+        for phases in self.scopes.values():
+            for path, rec in phases.items():
+                t = totals.get(path)
+                if t is None:
+                    t = totals[path] = self._new_record()
+                for k in ("calls", "wall", "cpu", "self_wall"):
+                    t[k] += rec[k]
+                if self.trace_memory:
+                    t["mem_peak_kb"] = max(t["mem_peak_kb"], rec["mem_peak_kb"])
+        screens = {name: {"wall": self.screen_wall.get(name, 0.0), "phases": phases}
+                   for name, phases in sorted(self.scopes.items()) if name != RUN_SCOPE}
+        return {
+            "wall": time.perf_counter() - self._started,
+            "cpu": time.process_time() - self._cpu_started,
+            "trace_memory": self.trace_memory,
+            "phases": dict(sorted(totals.items(), key=lambda kv: -kv[1]["wall"])),
+            "run": self.scopes.get(RUN_SCOPE, {}),
+            "screens": screens,
+            "slowest_screens": sorted(screens, key=lambda s: -screens[s]["wall"])[:10],
+        }
+
+    def write_json(self, path: str) -> None:
+        _ensure_parent(path)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=1)
+        log.info(f"Wrote profile: {path}", tag="DONE")
+
+    def write_collapsed(self, path: str) -> None:
+        """flamegraph 用の collapsed stacks（値は self 時間のマイクロ秒）"""
+        _ensure_parent(path)
+        lines = []
+        for scope, phases in sorted(self.scopes.items()):
+            for p, rec in sorted(phases.items()):
+                us = int(rec["self_wall"] * 1e6)
+                if us > 0:
+                    lines.append(f"{scope};{p} {us}")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + ("\n" if lines else ""))
+        log.info(f"Wrote collapsed stacks: {path}", tag="DONE")
+
+    def print_summary(self, top: int = 5) -> None:
+        rep = self.report()
+        print(f"[PROFILE] wall={rep['wall']:.3f}s cpu={rep['cpu']:.3f}s")
+        for p, rec in rep["phases"].items():
+            mem = f" peak={rec['mem_peak_kb']:.0f}KiB" if self.trace_memory else ""
+            print(f"[PROFILE]   {p:<28} calls={rec['calls']:<5} wall={rec['wall']:.3f}s "
+                  f"cpu={rec['cpu']:.3f}s self={rec['self_wall']:.3f}s{mem}")
+        for name in rep["slowest_screens"][:top]:
+            print(f"[PROFILE]   slowest: {name} {rep['screens'][name]['wall']:.3f}s")
+
+def _ensure_parent(path: str) -> None:
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+
+def write_pstats(cprof, path: str) -> None:
+    """cProfile.Profile の結果を .pstats として書く（python -m pstats / snakeviz で読める）"""
+    _ensure_parent(path)
+    cprof.dump_stats(path)
+    log.info(f"Wrote cProfile stats: {path}", tag="DONE")
+
+# =============================================================
+# process-wide switch
+# =============================================================
+
+_active: Optional[PhaseProfiler] = None
+
+def enable(trace_memory: bool = False) -> PhaseProfiler:
+    global _active
+    _active = PhaseProfiler(trace_memory=trace_memory)
+    return _active
+
+def disable() -> None:
+    global _active
+    if _active is not None and _active.trace_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _active = None
+
+def active() -> Optional[PhaseProfiler]:
+    return _active
+
+def phase(name: str):
+    """with phase("translate"): ...（プロファイラが無効なら何もしない）"""
+    return _active.phase(name) if _active is not None else _NULL
+
+def screen(name: str):
+    return _active.screen(name) if _active is not None else _NULL
+
+def profiled(name: str):
+    """関数全体を 1 フェーズとして計測するデコレータ"""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return fn(*args, **kwargs)
+            with _active.phase(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
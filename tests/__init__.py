@@ -0,0 +1 @@
+# android2flutter/tests
@@ -0,0 +1,53 @@
+# android2flutter/tests/test_cache.py
+"""--scan-budget の値と、走査予算での打ち切りが画面キャッシュに反映されること。"""
+from ..batch import run_batch
+from ..cache import ScreenCache
+from ..parser import scan_budget
+from ..parser.scan_budget import ScanBudgetExceeded
+from ..translator import generator
+
+_LAYOUT = '<LinearLayout xmlns:android="http://schemas.android.com/apk/res/android" ' \
+          'android:layout_width="match_parent" android:layout_height="wrap_content">\n' \
+          '<Button android:id="@+id/btnOk" android:text="OK"/>\n</LinearLayout>\n'
+
+_JAVA = "public class MainActivity extends AppCompatActivity {\n" \
+        "    protected void onCreate(Bundle b) {\n" \
+        "        setContentView(R.layout.activity_main);\n" \
+        "        findViewById(R.id.btnOk).setOnClickListener(v -> finish());\n" \
+        "    }\n" \
+        "}\n"
+
+def _project(tmp_path):
+    (tmp_path / "res" / "layout").mkdir(parents=True)
+    (tmp_path / "res" / "layout" / "activity_main.xml").write_text(_LAYOUT, encoding="utf-8")
+    (tmp_path / "java").mkdir()
+    (tmp_path / "java" / "MainActivity.java").write_text(_JAVA, encoding="utf-8")
+
+def _run(tmp_path):
+    cache = ScreenCache(str(tmp_path / "cache"))
+    return run_batch(str(tmp_path / "res"), str(tmp_path / "out"), java_root=str(tmp_path / "java"),
+                     cache=cache, share_min_nodes=0)
+
+def test_scan_budget_is_part_of_key(tmp_path, monkeypatch):
+    _project(tmp_path)
+    assert _run(tmp_path)["cached"] == 0
+    assert _run(tmp_path)["cached"] == 1
+    monkeypatch.setattr(scan_budget, "DEFAULT_FILE_BUDGET", scan_budget.DEFAULT_FILE_BUDGET + 1)
+    assert _run(tmp_path)["cached"] == 0
+
+class _ExpiredBudget:
+    def __init__(self, label, budget=None):
+        self.label = label
+
+    def check(self):
+        raise ScanBudgetExceeded(self.label, 1.0, 0.0)
+
+def test_truncated_scan_is_not_cached(tmp_path, monkeypatch):
+    _project(tmp_path)
+    monkeypatch.setattr(generator, "ScanBudget", _ExpiredBudget)
+    summary = _run(tmp_path)
+    assert summary["skipped_java"]
+    assert _run(tmp_path)["cached"] == 0
+    monkeypatch.undo()
+    _run(tmp_path)
+    assert _run(tmp_path)["cached"] == 1
@@ -0,0 +1,46 @@
+# android2flutter/tests/test_java_index.py
+"""画面のハンドラ抽出範囲（related_sources）に親クラスが入り、遷移先の Activity は入らないこと。"""
+from ..parser.java_index import JavaIndex
+
+_BASE = """
+public abstract class BaseActivity extends AppCompatActivity {
+    public void goBack(View v) {
+        finish();
+    }
+}
+"""
+
+_MAIN = """
+public class MainActivity extends BaseActivity {
+    @Override
+    protected void onCreate(Bundle savedInstanceState) {
+        super.onCreate(savedInstanceState);
+        setContentView(R.layout.activity_main);
+    }
+    public void openDetail(View v) {
+        startActivity(new Intent(this, DetailActivity.class));
+    }
+}
+"""
+
+_DETAIL = """
+public class DetailActivity extends BaseActivity {
+    @Override
+    protected void onCreate(Bundle savedInstanceState) {
+        super.onCreate(savedInstanceState);
+        setContentView(R.layout.activity_detail);
+    }
+}
+"""
+
+def test_related_sources_keeps_base_activity():
+    index = JavaIndex.build([_BASE, _MAIN, _DETAIL])
+    base, main, detail = 0, 1, 2
+    scope = index.related_sources("activity_main")
+    assert scope == [base, main]
+    assert detail not in scope
+    assert index.find_method_body("goBack", scope=set(scope)) is not None
+
+def test_class_chain_stops_outside_index():
+    index = JavaIndex.build([_BASE, _MAIN])
+    assert index.class_chain("MainActivity") == ["MainActivity", "BaseActivity"]
@@ -0,0 +1,56 @@
+# android2flutter/tests/test_sublayout_handlers.py
+"""item / include 先のビューが呼ぶハンドラが、画面の State に必ず定義されること。"""
+import re
+
+from ..batch import run_batch
+
+_LAYOUT_HEAD = '<LinearLayout xmlns:android="http://schemas.android.com/apk/res/android" ' \
+               'android:layout_width="match_parent" android:layout_height="wrap_content" android:orientation="vertical">'
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+def _convert(tmp_path, layouts, java):
+    res = tmp_path / "res"
+    for name, body in layouts.items():
+        _write(res / "layout" / f"{name}.xml", f"{_LAYOUT_HEAD}\n{body}\n</LinearLayout>\n")
+    _write(res / "values" / "strings.xml", "<resources/>\n")
+    for name, src in java.items():
+        _write(tmp_path / "java" / f"{name}.java", src)
+    out = tmp_path / "out"
+    run_batch(str(res), str(out), java_root=str(tmp_path / "java"), share_min_nodes=0)
+    return out
+
+def _undefined_handlers(dart):
+    called = set(re.findall(r'\b(_on\w+Pressed)\(context\)', dart))
+    defined = set(re.findall(r'\bvoid\s+(_on\w+Pressed)\s*\(', dart))
+    return called - defined
+
+def test_included_textview_onclick_is_forwarded(tmp_path):
+    out = _convert(tmp_path, {
+        "toolbar": '<TextView android:id="@+id/tvBack" android:text="Back" android:onClick="goBack"/>\n'
+                   '<TextView android:id="@+id/tv_help" android:text="Help" android:onClick="showHelp"/>',
+        "activity_main": '<include layout="@layout/toolbar"/>',
+    }, {
+        "MainActivity": "public class MainActivity extends AppCompatActivity {\n"
+                        "    protected void onCreate(Bundle b) { setContentView(R.layout.activity_main); }\n"
+                        "    public void goBack(View v) { finish(); }\n"
+                        "    public void showHelp(View v) { Toast.makeText(this, \"Help\", Toast.LENGTH_SHORT).show(); }\n"
+                        "}\n",
+    })
+    dart = (out / "converted_main.dart").read_text(encoding="utf-8")
+    assert "_buildToolbar(context)" in dart
+    assert _undefined_handlers(dart) == set()
+    # 転送先は Java のメソッド本体を変換したハンドラ
+    assert re.search(r'void _onTv_helpPressed\(BuildContext context\) => (_on\w+Pressed)\(context\);', dart)
+    assert "showSnackBar" in dart
+
+def test_included_onclick_without_java_gets_stub(tmp_path):
+    out = _convert(tmp_path, {
+        "row": '<TextView android:id="@+id/tvMore" android:text="More" android:onClick="openMore"/>\n'
+               '<Button android:id="@+id/btnOk" android:text="OK"/>',
+        "activity_other": '<include layout="@layout/row"/>',
+    }, {})
+    dart = (out / "converted_other.dart").read_text(encoding="utf-8")
+    assert _undefined_handlers(dart) == set()
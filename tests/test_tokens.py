@@ -0,0 +1,17 @@
+# android2flutter/tests/test_tokens.py
+"""strings.xml の文字列が Dart の文字列リテラルとしてそのまま書けること（$ が補間にならない）。"""
+from ..parser.resource_resolver import ResourceResolver
+from ..translator.tokens import DesignTokens
+from ..utils import escape_dart
+
+def test_escape_dart_dollar():
+    assert escape_dart("Hello %1$s") == "Hello %1\\$s"
+    assert escape_dart('$5 "off"\n') == '\\$5 \\"off\\"\\n'
+
+def test_app_strings_escape_dollar(tmp_path):
+    values = tmp_path / "values"
+    values.mkdir()
+    (values / "strings.xml").write_text(
+        '<resources>\n  <string name="welcome">Hello %1$s</string>\n</resources>\n', encoding="utf-8")
+    tokens = DesignTokens.from_resolver(ResourceResolver(str(values)))
+    assert tokens.strings["welcome"] == ("welcome", '"Hello %1\\$s"')
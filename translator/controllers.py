@@ -0,0 +1,59 @@
+# android2flutter/translator/controllers.py
+"""
+入力欄（EditText / TextInputLayout）と TextEditingController の対応。
+
+translate_view が入力欄を変換するその場で bind() を呼び、view id をキーに controller 名を決める。
+ハンドラ変換（convert_java_logic_to_dart）は役割名 _usernameController / _passwordController /
+_confirmPasswordController を参照するので、各役割の最初の入力欄にはその名前を、
+2 つ目以降は id から作った名前（et_email → _etEmailController。それも使用済みなら _etEmail2Controller ...）を
+割り当てる。
+"""
+from typing import Dict, List, Optional
+
+ROLE_CONTROLLERS = ("_usernameController", "_passwordController", "_confirmPasswordController")
+
+def controller_role(hint: str, view_id: str, input_type: str) -> Optional[str]:
+    """入力欄の役割に対応する controller 名（役割が分からなければ None）"""
+    lower = (hint + view_id).lower()
+    if "password" in lower or "textpassword" in input_type.lower():
+        return "_confirmPasswordController" if "confirm" in lower else "_passwordController"
+    if "username" in lower or "user" in lower or "mail" in lower:
+        return "_usernameController"
+    return None
+
+def _id_controller_name(view_id: str) -> str:
+    parts = [p for p in view_id.replace("-", "_").split("_") if p]
+    camel = parts[0] + "".join(p[:1].upper() + p[1:] for p in parts[1:]) if parts else "field"
+    return f"_{camel}Controller"
+
+class ControllerRegistry:
+    """1 画面分の view id → controller 名（宣言順 = 木の中の出現順）"""
+    def __init__(self):
+        self.by_id: Dict[str, str] = {}
+        self.names: List[str] = []
+
+    def bind(self, view_id: str, role: Optional[str]) -> Optional[str]:
+        """role（controller_role の結果）の入力欄に controller 名を割り当てる"""
+        if view_id and view_id in self.by_id:
+            return self.by_id[view_id]
+        if role is None:
+            return None
+        name = role
+        if name in self.names:
+            name = _id_controller_name(view_id) if view_id else role
+            base, n = name, 2
+            while name in self.names:
+                name = f"{base[:-len('Controller')]}{n}Controller"
+                n += 1
+        self.names.append(name)
+        if view_id:
+            self.by_id[view_id] = name
+        return name
+
+    def declared(self, referenced_roles=()) -> List[str]:
+        """State に宣言する controller。ハンドラが参照する役割名は入力欄が無くても宣言する"""
+        names = list(self.names)
+        for role in ROLE_CONTROLLERS:
+            if role in referenced_roles and role not in names:
+                names.append(role)
+        return names
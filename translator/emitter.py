@@ -0,0 +1,40 @@
+# android2flutter/translator/emitter.py
+"""
+Dart コードのストリーミング出力。
+
+断片を list に追記していき、最後に 1 回だけ join する。
+  - 改行は現在のインデント（レベル × 2 空白）付きで書く
+  - ラッパー（Padding / Center / Expanded ...）は開き部分を先に書き、子を書き終えてから ")" で閉じる
+ので、子のテキストを親ごとに作り直したり 行ごとに字下げを足して組み直したりしない（画面全体で O(出力サイズ)）。
+ウィジェット木の整形は widget_ast.print_widget がこれを使って 1 パスで行う。
+"""
+from typing import List
+
+class DartEmitter:
+    __slots__ = ("_parts", "level", "unit")
+
+    def __init__(self, level: int = 0, unit: str = "  "):
+        self._parts: List[str] = []
+        self.level = level
+        self.unit = unit
+
+    def write(self, text: str) -> "DartEmitter":
+        self._parts.append(text)
+        return self
+
+    def newline(self) -> "DartEmitter":
+        self._parts.append("\n" + self.unit * self.level)
+        return self
+
+    def indent(self) -> "DartEmitter":
+        self.level += 1
+        return self
+
+    def dedent(self) -> "DartEmitter":
+        self.level -= 1
+        return self
+
+    def getvalue(self) -> str:
+        text = "".join(self._parts)
+        self._parts = [text]
+        return text
@@ -1,12 +1,22 @@
 # android2flutter/translator/generator.py
 import os
 import re
-from typing import Dict, List, Tuple, Set, Optional
-
+from typing import Dict, Iterable, List, Tuple, Set, Optional
+
+from .. import log, metrics
+from ..parser.ir import IRNode, iter_nodes
+from ..profiler import phase, profiled
+from ..parser.java_index import JavaIndex
+from ..parser.java_lexer import LexedSource, switch_cases
+from ..parser.listeners import CLICK, ListenerKind
+from ..parser.scan_budget import ScanBudget, ScanBudgetExceeded
+from ..translator.controllers import ControllerRegistry
 from ..translator.layout_rules import translate_node
-
-# ===== ターゲット式（左辺）に findViewById(...) を許容する共通パターン =====
-TARGET = r'(?:[A-Za-z_][\w\.\(\)\s]*|findViewById\(\s*R\.id\.\w+\s*\))'
+from ..translator.shared_widgets import SHARED_FILE, SharedWidgets
+from ..translator.sublayouts import LayoutLibrary, SubLayouts
+from ..translator.view_rules import _fallback_handler_name, _find_handler
+from ..translator.tokens import TOKENS_FILE, DesignTokens, TokenRefs
+from ..translator.widget_ast import Widget, mark_const, print_widget, print_widget_list
 
 # =============================================================
 # Small utilities
@@ -21,21 +31,18 @@ def _dart_file_from_class(cls: str) -> str:
         out.append(ch.lower())
     return ''.join(out) + '.dart'
 
-def _collect_button_ids(ir: Dict) -> List[str]:
+def _collect_button_ids(ir: IRNode, with_onclick: bool = False) -> List[str]:
+    """
+    ボタンの id。with_onclick なら android:onClick 付きのビュー（TextView 等）も含める
+    （item / include 先でこれらは translate_view の既定ハンドラ名 _fallback_handler_name で結線される）
+    """
     ids: List[str] = []
-
-    def walk(n: Dict):
-        t = (n.get("type") or "").lower()
-        attrs = n.get("attrs", {}) or {}
-        if t.endswith("button") or t == "button":
-            rid = (attrs.get("id") or "")
+    for n in iter_nodes(ir):
+        if n.type.lower().endswith("button") or (with_onclick and n.attrs.get("onClick")):
+            rid = n.attrs.get("id") or ""
             rid = rid.split("/")[-1] if rid else ""
             if rid:
                 ids.append(rid)
-        for ch in n.get("children", []) or []:
-            walk(ch)
-
-    walk(ir)
     return ids
 
 def _to_camel(s: str) -> str:
@@ -68,16 +75,12 @@ def _id_base(raw_id: str) -> str:
         return ""
     return raw_id.split("/")[-1]  # @+id/login_button -> login_button
 
-def _collect_ids_from_ir(ir: Dict) -> Set[str]:
+def _collect_ids_from_ir(ir: IRNode) -> Set[str]:
     ids: Set[str] = set()
-    def walk(n: Dict):
-        a = n.get("attrs", {}) or {}
-        rid = a.get("id")
+    for n in iter_nodes(ir):
+        rid = n.attrs.get("id")
         if rid:
             ids.add(_id_base(rid))
-        for c in n.get("children", []) or []:
-            walk(c)
-    walk(ir)
     return ids
 
 def _id_aliases(s: str) -> Set[str]:
@@ -85,38 +88,14 @@ def _id_aliases(s: str) -> Set[str]:
     snake = re.sub(r'([a-z0-9])([A-Z])', r'\1_\2', camel).lower()
     return {s, s.lower(), camel, camel.lower(), snake, snake.lower()}
 
-def _find_import_classes(dart_text: str) -> Set[str]:
-    # 生成したハンドラ内のクラス（コンストラクタ呼び出し）を検出
-    classes: Set[str] = set()
-    for m in re.finditer(r'\b([A-Z][A-Za-z0-9_]*)\s*\(', dart_text):
-        classes.add(m.group(1))
-    return classes
-
-def _collect_needed_controllers(edittexts: List[Dict]) -> List[str]:
-    need_user = False
-    need_pass = False
-    need_confirm = False
-    for et in edittexts:
-        lower = ((et.get("hint") or "") + (et.get("id") or "") + (et.get("inputType") or "")).lower()
-        if "username" in lower or "user" in lower or "mail" in lower:
-            need_user = True
-        if "password" in lower or "textpassword" in lower:
-            if "confirm" in lower:
-                need_confirm = True
-            else:
-                need_pass = True
-    ctrls: List[str] = []
-    if need_user: ctrls.append("_usernameController")
-    if need_pass: ctrls.append("_passwordController")
-    if need_confirm: ctrls.append("_confirmPasswordController")
-    return ctrls
-
-def _root_is_scrollview(widget_tree: str) -> bool:
-    return re.match(r'\s*(SingleChildScrollView|CustomScrollView|ListView|GridView|NestedScrollView)\s*\(', widget_tree) is not None
-
-def _contains_expanders(widget_tree: str) -> bool:
-    s = widget_tree.lower()
-    return ("sizedbox.expand(" in s) or ("expanded(" in s)
+_SCROLLABLE_ROOTS = frozenset({"SingleChildScrollView", "CustomScrollView", "ListView", "GridView", "NestedScrollView",
+                               "ListView.builder", "GridView.builder"})
+
+def _root_is_scrollview(widget_tree: Widget) -> bool:
+    return widget_tree.name in _SCROLLABLE_ROOTS
+
+def _contains_expanders(widget_tree: Widget) -> bool:
+    return widget_tree.any(lambda w: w.name in ("Expanded", "SizedBox.expand"))
 
 def _cleanup_empty_statements(text: str) -> str:
     text = re.sub(r';\s*;+', ';', text)
@@ -134,44 +113,18 @@ def _derive_class_prefix(class_name: str) -> str:
 # XML helpers
 # =============================================================
 
-def _collect_edittexts(ir: Dict) -> List[Dict]:
-    result: List[Dict] = []
-    def walk(n: Dict):
-        t = n.get("type")
-        attrs = n.get("attrs", {})
-        if t == "EditText" or t == "TextInputEditText":
-            item = {
-                "id": (attrs.get("id") or "").replace("@+id/", "").replace("@id/", ""),
-                "hint": attrs.get("hint") or "",
-                "inputType": attrs.get("inputType") or "",
-            }
-            result.append(item)
-        for ch in n.get("children", []) or []:
-            walk(ch)
-    walk(ir)
-    return result
-
-def _collect_xml_onclick(ir: Dict) -> List[Tuple[str, str]]:
+def _collect_xml_onclick(ir: IRNode) -> List[Tuple[str, str]]:
     """
     XML から (viewId, onClickMethod) を収集
     例: android:onClick="openSignup", id=@+id/tvSignup -> ("tvSignup", "openSignup")
     """
     pairs: List[Tuple[str, str]] = []
-
-    def _id_base2(v: str) -> str:
-        if not v: return ""
-        return v.split("/")[-1]
-
-    def walk(n: Dict):
-        attrs = n.get("attrs", {}) or {}
+    for n in iter_nodes(ir):
+        attrs = n.attrs
         onclick = attrs.get("onClick") or attrs.get("android:onClick")
-        vid = _id_base2(attrs.get("id", ""))
+        vid = _id_base(attrs.get("id", ""))
         if onclick and vid:
             pairs.append((vid, onclick))
-        for ch in n.get("children", []) or []:
-            walk(ch)
-
-    walk(ir)
     return pairs
 
 # =============================================================
@@ -185,8 +138,11 @@ def _intent_replacement(match, class_prefix: str) -> Tuple[str, str]:
     line = f'Navigator.push(context, MaterialPageRoute(builder: (context) => const {dart_cls}()));'
     return line, dart_cls
 
-def convert_java_logic_to_dart(java_block: str, class_prefix: str) -> Tuple[str, Set[str]]:
+@profiled("java_logic")
+def convert_java_logic_to_dart(java_block: str, class_prefix: str) -> Tuple[str, Set[str], Set[str]]:
+    """return: (Dart の本体, 遷移先の画面クラス, 参照する controller（ROLE_CONTROLLERS の役割名）)"""
     imported: Set[str] = set()
+    controllers: Set[str] = set()
     # Intent 変数 -> Activity をまず収集
     intent_map = {}
     for m in re.finditer(
@@ -265,10 +221,13 @@ def convert_java_logic_to_dart(java_block: str, class_prefix: str) -> Tuple[str,
     prefix = ""
     if needs_user:
         prefix += "final username = _usernameController.text.trim();\n"
+        controllers.add("_usernameController")
     if needs_pass:
         prefix += "final password = _passwordController.text.trim();\n"
+        controllers.add("_passwordController")
     if needs_confirm:
         prefix += "final confirmPassword = _confirmPasswordController.text.trim();\n"
+        controllers.add("_confirmPasswordController")
     if prefix:
         java_block = (prefix + java_block).strip()
 
@@ -297,38 +256,12 @@ def convert_java_logic_to_dart(java_block: str, class_prefix: str) -> Tuple[str,
     )
 
     java_block = _cleanup_empty_statements(java_block)
-    return java_block, imported
+    return java_block, imported, controllers
 
 # =============================================================
 # Click handler extraction with id resolution
 # =============================================================
 
-def _build_expr_to_id_map(java_src: str) -> Dict[str, str]:
-    """
-    Java ソースから「式(変数名など) -> id名」の対応表を作る。
-    - var = findViewById(R.id.foo)
-    - 代入の別名伝播: a = b; （b が既に foo に解決されていれば a -> foo）
-    """
-    expr2id: Dict[str, str] = {}
-
-    # 直接 findViewById 代入
-    for m in re.finditer(r'\b(\w+)\s*=\s*findViewById\(\s*R\.id\.(\w+)\s*\)', java_src):
-        var, _id = m.group(1), m.group(2)
-        expr2id[var] = _id
-
-    # 別名伝播（数回）
-    for _ in range(4):
-        changed = False
-        for m in re.finditer(r'\b(\w+)\s*=\s*(\w+)\s*;', java_src):
-            left, right = m.group(1), m.group(2)
-            if right in expr2id and left not in expr2id:
-                expr2id[left] = expr2id[right]
-                changed = True
-        if not changed:
-            break
-
-    return expr2id
-
 def _resolve_target_expr_to_id(target_expr: str, expr2id: Dict[str, str]) -> Optional[str]:
     """
     setOnClick のターゲット式 -> id名 へ解決。
@@ -337,6 +270,9 @@ def _resolve_target_expr_to_id(target_expr: str, expr2id: Dict[str, str]) -> Opt
       - 変数名                -> expr2id 参照
     """
     s = target_expr.strip()
+    # ((Button) findViewById(...)) のような外側の括弧を外す
+    while s.startswith("(") and s.endswith(")"):
+        s = s[1:-1].strip()
 
     # 直接 findViewById(...)
     m = re.match(r'(?:\(\s*\w+\s*\)\s*)?findViewById\s*\(\s*R\.id\.(\w+)\s*\)\s*', s)
@@ -354,83 +290,113 @@ def _resolve_target_expr_to_id(target_expr: str, expr2id: Dict[str, str]) -> Opt
 
     return None
 
-def _extract_method_body(java_code: str, method_name: str) -> Optional[str]:
-    """
-    Java の this::method / 単純メソッド呼び出しで参照されるメソッド本体を抽出。
-    例:
-      private void openSignup(View v) { ... }
-      public  void openSignup(...)    { ... }
-    """
-    pat = re.compile(
-        r'(?:public|private|protected)?\s+void\s+'
-        + re.escape(method_name) +
-        r'\s*\([^)]*\)\s*\{(?P<body>.*?)\}\s*',
-        re.DOTALL
-    )
-    m = pat.search(java_code)
-    return (m.group('body').strip() if m else None)
-
-# 変更後（第3引数に all_sources を追加）
-def _inline_single_call(block: str, java_code: str, all_sources: Optional[List[str]] = None) -> str:
-    m = re.fullmatch(r'\s*(?:this\.)?(\w+)\s*\([^;]*\)\s*;?\s*', block or '')
-    if not m:
-        return block
-    method = m.group(1)
-    body = _extract_method_body(java_code, method)
-    if not body and all_sources:
-        body = _find_method_body_in_sources(all_sources, method)
-    return (body if body else block)
-
-def _extract_onclick_cases(java_code: str) -> Dict[str, str]:
+# ----- レキサ上で使うパターン（いずれも本体は括弧対応表で切り出すので .*? を使わない）-----
+# setOnXxxListener( の位置・onClick 宣言・findViewById / 別名代入は JavaIndex の 1 パスで拾い済み（ListenerScan）。
+# ここのパターンはその位置から先の有限範囲（引数・メソッド本体）にだけ当てる
+_SWITCH_GETID_RE = re.compile(r'\bswitch\s*\(\s*\w+\.getId\(\)\s*\)\s*\{')
+_IF_GETID_RE = re.compile(
+    r'\bif\s*\(\s*(?:\w+\.getId\(\)\s*==\s*R\.id\.(\w+)|R\.id\.(\w+)\s*==\s*\w+\.getId\(\))\s*\)\s*\{'
+)
+_LAMBDA_HEAD_RE = re.compile(r'\s*(?:\w+|\([^()]*\))\s*->\s*')
+_METHOD_REF_RE = re.compile(r'\s*this\s*::\s*(\w+)\s*')
+
+def _extract_onclick_cases(lexed: LexedSource, callbacks: Iterable[int]) -> Dict[str, str]:
     """
     Activity が implements OnClickListener し、onClick(View v) の中で
     v.getId() に対して if / switch で分岐するパターンを抽出。
+    callbacks: onClick(View v) の本体の { の位置（ListenerScan.callbacks。出現順）
     返り値: { 'tvSignup': '...java body...' , ... }
     """
     results: Dict[str, str] = {}
+    code = lexed.code
 
-    # onClick 本体を取り出す（スタイル差異を許容）
-    m = re.search(
-        r'(?:public|private|protected)?\s+void\s+onClick\s*\(\s*View\s+\w+\s*\)\s*\)\s*\{(?P<body>.*?)\}\s*',
-        java_code, flags=re.DOTALL
-    )
-    if not m:
-        m = re.search(
-            r'(?:public|private|protected)?\s+void\s+onClick\s*\(\s*View\s+\w+\s*\)\s*\{(?P<body>.*?)\}\s*',
-            java_code, flags=re.DOTALL
-        )
-        if not m:
-            return results
-    body = m.group('body')
+    # onClick(View v) は匿名クラス内にもあり得るので、全宣言を見て getId 分岐を持つものを拾う
+    for open_brace in callbacks:
+        close = lexed.closing(open_brace)
+        if close is None:
+            continue
 
-    # switch (v.getId()) { case R.id.xxx: ... break; }
-    for mcase in re.finditer(
-        r'case\s+R\.id\.(\w+)\s*:\s*(?P<block>.*?)\bbreak\s*;',
-        body, flags=re.DOTALL
-    ):
-        _id = mcase.group(1)
-        block = mcase.group('block').strip()
-        results[_id] = block
-
-    # if (v.getId() == R.id.xxx) { ... }
-    for mif in re.finditer(
-        r'if\s*\(\s*\w+\.getId\(\)\s*==\s*R\.id\.(\w+)\s*\)\s*\{(?P<block>.*?)\}',
-        body, flags=re.DOTALL
-    ):
-        _id = mif.group(1)
-        block = mif.group('block').strip()
-        results[_id] = block
+        # switch (v.getId()) { case R.id.xxx: ... break; }
+        for msw in _SWITCH_GETID_RE.finditer(code, open_brace, close):
+            for ids, block in switch_cases(lexed, msw.end() - 1):
+                for _id in ids:
+                    results[_id] = block
+
+        # if (v.getId() == R.id.xxx) { ... }
+        for mif in _IF_GETID_RE.finditer(code, open_brace, close):
+            _id = mif.group(1) or mif.group(2)
+            block = lexed.block_text(mif.end() - 1)
+            if block is not None:
+                results[_id] = block
 
     return results
 
+def _classify_listener(lexed: LexedSource, open_paren: int, kind: ListenerKind = CLICK) -> Optional[Tuple[str, str]]:
+    """
+    setOnXxxListener( ... ) の引数を分類する（匿名クラスは kind のインタフェースとコールバックで見る）。
+      ("lambda", java_body)     ラムダ {…} の本体
+      ("anonymous", java_body)  匿名クラスのコールバック（onClick 等）本体
+      ("expr",  java_expr)      ブレース無しラムダ
+      ("ref",   method)     this::method
+      ("this",  "")         this デリゲート
+    """
+    close = lexed.closing(open_paren)
+    if close is None:
+        return None
+    start = open_paren + 1
+    arg_code = lexed.code[start:close]
+
+    if arg_code.strip() == "this":
+        return ("this", "")
+    m = _METHOD_REF_RE.fullmatch(arg_code)
+    if m:
+        return ("ref", m.group(1))
+
+    m = _LAMBDA_HEAD_RE.match(arg_code)
+    if m:
+        body_pos = start + m.end()
+        if lexed.code.startswith("{", body_pos):
+            body = lexed.block_text(body_pos)
+            return ("lambda", body) if body is not None else None
+        expr = lexed.text[body_pos:close].strip().rstrip(";").strip()
+        return ("expr", expr)
+
+    m = kind.anon_re.match(arg_code)
+    if m:
+        cls_open = start + m.end() - 1
+        cls_close = lexed.closing(cls_open)
+        if cls_close is None:
+            return None
+        mo = kind.callback_re.search(lexed.code, cls_open, cls_close)
+        if mo:
+            body = lexed.block_text(mo.end() - 1)
+            return ("anonymous", body) if body is not None else None
+    return None
+
+def _handler_code(func_name: str, dart_logic: str) -> str:
+    return f"""
+  void {func_name}(BuildContext context) {{
+    {dart_logic if dart_logic else '// (no logic)'}
+  }}
+""".rstrip()
+
+@profiled("handlers")
 def extract_click_handlers_from_java(
     java_code: str,
     class_prefix: str,
-    all_sources: Optional[List[str]] = None
-) -> Tuple[List[Tuple[str, str, str]], Set[str]]:
+    all_sources: Optional[List[str]] = None,
+    index: Optional[JavaIndex] = None,
+    source_id: Optional[int] = None,
+    scope: Optional[Set[int]] = None,
+) -> Tuple[List[Tuple[str, str, str]], Dict[str, Set[str]], Dict[str, Set[str]]]:
     """
     Java コードからクリックハンドラを抽出。
-    返り値: [(id_key, func_name, handler_code)], {imported_class_names}
+    返り値: [(id_key, func_name, handler_code)], {id_key: そのハンドラが遷移する画面クラス},
+            {id_key: そのハンドラが参照する controller}
+
+    index: プロジェクト全体の JavaIndex（無ければ all_sources から作る）
+    source_id: java_code の index 内での番号（同一ファイルのメソッドを優先して解決する）
+    scope: メソッド本体を探す source_id の範囲（画面に関係するファイルのみ。None なら全ファイル）
 
     対応パターン:
       1) target.setOnClickListener(v -> { ... })
@@ -441,261 +407,202 @@ def extract_click_handlers_from_java(
       3b) setOnClickListener(this) を取り逃がしても onClick 分岐があればフォールバックで採用
     """
     handlers: List[Tuple[str, str, str]] = []
-    imports: Set[str] = set()
-
-    # 変数名 → XML id の対応表
-    expr2id = _build_expr_to_id_map(java_code)
-
-    # ------- 正規表現（改行/空白/ドットの前後を許容）-------
-    # 1) ラムダ/匿名クラス（ブレースあり）
-    pat = re.compile(
-        rf'({TARGET})\s*\.\s*setOnClickListener\s*\('
-        r'(?:new\s+(?:\w+\.)?OnClickListener\(\)\s*\{.*?onClick\s*\(\s*[^)]*\s*\)\s*\{(.*?)\}\s*\}'
-        r'|\s*(?:\w+|\([^)]*\))\s*->\s*\{(.*?)\}\s*)\)\s*;',
-        re.DOTALL
-    )
-
-    # 1a) ブレース無しの 1 行ラムダ
-    pat_arrow_no_brace = re.compile(
-        rf'({TARGET})\s*\.\s*setOnClickListener\s*\('
-        r'\s*(?:\w+|\([^)]*\))\s*->\s*(?!\{)\s*([^;]+?)\s*;\s*\)\s*;',
-        re.DOTALL
-    )
-
-    # 2) メソッド参照 this::method
-    pat_ref = re.compile(
-        rf'({TARGET})\s*\.\s*setOnClickListener\s*\(\s*this::(\w+)\s*\)\s*;'
-    )
+    imports: Dict[str, Set[str]] = {}
+    controllers: Dict[str, Set[str]] = {}
+
+    if index is None:
+        index = JavaIndex.build(all_sources or [java_code])
+        if source_id is None and not all_sources:
+            source_id = 0
+    if source_id is None:
+        # java_code が索引外なら、同一ファイル優先の解決用にこのファイルだけ索引する
+        local = JavaIndex.build([java_code])
+        lexed = local.lexed[0]
+        listeners = local.listeners_for(0)
+        def _find_body(name: str) -> Optional[str]:
+            return local.find_method_body(name, 0) or index.find_method_body(name, scope=scope)
+    else:
+        lexed = index.lexed[source_id]
+        listeners = index.listeners_for(source_id)
+        def _find_body(name: str) -> Optional[str]:
+            return index.find_method_body(name, source_id, scope)
 
-    # 3) this デリゲート
-    pat_this_delegate = re.compile(
-        rf'({TARGET})\s*\.\s*setOnClickListener\s*\(\s*this\s*\)\s*;'
-    )
+    # 変数名 → XML id の対応表（findViewById 代入 + 別名代入。いずれも索引時に収集済み）
+    expr2id = listeners.expr_to_id()
 
-    # （任意）デバッグ：各パターンのヒット件数
-    try:
-        print(
-            "[DEBUG] match counts:",
-            len(list(pat.finditer(java_code))),
-            len(list(pat_arrow_no_brace.finditer(java_code))),
-            len(list(pat_ref.finditer(java_code))),
-            len(list(pat_this_delegate.finditer(java_code))),
-        )
-    except Exception:
-        pass
-
-    # ------- ヘルパ：単一呼び出しをメソッド本体に展開（2引数/3引数どちらの実装でも動くように） -------
+    # ------- ヘルパ：単一呼び出しをメソッド本体に展開 -------
     def _inline(block_or_expr: str) -> str:
-        # まず 3 引数版 _inline_single_call(block, java_code, all_sources) を試す
-        try:
-            return _inline_single_call(block_or_expr, java_code, all_sources)
-        except TypeError:
-            # 2 引数版 _inline_single_call(block, java_code) しか無い場合
-            body = _inline_single_call(block_or_expr, java_code)
-            # なお、それでも見つからなければ all_sources 横断で直接探す
-            m = re.fullmatch(r'\s*(?:this\.)?(\w+)\s*\([^;]*\)\s*;?\s*', block_or_expr or '')
-            if not m:
-                return body
-            meth = m.group(1)
-            if (not body) and all_sources:
-                try:
-                    # 3 引数版が無い環境向けフォールバック
-                    mb = _find_method_body_in_sources(all_sources, meth)
-                    return (mb if mb else block_or_expr)
-                except Exception:
-                    return body or block_or_expr
-            return body or block_or_expr
-
-    # ------- 1) ラムダ/匿名クラス（ブレースあり） -------
-    for m in pat.finditer(java_code):
-        target_expr = m.group(1)
-        raw_block = (m.group(2) or m.group(3) or "").strip()
-        block = _inline(raw_block)  # 単一呼び出しならメソッド本体へ展開
-        view_id = _resolve_target_expr_to_id(target_expr, expr2id) or target_expr.split('.')[-1]
-
-        func_name = _func_name_from_viewkey(view_id)
-        dart_logic, needed_imports = convert_java_logic_to_dart(block, class_prefix)
-        imports |= needed_imports
-
-        handler_code = f"""
-  void {func_name}(BuildContext context) {{
-    {dart_logic if dart_logic else '// (no logic)'}
-  }}
-""".rstrip()
-        handlers.append((view_id, func_name, handler_code))
-
-    # ------- 1a) ブレース無しの 1 行ラムダ -------
-    for m in pat_arrow_no_brace.finditer(java_code):
-        target_expr = m.group(1)
-        expr = (m.group(2) or "").strip()
-        block = _inline(expr + ";")
-        view_id = _resolve_target_expr_to_id(target_expr, expr2id) or target_expr.split('.')[-1]
-
-        func_name = _func_name_from_viewkey(view_id)
-        dart_logic, needed_imports = convert_java_logic_to_dart(block, class_prefix)
-        imports |= needed_imports
-
-        handler_code = f"""
-  void {func_name}(BuildContext context) {{
-    {dart_logic if dart_logic else '// (no logic)'}
-  }}
-""".rstrip()
-        handlers.append((view_id, func_name, handler_code))
-
-    # ------- 2) メソッド参照: setOnClickListener(this::openXxx) -------
-    for m in pat_ref.finditer(java_code):
-        target_expr = m.group(1)
-        method_name = m.group(2)
-        view_id = _resolve_target_expr_to_id(target_expr, expr2id) or target_expr.split('.')[-1]
-
-        # まず同一ファイルを探し、無ければ全ソース横断
-        method_body = _extract_method_body(java_code, method_name)
-        if not method_body and all_sources:
-            try:
-                method_body = _find_method_body_in_sources(all_sources, method_name)
-            except Exception:
-                pass
-        method_body = method_body or ""
+        m = re.fullmatch(r'\s*(?:this\.)?(\w+)\s*\([^;]*\)\s*;?\s*', block_or_expr or '')
+        if not m:
+            return block_or_expr
+        return _find_body(m.group(1)) or block_or_expr
 
+    def _add(view_id: str, java_block: str, pattern: str) -> None:
         func_name = _func_name_from_viewkey(view_id)
-        dart_logic, needed_imports = convert_java_logic_to_dart(method_body, class_prefix)
-        imports |= needed_imports
-
-        handler_code = f"""
-  void {func_name}(BuildContext context) {{
-    {dart_logic if dart_logic else '// (no logic)'}
-  }}
-""".rstrip()
-        handlers.append((view_id, func_name, handler_code))
-
-    # ------- 3) this デリゲート: setOnClickListener(this) + onClick(View v) 内で v.getId() 分岐 -------
-    onclick_map = _extract_onclick_cases(java_code)  # {id: java_body}
-    if onclick_map:
-        try:
-            print("[DEBUG] onclick_map ids:", list(onclick_map.keys()))
-        except Exception:
-            pass
-
-        # 通常ルート：this をセットしている対象が分かる場合
-        for m in pat_this_delegate.finditer(java_code):
-            target_expr = m.group(1)
-            view_id = _resolve_target_expr_to_id(target_expr, expr2id) or target_expr.split('.')[-1]
-            java_body = onclick_map.get(view_id)
-            if not java_body:
+        dart_logic, needed_imports, needed_controllers = convert_java_logic_to_dart(java_block, class_prefix)
+        metrics.count(metrics.LISTENER_PATTERNS, pattern)
+        if not dart_logic:
+            metrics.count(metrics.STUB_HANDLERS, "no_logic")
+        imports.setdefault(view_id, set()).update(needed_imports)
+        controllers.setdefault(view_id, set()).update(needed_controllers)
+        handlers.append((view_id, func_name, _handler_code(func_name, dart_logic)))
+
+    label = (index.paths[source_id] if source_id is not None else None) or "<java source>"
+    budget = ScanBudget(label)
+    try:
+        onclick_map = _extract_onclick_cases(lexed, listeners.callbacks.get(CLICK.name, ()))  # {id: java_body}
+        if onclick_map and log.enabled(log.DEBUG):
+            log.debug("onclick_map ids: %s", list(onclick_map.keys()))
+
+        # ------- setOnXxxListener( の呼び出し箇所を出現順に 1 回ずつ処理 -------
+        for site in listeners.sites:
+            budget.check()
+            if site.kind is not CLICK:
+                # 長押し・チェック変更等は位置だけ記録済み（Dart 側の結線は未対応なので数えるだけ）
+                metrics.count(metrics.UNTRANSLATED_LISTENERS, site.kind.setter)
+                continue
+            kind = _classify_listener(lexed, site.open_paren, site.kind)
+            if kind is None:
+                continue
+            target_expr = lexed.text[lexed.expression_start(site.dot):site.dot]
+            view_id = _resolve_target_expr_to_id(target_expr, expr2id)
+            if view_id is None:
+                # R.id に結び付かない対象（メソッドの戻り値、フィールド経由等）は末尾の名前で代用する
+                metrics.count(metrics.UNRESOLVED_TARGETS, target_expr.strip())
+                view_id = target_expr.strip().split('.')[-1]
+            if not view_id:
                 continue
 
-            func_name = _func_name_from_viewkey(view_id)
-            dart_logic, needed_imports = convert_java_logic_to_dart(java_body, class_prefix)
-            imports |= needed_imports
-
-            handler_code = f"""
-  void {func_name}(BuildContext context) {{
-    {dart_logic if dart_logic else '// (no logic)'}
-  }}
-""".rstrip()
-            handlers.append((view_id, func_name, handler_code))
-
-        # ★ フォールバック：setOnClickListener(this) の検出自体を取り逃しても、
-        # onClick の分岐に R.id.<id> が居れば、その id は採用（XML に存在する id のみ後段で残る）
-        for view_id, java_body in onclick_map.items():
-            if any(h[0] == view_id for h in handlers):
-                continue  # 既に作成済みなら重複回避
-            func_name = _func_name_from_viewkey(view_id)
-            dart_logic, needed_imports = convert_java_logic_to_dart(java_body, class_prefix)
-            imports |= needed_imports
-
-            handler_code = f"""
-  void {func_name}(BuildContext context) {{
-    {dart_logic if dart_logic else '// (no logic)'}
-  }}
-""".rstrip()
-            handlers.append((view_id, func_name, handler_code))
-
-    return handlers, imports
-
-
-def _patch_android_activity_calls(dart_code: str) -> str:
+            what, payload = kind
+            if what in ("lambda", "anonymous"):
+                # 1) ラムダ/匿名クラス（ブレースあり）。単一呼び出しならメソッド本体へ展開
+                _add(view_id, _inline(payload), what)
+            elif what == "expr":
+                # 1a) ブレース無しの 1 行ラムダ
+                _add(view_id, _inline(payload + ";"), "expr_lambda")
+            elif what == "ref":
+                # 2) メソッド参照: まず同一ファイルを探し、無ければ全ソース横断（いずれも索引引き）
+                _add(view_id, _find_body(payload) or "", "method_ref")
+            elif what == "this":
+                # 3) this デリゲート: onClick(View v) 内の v.getId() 分岐
+                java_body = onclick_map.get(view_id)
+                if java_body:
+                    _add(view_id, java_body, "this_switch")
+                else:
+                    metrics.count(metrics.UNRESOLVED_TARGETS, view_id)
+    except ScanBudgetExceeded as e:
+        # 1 ファイルで全体を止めないよう、このファイルは打ち切って報告する
+        log.warn(f"Skipping handler extraction: {e}")
+        index.skipped.append((label, str(e)))
+        return [], {}, {}
+
+    # ★ フォールバック：setOnClickListener(this) の検出自体を取り逃しても、
+    # onClick の分岐に R.id.<id> が居れば、その id は採用（XML に存在する id のみ後段で残る）
+    for view_id, java_body in onclick_map.items():
+        if any(h[0] == view_id for h in handlers):
+            continue  # 既に作成済みなら重複回避
+        _add(view_id, java_body, "onclick_fallback")
+
+    return handlers, imports, controllers
+
+
+def _patch_android_activity_calls(dart_code: str, imports: Optional["ScreenImports"] = None) -> str:
+    """ハンドラ本体の Activity API を Navigator 等に置き換える（SystemNavigator を出したら services を記録）"""
     # isTaskRoot() -> !Navigator.canPop(context)
     dart_code = re.sub(r'\bisTaskRoot\s*\(\s*\)', '!Navigator.canPop(context)', dart_code)
     # finish(); -> maybePop()
     dart_code = re.sub(r'\bfinish\s*\(\s*\)\s*;', 'Navigator.of(context).maybePop();', dart_code)
 
     # SystemNavigator.pop() の import 追加（必要時）
-    dart_code = re.sub(
+    dart_code, n = re.subn(
         r'if\s*\(\s*!?isTaskRoot\s*\(\s*\)\s*\)\s*\{',
         'if (!Navigator.canPop(context)) { SystemNavigator.pop();',
         dart_code
     )
-    if 'SystemNavigator.pop()' in dart_code and "import 'package:flutter/services.dart'" not in dart_code:
-        dart_code = "import 'package:flutter/services.dart';\n" + dart_code
+    if n and imports is not None:
+        imports.add_package("package:flutter/services.dart")
     return dart_code
 
 # =============================================================
 # Dart code building
 # =============================================================
 
-def _build_imports_line(import_classes: Set[str], output_path: str) -> str:
-    lines = ["import 'package:flutter/material.dart';"]
-    base = os.path.basename(output_path)
-    out_dir = os.path.dirname(output_path)
-    for cls in sorted(import_classes):
-        dart_file = f"{_camel_to_snake(cls)}.dart"
-        if dart_file != base:
-            candidate_path = os.path.join(out_dir, dart_file)
-            if os.path.exists(candidate_path):  # ← 実在チェック
-                lines.append(f"import '{dart_file}';")
-    return "\n".join(lines)
-
-def _inject_controllers_into_widget_tree(widget_tree: str, edittexts: List[Dict]) -> str:
-    for et in edittexts:
-        hint = (et.get("hint") or "").strip().strip('"').strip("'")
-        itype = et.get("inputType") or ""
-        vid = et.get("id") or ""
-        controller_name = None
-        obscure = False
-        lower = (hint + vid).lower()
-
-        if "password" in lower or "textpassword" in itype.lower():
-            if "confirm" in lower:
-                controller_name = "_confirmPasswordController"
-            else:
-                controller_name = "_passwordController"
-            obscure = True
-        elif "username" in lower or "user" in lower or "mail" in lower:
-            controller_name = "_usernameController"
-        else:
-            continue
-
-        pattern = re.compile(
-            r'TextField\(\s*decoration:\s*InputDecoration\(\s*hintText:\s*"' + re.escape(hint) + r'"\s*\)\s*\)'
-        )
-
-        def _repl(_):
-            if obscure:
-                return f'TextField(controller: {controller_name}, obscureText: true, decoration: InputDecoration(hintText: "{hint}"))'
-            else:
-                return f'TextField(controller: {controller_name}, decoration: InputDecoration(hintText: "{hint}"))'
-
-        widget_tree, _ = pattern.subn(_repl, widget_tree, count=1)
-    return widget_tree
+class ScreenImports:
+    """
+    1 画面分の import。生成中に参照したもの（遷移先の画面クラス、SystemNavigator の services 等）を
+    その場で記録し、最後に import 行へ変換する。生成済みテキストを読み直して推測はしない。
+    """
+    def __init__(self):
+        self.packages: Set[str] = {"package:flutter/material.dart"}
+        self.screens: Set[str] = set()
+        self.files: Set[str] = set()
+
+    def add_package(self, uri: str) -> None:
+        self.packages.add(uri)
+
+    def add_file(self, path: str) -> None:
+        """同じ出力ディレクトリの共有ファイル（tokens.dart 等）"""
+        self.files.add(path)
+
+    def add_screen(self, dart_cls: str) -> None:
+        self.screens.add(dart_cls)
+
+    def lines(self, class_name: str, class_files: Optional[Dict[str, str]] = None) -> List[str]:
+        """
+        class_files: プロジェクト全体の 画面クラス → Dart ファイル（バッチ実行時に 1 度だけ作る）。
+                     載っていないクラス（単一変換時など）は命名規則からファイル名を決める。
+        """
+        out = [f"import '{uri}';" for uri in sorted(self.packages)]
+        files = set(self.files)
+        for cls in self.screens:
+            if cls == class_name:
+                continue
+            files.add((class_files or {}).get(cls) or _dart_file_from_class(cls))
+        out.extend(f"import '{f}';" for f in sorted(files))
+        return out
+
+def _scaffold(class_name: str, body: Widget) -> Widget:
+    return Widget(
+        "Scaffold",
+        appBar=Widget("AppBar", title=Widget("Text", f"'{class_name}'", const=True)),
+        body=body,
+        multiline=True,
+    )
 
-def _wrap_as_widget_class(class_name: str, widget_tree: str, handlers_code: str,
-                          need_stateful: bool, use_scrollview: bool, controllers: List[str]) -> str:
+def _builder_methods(sublayouts: SubLayouts) -> str:
+    """リストの 1 行分 / <include> 先レイアウトの builder メソッド（クラス内、インデント 1 段）"""
+    out = []
+    for e in sublayouts.entries():
+        body = print_widget_list(e.widget, level=2) if e.merge else print_widget(e.widget, level=2)
+        out.append(f"""  {sublayouts.signature(e)} {{
+    return {body};
+  }}""")
+    return "\n\n".join(out)
+
+def _wrap_as_widget_class(class_name: str, widget_tree: Widget, handlers_code: str,
+                          need_stateful: bool, use_scrollview: bool, controllers: List[str],
+                          builders: Optional[SubLayouts] = None,
+                          const_classes: Iterable[str] = (), list_items: List[str] = ()) -> str:
     if use_scrollview:
-        body_expr = (
-            "SingleChildScrollView("
-            "child: ConstrainedBox("
-            "  constraints: BoxConstraints(minWidth: double.infinity),"
-            "  child: Column(mainAxisSize: MainAxisSize.min, crossAxisAlignment: CrossAxisAlignment.stretch, children: ["
-            f"{widget_tree}"
-            "  ]),"
-            "),)"
-        )
+        body_expr = Widget("SingleChildScrollView", child=Widget(
+            "ConstrainedBox",
+            constraints=Widget("BoxConstraints", minWidth="double.infinity"),
+            child=Widget("Column", mainAxisSize="MainAxisSize.min",
+                         crossAxisAlignment="CrossAxisAlignment.stretch", children=[widget_tree]),
+        ))
     else:
         body_expr = widget_tree
+    # setState のたびに作り直さないよう、定数の部分木は const にする（Scaffold / AppBar は対象外）
+    mark_const(body_expr, const_classes)
+    # build() の return 位置（インデント 2 段）から 1 回で整形する
+    scaffold = print_widget(_scaffold(class_name, body_expr), level=2)
 
-    ctrl_fields  = "\n  ".join([f"final TextEditingController {c} = TextEditingController();" for c in controllers])
+    ctrl_fields  = "\n  ".join([f"final TextEditingController {c} = TextEditingController();" for c in controllers]
+                              + [f"List<Object> {f} = [];" for f in list_items])
     ctrl_dispose = "\n    ".join([f"{c}.dispose();" for c in controllers])
+    builders_code = ""
+    if builders is not None and builders.entries():
+        builders_code = "\n\n  // ===== Auto-Generated Layout Builders =====\n" + _builder_methods(builders)
 
     if need_stateful:
         return f"""class {class_name} extends StatefulWidget {{
@@ -706,7 +613,7 @@ def _wrap_as_widget_class(class_name: str, widget_tree: str, handlers_code: str,
 }}
 
 class _{class_name}State extends State<{class_name}> {{
-  {ctrl_fields if controllers else ''}
+  {ctrl_fields}
 
   @override
   void dispose() {{
@@ -716,11 +623,8 @@ class _{class_name}State extends State<{class_name}> {{
 
   @override
   Widget build(BuildContext context) {{
-    return Scaffold(
-      appBar: AppBar(title: const Text('{class_name}')),
-      body: {body_expr},
-    );
-  }}
+    return {scaffold};
+  }}{builders_code}
 
   // ===== Auto-Generated Handlers (State Internal) =====
 {handlers_code.strip() if handlers_code.strip() else '// (no handlers)'}
@@ -732,11 +636,8 @@ class _{class_name}State extends State<{class_name}> {{
 
   @override
   Widget build(BuildContext context) {{
-    return Scaffold(
-      appBar: AppBar(title: const Text('{class_name}')),
-      body: {body_expr},
-    );
-  }}
+    return {scaffold};
+  }}{builders_code}
 }}
 """
 
@@ -744,45 +645,63 @@ class _{class_name}State extends State<{class_name}> {{
 # Public entry point
 # =============================================================
 
-def _gather_java_sources(java_path: str) -> List[str]:
+def _gather_java_files(java_path: str) -> List[Tuple[str, str]]:
+    """Java ファイルを (path, source) のリストで返す（--java / --java-root 共通）"""
     if os.path.isfile(java_path):
         with open(java_path, "r", encoding="utf-8") as f:
-            return [f.read()]
-    srcs: List[str] = []
-    for root, _, files in os.walk(java_path):
-        for fn in files:
+            return [(java_path, f.read())]
+    files_out: List[Tuple[str, str]] = []
+    for root, dirs, files in os.walk(java_path):
+        dirs.sort()  # 走査順を固定（「最初に見つかった定義」を実行環境に依存させない）
+        for fn in sorted(files):
             if fn.endswith(".java"):
                 p = os.path.join(root, fn)
                 try:
                     with open(p, "r", encoding="utf-8") as f:
-                        srcs.append(f.read())
+                        files_out.append((p, f.read()))
                 except Exception:
                     pass
-    return srcs
-
-def _find_method_body_in_sources(java_sources: List[str], method_name: str) -> Optional[str]:
-    pat = re.compile(
-        r'(?:public|private|protected)?\s+void\s+'
-        + re.escape(method_name) +
-        r'\s*\([^)]*\)\s*\{(?P<body>.*?)\}\s*',
-        re.DOTALL
-    )
-    for js in java_sources:
-        m = pat.search(js)
-        if m:
-            return m.group('body').strip()
-    return None
+    return files_out
 
-def render_screen(ir, resolver, logic_map, java_path, output_path, class_name):
-    print(f"[INFO] Generating Dart from XML+Java -> {output_path}")
-    edittexts = _collect_edittexts(ir)
+def _gather_java_sources(java_path: str) -> List[str]:
+    return [src for (_, src) in _gather_java_files(java_path)]
+
+def render_screen(ir, resolver, logic_map, java_path, output_path, class_name,
+                  java_sources: Optional[List[str]] = None,
+                  java_index: Optional[JavaIndex] = None,
+                  layout_name: Optional[str] = None,
+                  class_files: Optional[Dict[str, str]] = None,
+                  tokens: Optional[DesignTokens] = None,
+                  layouts: Optional[LayoutLibrary] = None,
+                  shared: Optional[SharedWidgets] = None) -> List[str]:
+    """
+    1 画面分の Dart を生成して output_path に書き出す。
+    java_sources: 読み込み済みの Java ソース（バッチ実行時に全画面で共有）。
+                  None の場合は java_path から読み込む。
+    java_index: java_sources の JavaIndex（None ならここで 1 パスで作る）
+    layout_name: レイアウト名（例: activity_login）。setContentView / inflate で
+                 このレイアウトを使うクラスが分かれば、そのクラスと参照先だけを解析する
+    class_files: 画面クラス → Dart ファイル名（プロジェクト全体で 1 つ。遷移先の import に使う）
+    tokens: プロジェクト共通のデザイントークン（tokens.dart）。None なら色・寸法・文字列をリテラルで書く
+    layouts: res/layout のレイアウト表（item / <include> 先のレイアウトを実行中 1 度だけ変換して共有する）
+    shared: プロジェクト内で重複する部分木の共有クラス（shared_widgets.dart）。None なら画面内にそのまま書く
+    return: 出力が依存する他のレイアウト XML（item / include 先。キャッシュの依存関係用）
+    """
+    log.info(f"Generating Dart from XML+Java -> {output_path}")
 
     handlers: List[Tuple[str, str, str]] = []
-    import_classes: Set[str] = set()
+    imports = ScreenImports()
     handlers_code = ""
+    # 変換したハンドラ本体が参照する controller の役割名（入力欄が無くても State に宣言する）
+    referenced_controllers: Set[str] = set()
+
+    # <include> 先のレイアウト（実行中 1 度だけ変換済み）。中の id も画面の id として Java のハンドラを拾う
+    included = layouts.includes_of(ir) if layouts is not None else []
 
     # XML 側 id 一覧
     xml_ids = _collect_ids_from_ir(ir)
+    for entry in included:
+        xml_ids |= _collect_ids_from_ir(entry.ir)
     xml_id_aliases: Set[str] = set()
     for x in xml_ids:
         xml_id_aliases |= _id_aliases(x)
@@ -791,21 +710,40 @@ def render_screen(ir, resolver, logic_map, java_path, output_path, class_name):
     class_prefix = _derive_class_prefix(class_name)
 
     # ---- Java 解析 ----
-    java_sources: List[str] = []
-    if java_path and os.path.exists(java_path):
-        java_sources = _gather_java_sources(java_path)
-        # render_screen 内、java_sources 取得直後
-        print(f"[DEBUG] java files loaded: {len(java_sources)}")
+    scope: Optional[Set[int]] = None
+    if java_sources is None and java_path and os.path.exists(java_path):
+        with phase("java_gather"):
+            java_sources = _gather_java_sources(java_path)
+    if java_sources is not None and java_index is None:
+        with phase("java_index"):
+            java_index = JavaIndex.build(java_sources)
+    if java_sources is not None:
+        log.debug("java files loaded: %d", len(java_sources))
+
+        related = java_index.related_sources(layout_name)
+        if related is None:
+            if layout_name:
+                log.debug("no class inflates layout '%s'; scanning all java files", layout_name)
+            related = list(range(len(java_sources)))
+            scope = None
+        else:
+            if log.enabled(log.DEBUG):
+                log.debug("layout '%s' -> java files: %s", layout_name, [java_index.paths[i] or i for i in related])
+            scope = set(related)
 
         collected: List[Tuple[str, str, str]] = []
-        for js in java_sources:
-            h, imps = extract_click_handlers_from_java(js, class_prefix, all_sources=java_sources)
-            import_classes |= imps
+        for sid in related:
+            h, imps, ctrls = extract_click_handlers_from_java(
+                java_sources[sid], class_prefix, index=java_index, source_id=sid, scope=scope
+            )
             for (key, func, code) in h:
                 # XML に存在する id のみ採用
                 if _id_aliases(key) & xml_id_aliases:
                     collected.append((key, func, code))
-                    import_classes |= _find_import_classes(code)
+                    imports.screens |= imps.get(key, set())
+                    referenced_controllers |= ctrls.get(key, set())
+                else:
+                    metrics.count(metrics.HANDLERS_DROPPED, key)
 
         # id 重複は最後勝ちでユニーク化
         uniq: Dict[str, Tuple[str, str, str]] = {}
@@ -814,9 +752,9 @@ def render_screen(ir, resolver, logic_map, java_path, output_path, class_name):
 
         handlers = list(uniq.values())
         handlers_code = "\n\n".join(h[2] for h in handlers)
-        # render_screen 内、collected 決定後
-        print("[DEBUG] collected handlers:", [(k, f) for (k, f, _) in collected])
-        print("[DEBUG] xml ids:", list(xml_ids))
+        if log.enabled(log.DEBUG):
+            log.debug("collected handlers: %s", [(k, f) for (k, f, _) in collected])
+            log.debug("xml ids: %s", list(xml_ids))
 
         # render_screen(...) の中、Java から handlers を集め終わった直後に追加
         button_ids = _collect_button_ids(ir)
@@ -828,6 +766,7 @@ def render_screen(ir, resolver, logic_map, java_path, output_path, class_name):
         for vid in button_ids:
             if vid in handled:
                 continue
+            metrics.count(metrics.STUB_HANDLERS, "button")
             func = _func_name_from_viewkey(vid)
             stub = f"""
         void {func}(BuildContext context) {{
@@ -844,19 +783,25 @@ def render_screen(ir, resolver, logic_map, java_path, output_path, class_name):
         # logic_map は id を基準に別名登録
         logic_map = {a: f for (v, f, _) in handlers for a in _aliases(v)}
     else:
-        print("[WARN] Java path not provided or not found; skipping logic conversion.")
+        log.warn("Java path not provided or not found; skipping logic conversion.")
 
     # ---- ★ XML android:onClick 対応（Java メソッド本体を拾って結線） ----
     xml_onclicks = _collect_xml_onclick(ir)  # [(view_id, method)]
+    for entry in included:
+        xml_onclicks += _collect_xml_onclick(entry.ir)
     if xml_onclicks:
         id2handler = {k: (f, c) for (k, f, c) in handlers}  # 既存のハンドラ（重複防止）
         for (vid, mname) in xml_onclicks:
             if vid in id2handler:
                 continue  # 既に Java 側で拾えていればスキップ
 
-            body = _find_method_body_in_sources(java_sources, mname) if java_sources else ""
-            dart_logic, needed_imports = convert_java_logic_to_dart(body or "", class_prefix)
-            import_classes |= needed_imports
+            body = java_index.find_method_body(mname, scope=scope) if java_sources else ""
+            dart_logic, needed_imports, needed_controllers = convert_java_logic_to_dart(body or "", class_prefix)
+            metrics.count(metrics.LISTENER_PATTERNS, "xml_onclick")
+            if not dart_logic:
+                metrics.count(metrics.STUB_HANDLERS, "no_logic")
+            imports.screens |= needed_imports
+            referenced_controllers |= needed_controllers
 
             func_name = _func_name_from_viewkey(vid)
             handler_code = f"""
@@ -872,42 +817,80 @@ def render_screen(ir, resolver, logic_map, java_path, output_path, class_name):
         logic_map = {a: f for (v, f, _) in handlers for a in _aliases(v)}
 
     # ---- UI ツリー生成 ----
-    widget_tree = translate_node(ir, resolver, logic_map=logic_map)
-    widget_tree = _inject_controllers_into_widget_tree(widget_tree, edittexts)
-    controllers = _collect_needed_controllers(edittexts)
-
-    # スクロール判定
-    use_scroll = True
-    if _root_is_scrollview(widget_tree) or _contains_expanders(widget_tree):
-        use_scroll = False
-
-    # State 有無: 入力欄 or クリックハンドラがあれば Stateful
-    need_stateful = bool(controllers) or bool(handlers)
-
-    # クラスラップ
-    widget_class_code = _wrap_as_widget_class(
-        class_name, widget_tree, handlers_code, need_stateful, use_scroll, controllers
-    )
-
-    import_lines = ["import 'package:flutter/material.dart';"]
-    for cls in sorted(import_classes):  # convert_java_logic_to_dart で集めた遷移先クラス群
-        fname = _dart_file_from_class(cls)  # LearnEnglishAppMateri -> learnenglishapp_materi.dart
-        import_lines.append(f"import '{fname}';")
+    # 入力欄の controller は変換中に view id 単位で割り当てる
+    registry = ControllerRegistry()
+    token_refs = TokenRefs(tokens) if tokens is not None else None
+    sublayouts = SubLayouts(layouts, java_index, scope,
+                            shared=shared.refs(ir, logic_map) if shared is not None else None)
+    with phase("translate"):
+        widget_tree = translate_node(ir, resolver, logic_map=logic_map, controllers=registry, tokens=token_refs,
+                                     sublayouts=sublayouts)
+    # ---- 後処理（スタブ・const・整形・import）----
+    with phase("postprocess"):
+        if (token_refs is not None and token_refs.used) or sublayouts.uses_tokens:
+            imports.add_file(TOKENS_FILE)
+        if sublayouts.uses_shared:
+            imports.add_file(SHARED_FILE)
+
+        # item / include 先のボタン・onClick 付きビューは画面に依らず translate_view の既定ハンドラ名で結線されるので、
+        # 画面側で同じ名前のメソッドを用意する（画面のハンドラがあればそれに転送、無ければスタブ）
+        defined = {h[1] for h in handlers}
+        n_handlers = len(handlers)
+        for entry in sublayouts.entries():
+            for vid in _collect_button_ids(entry.ir, with_onclick=True):
+                func = _fallback_handler_name(vid)
+                if func in defined:
+                    continue
+                defined.add(func)
+                target = _find_handler(logic_map, vid)
+                if target and target != func:
+                    stub = f"""
+  void {func}(BuildContext context) => {target}(context);
+""".rstrip()
+                else:
+                    metrics.count(metrics.STUB_HANDLERS, "sublayout")
+                    stub = f"""
+  void {func}(BuildContext context) {{
+    // TODO: add logic for {vid} in R.layout.{entry.name}
+  }}
+""".rstrip()
+                handlers.append((vid, func, stub))
+        if len(handlers) > n_handlers:
+            handlers_code = "\n\n".join(h[2] for h in handlers)
+        controllers = registry.declared(referenced_controllers)
+
+        # スクロール判定
+        use_scroll = True
+        if _root_is_scrollview(widget_tree) or _contains_expanders(widget_tree):
+            use_scroll = False
+
+        # State 有無: 入力欄 or クリックハンドラ or リストのデータがあれば Stateful
+        list_items = sublayouts.item_fields()
+        need_stateful = bool(controllers) or bool(handlers) or bool(list_items)
+
+        # Activity API の置き換えはハンドラ本体だけが対象（ウィジェット木の文字列は読み直さない）
+        handlers_code = _patch_android_activity_calls(handlers_code, imports)
+
+        # クラスラップ
+        widget_class_code = _wrap_as_widget_class(
+            class_name, widget_tree, handlers_code, need_stateful, use_scroll, controllers,
+            builders=sublayouts,
+            const_classes=shared.class_names if shared is not None else (), list_items=list_items,
+        )
 
-    imports_block = "\n".join(import_lines)
+        import_lines = imports.lines(class_name, class_files)
+        imports_block = "\n".join(import_lines)
 
-    dart_code = f"""{imports_block}
+        dart_code = f"""{imports_block}
 
 // ===== Auto-Generated Widget Class =====
 
 {widget_class_code}
 """
-    
-
-
-    dart_code = _patch_android_activity_calls(dart_code)
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(dart_code)
+    with phase("write"):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(dart_code)
 
-    print(f"[DONE] Generated Dart: {output_path}")
+    log.info(f"Generated Dart: {output_path}", tag="DONE")
+    return sublayouts.dep_paths()
@@ -1,24 +1,98 @@
 # android2flutter/translator/layout_rules.py
+from typing import List, Optional
+
+from .. import metrics
 from ..parser.resource_resolver import ResourceResolver
-from ..utils import indent, apply_layout_modifiers
+from ..utils import apply_layout_modifiers
+from .view_rules import translate_view
+from .widget_ast import Widget, wrap
 
-def _wrap_match_parent_for_linear(child_code: str, child_attrs: dict, parent_orientation: str) -> str:
-    """LinearLayout 配下の子の match_parent を Expanded / width∞ で表現する"""
+def _wrap_match_parent_for_linear(child: Widget, child_attrs, parent_orientation: str) -> Widget:
+    """
+    LinearLayout 配下の子の match_parent / layout_weight を Expanded / width∞ で表現する。
+    Expanded は Row / Column の直下でないといけないので、交差軸の SizedBox より外側に付ける。
+    """
     w = (child_attrs.get("layout_width") or "").lower()
     h = (child_attrs.get("layout_height") or "").lower()
-    code = child_code
+    weighted = bool(child_attrs.get("layout_weight"))
 
     if parent_orientation == "vertical":
-        if h == "match_parent":
-            code = f"Expanded(child: {code})"
         if w == "match_parent":
-            code = f"SizedBox(width: double.infinity, child: {code})"
+            child = wrap(child, "SizedBox", width="double.infinity")
+        if h == "match_parent" or weighted:
+            child = wrap(child, "Expanded")
     else:  # horizontal
-        if w == "match_parent":
-            code = f"Expanded(child: {code})"
         if h == "match_parent":
-            code = f"SizedBox(height: double.infinity, child: {code})"
-    return code
+            child = wrap(child, "SizedBox", height="double.infinity")
+        if w == "match_parent" or weighted:
+            child = wrap(child, "Expanded")
+    return child
+
+def include_layout_name(attrs) -> Optional[str]:
+    """<include layout="@layout/toolbar"/> → 'toolbar'（@layout/ 参照でなければ None）"""
+    ref = (attrs.get("layout") or "").strip()
+    return ref[len("@layout/"):] if ref.startswith("@layout/") else None
+
+def _included(node, sublayouts):
+    """<include> ノードなら取り込み先の SubLayout（それ以外 / 解決できなければ None）"""
+    if sublayouts is None or node.get("type") != "include":
+        return None
+    name = include_layout_name(node.get("attrs", {}) or {})
+    return sublayouts.include(name) if name else None
+
+def _layout_params(node, sublayouts):
+    """
+    親から見た子の layout_* 属性。<include> は layout_width / layout_height を両方書いたときだけ
+    取り込み先のルートを上書きする（Android と同じ）。
+    """
+    attrs = node.get("attrs", {}) or {}
+    entry = _included(node, sublayouts)
+    if entry is None or ("layout_width" in attrs and "layout_height" in attrs):
+        return attrs
+    return entry.ir.attrs
+
+def _place_child(w: Widget, ch, sublayouts, orientation: Optional[str]) -> Widget:
+    """親が LinearLayout（orientation あり）なら match_parent / layout_weight を Expanded 等で包む"""
+    if orientation:
+        return _wrap_match_parent_for_linear(w, _layout_params(ch, sublayouts), orientation)
+    return w
+
+def _merge_include(ch, sublayouts) -> Optional[Widget]:
+    """ルートが <merge> のレイアウトの <include> なら親の children に展開する ..._buildX(context)"""
+    entry = _included(ch, sublayouts)
+    if entry is not None and entry.merge:
+        return Widget("..." + entry.method, "context")
+    return None
+
+def translate_children(children, resolver, logic_map=None, controllers=None, tokens=None,
+                       sublayouts=None, orientation: Optional[str] = None) -> List[Widget]:
+    """
+    子ビューを順に変換する。ルートが <merge> のレイアウトの <include> は
+    ..._buildX(context) として親の children に展開する（<include> 側の属性は Android 同様に無視）。
+    orientation: LinearLayout の子なら match_parent / layout_weight を Expanded 等で包む
+    """
+    out: List[Widget] = []
+    for ch in children:
+        spread = _merge_include(ch, sublayouts)
+        if spread is not None:
+            out.append(spread)
+            continue
+        w = translate_node(ch, resolver, logic_map=logic_map, controllers=controllers,
+                           tokens=tokens, sublayouts=sublayouts)
+        out.append(_place_child(w, ch, sublayouts, orientation))
+    return out
+
+def _translate_include(node, resolver, logic_map=None, controllers=None, tokens=None,
+                       sublayouts=None) -> Widget:
+    """<include> 単体（children 展開できない位置）。取り込み先は builder メソッドの呼び出しにする"""
+    attrs = node.get("attrs", {}) or {}
+    entry = _included(node, sublayouts)
+    if entry is None:
+        return translate_view(node, resolver, logic_map, controllers, tokens, sublayouts)
+    if entry.merge:
+        return Widget("Column", mainAxisSize="MainAxisSize.min", crossAxisAlignment="CrossAxisAlignment.stretch",
+                      children=[Widget("..." + entry.method, "context")])
+    return apply_layout_modifiers(Widget(entry.method, "context"), attrs, resolver, tokens)
 
 def _axes_from_gravity_for_linear(gravity: str, orientation: str):
     """gravity を Flutter の main/cross axis に落とす。シンプルに center/horizontal/vertical を扱う。"""
@@ -48,77 +122,97 @@ def _axes_from_gravity_for_linear(gravity: str, orientation: str):
 
     return main, cross
 
-def translate_layout(node, resolver, logic_map=None):
-    """
-    ViewGroup を Flutter ウィジェットへ。
-    logic_map: view_id → handler 名
-    """
+def _linear_orientation(node) -> Optional[str]:
+    """LinearLayout なら子の並ぶ向き（vertical / horizontal）、それ以外は None"""
+    if node.get("type") != "LinearLayout":
+        return None
+    return (node.get("attrs", {}) or {}).get("orientation", "vertical").lower()
+
+def _layout_body(node, dart_children: List[Widget], resolver, tokens=None) -> Widget:
+    """変換済みの子から ViewGroup（LinearLayout / FrameLayout / RelativeLayout ...）を組み立てる"""
     t = node["type"]
     attrs = node.get("attrs", {}) or {}
-    children = node.get("children", []) or []
 
     # ========== LinearLayout ==========
     if t == "LinearLayout":
-        orientation = attrs.get("orientation", "vertical").lower()
-
-        dart_children_list = []
-        for ch in children:
-            child_code = translate_node(ch, resolver, logic_map=logic_map)
-            child_attrs = ch.get("attrs", {}) or {}
-            child_code = _wrap_match_parent_for_linear(child_code, child_attrs, orientation)
-            dart_children_list.append(child_code)
-
-        children_joined = ",\n".join(dart_children_list)
+        orientation = _linear_orientation(node)
         main, cross = _axes_from_gravity_for_linear(attrs.get("gravity", ""), orientation)
+        widget = "Row" if orientation == "horizontal" else "Column"
+        body = Widget(widget, mainAxisAlignment=main, crossAxisAlignment=cross, children=dart_children)
 
-        if orientation == "horizontal":
-            body = (
-                f"Row(mainAxisAlignment: {main}, crossAxisAlignment: {cross}, children: [\n"
-                f"{indent(children_joined)}\n])"
-            )
-        else:
-            body = (
-                f"Column(mainAxisAlignment: {main}, crossAxisAlignment: {cross}, children: [\n"
-                f"{indent(children_joined)}\n])"
-            )
-        return apply_layout_modifiers(body, attrs, resolver)
-
-    # ========== FrameLayout ==========
-    if t == "FrameLayout":
-        dart_children = [translate_node(ch, resolver, logic_map=logic_map) for ch in children]
-        body = f"Stack(children: [\n{indent(',\n'.join(dart_children))}\n])"
-        return apply_layout_modifiers(body, attrs, resolver)
-
-    # ========== RelativeLayout ==========
-    if t == "RelativeLayout":
-        dart_children = [translate_node(ch, resolver, logic_map=logic_map) for ch in children]
-        body = f"Stack(children: [\n{indent(',\n'.join(dart_children))}\n])"
-        return apply_layout_modifiers(body, attrs, resolver)
-
-    # ========== ConstraintLayout ==========
-    if t == "ConstraintLayout":
-        dart_children = [translate_node(ch, resolver, logic_map=logic_map) for ch in children]
-        body = f"Column(crossAxisAlignment: CrossAxisAlignment.stretch, children: [\n{indent(',\n'.join(dart_children))}\n])"
-        return apply_layout_modifiers(body, attrs, resolver)
+    # ========== FrameLayout / RelativeLayout ==========
+    elif t in ("FrameLayout", "RelativeLayout"):
+        body = Widget("Stack", children=dart_children)
 
     # fallback
-    dart_children = [translate_node(ch, resolver, logic_map=logic_map) for ch in children]
-    body = f"Column(children: [\n{indent(',\n'.join(dart_children))}\n])"
-    return apply_layout_modifiers(body, attrs, resolver)
+    else:
+        body = Widget("Column", children=dart_children)
+    return apply_layout_modifiers(body, attrs, resolver, tokens)
 
-def translate_node(node: dict, resolver, logic_map=None):
-    t = (node.get("type") or "")
-    attrs = node.get("attrs", {}) or {}
-    children = node.get("children", []) or []
+_CONSTRAINT_LAYOUTS = ("androidx.constraintlayout.widget.ConstraintLayout", "ConstraintLayout")
+_GROUPS = frozenset(_CONSTRAINT_LAYOUTS + ("merge", "LinearLayout", "FrameLayout", "RelativeLayout"))
 
+def _enter(node, resolver, logic_map, controllers, tokens, sublayouts) -> Optional[Widget]:
+    """
+    ノードを訪れたときの処理。その場で Widget にできるもの（ビュー・<include>・共有部分木）は Widget、
+    子を変換してから組み立てる ViewGroup は None（_assemble で組み立てる）。
+    """
+    # 複数のレイアウトに同じ形で現れる部分木は shared_widgets.dart の共有クラス（バッチ実行時）
+    shared_name = sublayouts.shared_widget(node) if sublayouts is not None else None
+    if shared_name:
+        return Widget(shared_name)
+
+    t = (node.get("type") or "")
+    metrics.count(metrics.VIEWS, t)
+    if t in _GROUPS:
+        return None
+    # <include layout="@layout/x"/> は取り込み先の builder メソッド
+    if t == "include":
+        return _translate_include(node, resolver, logic_map, controllers, tokens, sublayouts)
+    return translate_view(node, resolver, logic_map, controllers, tokens, sublayouts)
+
+def _assemble(node, dart_children: List[Widget], resolver, tokens) -> Widget:
+    t = (node.get("type") or "")
     # === 追加: ConstraintLayout を Column にフォールバック ===
-    if t in ("androidx.constraintlayout.widget.ConstraintLayout", "ConstraintLayout"):
-        child_widgets = [translate_node(ch, resolver, logic_map=logic_map) for ch in children]
-        body = "Column(mainAxisSize: MainAxisSize.min, crossAxisAlignment: CrossAxisAlignment.stretch, children: [\n  " \
-               + ",\n  ".join(child_widgets) + "\n])"
-        return apply_layout_modifiers(body, attrs, resolver)
-    
-    if t in ("LinearLayout", "FrameLayout", "RelativeLayout", "ConstraintLayout"):
-        return translate_layout(node, resolver, logic_map)
-    from .view_rules import translate_view
-    return translate_view(node, resolver, logic_map)
+    if t in _CONSTRAINT_LAYOUTS:
+        body = Widget("Column", mainAxisSize="MainAxisSize.min",
+                      crossAxisAlignment="CrossAxisAlignment.stretch", children=dart_children)
+        return apply_layout_modifiers(body, node.get("attrs", {}) or {}, resolver, tokens)
+    # <merge> ルートは子を縦に並べる
+    if t == "merge":
+        return Widget("Column", mainAxisSize="MainAxisSize.min", crossAxisAlignment="CrossAxisAlignment.stretch",
+                      children=dart_children)
+    return _layout_body(node, dart_children, resolver, tokens)
+
+def translate_node(node, resolver, logic_map=None, controllers=None, tokens=None,
+                   sublayouts=None) -> Widget:
+    """
+    IR の部分木を Widget 木へ。深くネストしたレイアウトでも Python の再帰上限に当たらないよう、
+    mark_const と同じく明示的なスタックで帰りがけ順に組み立てる。
+    子はソース順に 1 つずつ変換するので、controller 名やハンドラの割り当て順は木の形だけで決まる。
+    """
+    w = _enter(node, resolver, logic_map, controllers, tokens, sublayouts)
+    if w is not None:
+        return w
+    # (ViewGroup, 未変換の子, 変換済みの子, LinearLayout の向き)
+    stack = [(node, iter(node.get("children", []) or []), [], _linear_orientation(node))]
+    while True:
+        group, pending, done, orientation = stack[-1]
+        ch = next(pending, None)
+        if ch is None:
+            stack.pop()
+            w = _assemble(group, done, resolver, tokens)
+            if not stack:
+                return w
+            parent_done, parent_orientation = stack[-1][2], stack[-1][3]
+            parent_done.append(_place_child(w, group, sublayouts, parent_orientation))
+            continue
+        spread = _merge_include(ch, sublayouts)
+        if spread is not None:
+            done.append(spread)
+            continue
+        w = _enter(ch, resolver, logic_map, controllers, tokens, sublayouts)
+        if w is None:
+            stack.append((ch, iter(ch.get("children", []) or []), [], _linear_orientation(ch)))
+        else:
+            done.append(_place_child(w, ch, sublayouts, orientation))
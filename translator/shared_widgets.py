@@ -0,0 +1,284 @@
+# android2flutter/translator/shared_widgets.py
+"""
+プロジェクト全体で同じ形をしたビューの部分木を 1 つの共有ウィジェットにまとめる（shared_widgets.dart）。
+
+<include> を使わずに同じカード・行・フォーム部品をコピーしているレイアウトが多いので、バッチ実行時に
+  1. 全レイアウトの部分木ごとに構造ハッシュ（型 + 解決済みの属性 + 子のハッシュ。id は除く）を求め、
+  2. MIN_NODES 個以上のビューからなり、2 箇所以上で使われている「純粋な」部分木を選び、
+  3. 1 度だけ変換して class SharedXxx extends StatelessWidget として shared_widgets.dart に書く。
+画面側はその位置に const SharedXxx() を置く。
+
+純粋 = 画面の State に依存しない部分木。ボタン・入力欄・リスト・<include> / <merge>・android:onClick を含まず、
+さらに画面ごとに、その画面の Java がクリックハンドラを付けている id を含まないこと（SharedRefs で判定）。
+@color/primary と #2196F3 のように解決後の値が同じ属性は同じ部分木として扱う。
+
+部分木のハッシュはレイアウトファイル単位で cache_dir/subtrees.pickle に保存し、次回は変更されたファイルだけ読み直す。
+"""
+import hashlib
+import os
+import pickle
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from .. import log
+from ..parser.ir import IRNode, iter_nodes
+from ..parser.xml_parser import parse_layout_xml
+from .layout_rules import translate_node
+from .sublayouts import SubLayouts
+from .tokens import TOKENS_FILE, DesignTokens, TokenRefs
+from .view_rules import _LIST_VIEWS, _find_handler, _id_base
+from .widget_ast import mark_const, print_widget
+
+SHARED_FILE = "shared_widgets.dart"
+MIN_NODES = 3
+
+_CACHE_FILE = "subtrees.pickle"
+_CACHE_VERSION = 1
+
+# (ハッシュ, ルートの型, ビュー数, 純粋か, 親レコードの添字 or -1)。MIN_NODES 以上の部分木だけを前順で持つ
+Record = Tuple[str, str, int, bool, int]
+
+def _sha256_file(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+def _is_impure(node: IRNode) -> bool:
+    t = node.type.rsplit(".", 1)[-1]
+    return (t.lower().endswith("button") or t.endswith("EditText") or t.endswith("TextInputLayout")
+            or t in _LIST_VIEWS or t in ("include", "merge") or "onClick" in node.attrs)
+
+def _hash_nodes(ir: IRNode, resolver) -> Tuple[List[IRNode], List[str], List[int], List[bool], List[int]]:
+    """前順のノード列と、各ノードの (構造ハッシュ, ビュー数, 純粋か, 親の添字)。再帰しない"""
+    nodes = list(iter_nodes(ir))
+    index = {id(n): i for i, n in enumerate(nodes)}
+    n_nodes = len(nodes)
+    hashes: List[str] = [""] * n_nodes
+    sizes = [1] * n_nodes
+    pure = [True] * n_nodes
+    parent = [-1] * n_nodes
+    for i in range(n_nodes - 1, -1, -1):  # 前順の逆 = 子が親より先
+        n = nodes[i]
+        h = hashlib.blake2b(n.type.encode("utf-8"), digest_size=12)
+        for k, v in sorted(n.attrs.items()):
+            if k == "id":
+                continue
+            rv = resolver.resolve(v) if resolver else v
+            h.update(f"\0{k}={rv}".encode("utf-8"))
+        h.update(b"\1")
+        ok = not _is_impure(n)
+        for ch in n.children:
+            j = index[id(ch)]
+            parent[j] = i
+            h.update(hashes[j].encode("ascii"))
+            sizes[i] += sizes[j]
+            ok = ok and pure[j]
+        hashes[i] = h.hexdigest()
+        pure[i] = ok
+    return nodes, hashes, sizes, pure, parent
+
+def _records(ir: IRNode, resolver, min_nodes: int) -> List[Record]:
+    nodes, hashes, sizes, pure, parent = _hash_nodes(ir, resolver)
+    rec_index: Dict[int, int] = {}
+    out: List[Record] = []
+    for i, n in enumerate(nodes):
+        if sizes[i] < min_nodes:
+            continue
+        # 親は子より大きいので、記録したノードの親も必ず記録済み
+        rec_index[i] = len(out)
+        out.append((hashes[i], n.type.rsplit(".", 1)[-1], sizes[i], pure[i], rec_index.get(parent[i], -1)))
+    return out
+
+def shared_class_name(type_name: str, digest: str) -> str:
+    """LinearLayout + ハッシュ → SharedLinearLayout3fa2c1d0（内容が同じなら実行をまたいで同じ名前）"""
+    base = "".join(c for c in type_name if c.isalnum()) or "View"
+    return f"Shared{base[:1].upper()}{base[1:]}{digest[:8]}"
+
+class SharedWidgets:
+    """実行ごとに 1 つ。共有する部分木のハッシュ → クラス名と、変換用の IR の出現位置"""
+    def __init__(self, resolver, names: Dict[str, str], sources: Dict[str, str], min_nodes: int = MIN_NODES):
+        self.resolver = resolver
+        self.names = names          # hash -> class name
+        self.sources = sources      # hash -> 最初に現れるレイアウト XML
+        self.min_nodes = min_nodes
+        self.class_names: FrozenSet[str] = frozenset(names.values())
+
+    @classmethod
+    def scan(cls, xml_paths: Iterable[str], resolver, min_nodes: int = MIN_NODES,
+             cache_dir: Optional[str] = None, memo: Optional[Dict[str, Dict]] = None) -> "SharedWidgets":
+        """
+        全レイアウトの部分木を数え、共有する部分木を決める。
+        memo: 前回の走査のファイルごとの結果（--watch 用）。変わっていない XML は読み直さず、今回の結果で置き換える
+        """
+        values_fp = resolver.fingerprint() if resolver else ""
+        cached: Dict[str, Dict] = dict(memo) if memo else {}
+        cache_path = os.path.join(cache_dir, _CACHE_FILE) if cache_dir else None
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, "rb") as f:
+                    data = pickle.load(f)
+                if data.get("version") == _CACHE_VERSION:
+                    cached = data.get("files", {})
+            except Exception as e:
+                log.warn(f"Ignoring unreadable subtree cache {cache_path}: {e}")
+
+        files: Dict[str, Dict] = {}
+        scanned = 0
+        for path in xml_paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            stamp = (st.st_mtime_ns, st.st_size)
+            rec = cached.get(path)
+            if rec is not None and (rec["values"] != values_fp or rec["min_nodes"] != min_nodes):
+                rec = None
+            if rec is not None and rec["stamp"] != stamp:
+                rec = dict(rec, stamp=stamp) if _sha256_file(path) == rec["sha"] else None
+            if rec is None:
+                try:
+                    ir, _ = parse_layout_xml(path, resolver=resolver)
+                except Exception as e:
+                    log.warn(f"Skipping {path} in subtree scan: {e}")
+                    continue
+                rec = {"stamp": stamp, "sha": _sha256_file(path), "values": values_fp, "min_nodes": min_nodes,
+                       "records": _records(ir, resolver, min_nodes)}
+                scanned += 1
+            files[path] = rec
+
+        if cache_path and (scanned or files.keys() != cached.keys()
+                           or any(files[p]["stamp"] != cached[p]["stamp"] for p in files)):
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                tmp = cache_path + ".tmp"
+                with open(tmp, "wb") as f:
+                    pickle.dump({"version": _CACHE_VERSION, "files": files}, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, cache_path)
+            except OSError as e:
+                log.warn(f"Could not write subtree cache {cache_path}: {e}")
+
+        if memo is not None:
+            memo.clear()
+            memo.update(files)
+
+        # 2 回以上現れる純粋な部分木が候補
+        counts = Counter(r[0] for rec in files.values() for r in rec["records"] if r[3])
+        candidates = {h for h, c in counts.items() if c >= 2}
+
+        # 候補の中にしか現れない候補（カードの中の行など）は外側のクラスに含めれば足りる。
+        # 参照される場所 = 候補の外での出現数 + それを含む候補の種類数 が 2 以上のものだけ残す
+        outside: Counter = Counter()
+        inside: Dict[str, Set[str]] = {}
+        sources: Dict[str, str] = {}
+        types: Dict[str, str] = {}
+        for path, rec in files.items():
+            records = rec["records"]
+            nearest = [-1] * len(records)  # 一番近い候補の祖先
+            for i, (h, t, _, _, p) in enumerate(records):
+                if p >= 0:
+                    nearest[i] = p if records[p][0] in candidates else nearest[p]
+                if h not in candidates:
+                    continue
+                sources.setdefault(h, path)
+                types.setdefault(h, t)
+                if nearest[i] < 0:
+                    outside[h] += 1
+                else:
+                    inside.setdefault(h, set()).add(records[nearest[i]][0])
+        names = {h: shared_class_name(types[h], h) for h in sorted(candidates)
+                 if outside[h] + len(inside.get(h, ())) >= 2}
+        log.info(f"Subtree scan: {len(files)} layouts ({scanned} parsed, {len(files) - scanned} from cache), "
+                 f"{len(names)} shared widgets")
+        return cls(resolver, names, {h: sources[h] for h in names}, min_nodes)
+
+    def fingerprint(self) -> str:
+        """共有する部分木の集合（画面のキャッシュキー用）"""
+        return hashlib.sha256("\n".join(sorted(self.names)).encode("ascii")).hexdigest()
+
+    def refs(self, ir: IRNode, logic_map=None, skip: Optional[IRNode] = None) -> "SharedRefs":
+        return SharedRefs(self, ir, logic_map, skip)
+
+    # ---------------------------------------------------------
+    # shared_widgets.dart
+    # ---------------------------------------------------------
+    def render(self, tokens: Optional[DesignTokens] = None) -> str:
+        # 共有する部分木の IR は、最初に現れるレイアウトをファイルごとに 1 度だけ読み直して取る
+        by_file: Dict[str, List[str]] = {}
+        for h, path in self.sources.items():
+            by_file.setdefault(path, []).append(h)
+        roots: Dict[str, IRNode] = {}
+        for path, wanted in sorted(by_file.items()):
+            ir, _ = parse_layout_xml(path, resolver=self.resolver)
+            nodes, hashes, _, _, _ = _hash_nodes(ir, self.resolver)
+            for n, h in zip(nodes, hashes):
+                if h in wanted and h not in roots:
+                    roots[h] = n
+
+        # 画面と同じ変換（中に別の共有部分木があればそのクラスを参照する）
+        refs = TokenRefs(tokens) if tokens is not None else None
+        classes = []
+        for h, name in sorted(self.names.items(), key=lambda kv: kv[1]):
+            node = roots.get(h)
+            if node is None:
+                continue
+            sub = SubLayouts(None, shared=self.refs(node, skip=node))
+            body = mark_const(translate_node(node, self.resolver, tokens=refs, sublayouts=sub),
+                              self.class_names)
+            classes.append(f"""class {name} extends StatelessWidget {{
+  const {name}({{super.key}});
+
+  @override
+  Widget build(BuildContext context) {{
+    return {print_widget(body, level=2)};
+  }}
+}}""")
+        head = ["import 'package:flutter/material.dart';"]
+        if refs is not None and refs.used:
+            head.append(f"import '{TOKENS_FILE}';")
+        return "\n".join(head) + "\n\n// ===== Auto-Generated Shared Widgets =====\n\n" + "\n\n".join(classes) + "\n"
+
+    def write(self, out_dir: str, tokens: Optional[DesignTokens] = None) -> Optional[str]:
+        """out_dir/shared_widgets.dart を書く（内容が同じなら触らない）。return: 書いたパス or None"""
+        path = os.path.join(out_dir, SHARED_FILE)
+        code = self.render(tokens)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                if f.read() == code:
+                    return None
+        except OSError:
+            pass
+        os.makedirs(out_dir, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(code)
+        log.info(f"Generated shared widgets: {path}", tag="DONE")
+        return path
+
+class SharedRefs:
+    """
+    1 つの IR（画面 / item レイアウト / 共有部分木の本体）の中で共有クラスに置き換えるノード。
+    logic_map: 画面のハンドラ。ハンドラの付いた id を含む部分木は置き換えない
+    skip: 置き換えないノード（共有クラスの本体を変換するときのそのルート自身）
+    """
+    def __init__(self, shared: SharedWidgets, ir: IRNode, logic_map=None, skip: Optional[IRNode] = None):
+        self.used = False
+        self._by_node: Dict[int, str] = {}
+        if not shared.names:
+            return
+        nodes, hashes, sizes, _, parent = _hash_nodes(ir, shared.resolver)
+        handled = [bool(logic_map) and bool(_find_handler(logic_map, _id_base(n.attrs.get("id") or "")))
+                   for n in nodes]
+        for i in range(len(nodes) - 1, 0, -1):
+            if handled[i]:
+                handled[parent[i]] = True
+        for i, n in enumerate(nodes):
+            name = shared.names.get(hashes[i]) if sizes[i] >= shared.min_nodes else None
+            if name and not handled[i] and n is not skip:
+                self._by_node[id(n)] = name
+
+    def lookup(self, node) -> Optional[str]:
+        name = self._by_node.get(id(node))
+        if name:
+            self.used = True
+        return name
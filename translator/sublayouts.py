@@ -0,0 +1,221 @@
+# android2flutter/translator/sublayouts.py
+"""
+画面の中で別のレイアウトを使う部分
+（RecyclerView / ListView / GridView の 1 行分のレイアウトと <include layout="@layout/x"/>）。
+
+LayoutLibrary（実行ごとに 1 つ）:
+  res/layout のレイアウト名 → XML。各レイアウトは最初に使われたときに 1 度だけパース・変換し、
+  Widget 木をキャッシュする（同じ toolbar / item レイアウトを使う画面がいくつあっても変換は 1 回）。
+  ルートが <merge> のレイアウトは子の list として持ち、呼び出し側で親の children に展開する。
+SubLayouts（画面ごと）:
+  画面が使ったレイアウトを builder メソッドとして記録する。同じレイアウトは 1 画面に 1 メソッド。
+    item のみ    : Widget _buildItemRow(BuildContext context, int index)
+    include のみ : Widget _buildToolbar(BuildContext context)
+    両方         : Widget _buildX(BuildContext context, [int index = 0])
+    <merge>      : List<Widget> _buildFooter(BuildContext context)（呼び出しは ..._buildFooter(context)）
+  リストビューのデータ（itemCount の元）は画面の State のフィールド（List<Object> _rvUsersItems = [];）として
+  記録し、item / include 先の中のリストビューの分も使った画面で宣言する。
+"""
+import os
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from .. import log
+from ..parser.ir import IRNode, iter_nodes
+from ..parser.java_index import JavaIndex, ListAdapter
+from ..parser.xml_parser import parse_layout_xml
+from .layout_rules import include_layout_name, translate_children, translate_node
+from .tokens import DesignTokens, TokenRefs
+from .widget_ast import Widget, mark_const
+
+ITEM = "item"
+INCLUDE = "include"
+
+def builder_method_name(layout_name: str) -> str:
+    """item_row → _buildItemRow"""
+    return "_build" + "".join(p[:1].upper() + p[1:] for p in layout_name.replace("-", "_").split("_") if p)
+
+def items_field_name(view_id: str) -> str:
+    """rv_users → _rvUsersItems（id が無ければ _listItems）"""
+    parts = [p for p in view_id.replace("-", "_").split("_") if p]
+    camel = parts[0] + "".join(p[:1].upper() + p[1:] for p in parts[1:]) if parts else "list"
+    return f"_{camel}Items"
+
+class SubLayout:
+    """変換済みの 1 レイアウト"""
+    __slots__ = ("name", "path", "ir", "method", "merge", "widget", "uses_tokens", "uses_shared", "deps",
+                 "list_items")
+
+    def __init__(self, name: str, path: str, ir: IRNode, widget: Union[Widget, List[Widget]],
+                 uses_tokens: bool, uses_shared: bool, deps: List[Tuple["SubLayout", str]],
+                 list_items: List[str]):
+        self.name = name
+        self.path = path
+        self.ir = ir
+        self.method = builder_method_name(name)
+        self.merge = ir.type == "merge"  # True なら widget は子の list
+        self.widget = widget
+        self.uses_tokens = uses_tokens
+        self.uses_shared = uses_shared  # shared_widgets.dart のクラスを参照している
+        self.deps = deps  # この中でさらに使っているレイアウトと使い方（ITEM / INCLUDE）
+        self.list_items = list_items  # この中のリストビューのデータのフィールド名
+
+class LayoutLibrary:
+    def __init__(self, layout_dir: Optional[str], resolver, tokens: Optional[DesignTokens] = None,
+                 java_index: Optional[JavaIndex] = None, shared=None):
+        self.resolver = resolver
+        self.tokens = tokens
+        self.java_index = java_index
+        self.shared = shared  # SharedWidgets（バッチ実行時）
+        self.paths: Dict[str, str] = {}
+        if layout_dir and os.path.isdir(layout_dir):
+            for fn in sorted(os.listdir(layout_dir)):
+                if fn.endswith(".xml"):
+                    self.paths[os.path.splitext(fn)[0]] = os.path.join(layout_dir, fn)
+        self._cache: Dict[str, Optional[SubLayout]] = {}
+        self._busy: Set[str] = set()
+
+    def translate(self, name: str) -> Optional[SubLayout]:
+        """レイアウト name を（実行中 1 度だけ）変換する。見つからない・循環している場合は None"""
+        if name in self._cache:
+            return self._cache[name]
+        path = self.paths.get(name)
+        if path is None:
+            log.warn(f"Layout not found: R.layout.{name}")
+            self._cache[name] = None
+            return None
+        if name in self._busy:
+            log.warn(f"Layout R.layout.{name} uses itself; not expanding it again")
+            return None
+        self._busy.add(name)
+        try:
+            ir, _ = parse_layout_xml(path, resolver=self.resolver)
+            refs = TokenRefs(self.tokens) if self.tokens is not None else None
+            # 1 行分のレイアウトは画面の State を持たないので controller / ハンドラは結線しない
+            nested = SubLayouts(self, self.java_index,
+                                shared=self.shared.refs(ir) if self.shared is not None else None)
+            const_classes = self.shared.class_names if self.shared is not None else ()
+            if ir.type == "merge":
+                widget = [mark_const(w, const_classes) for w in
+                          translate_children(ir.children, self.resolver, tokens=refs, sublayouts=nested)]
+            else:
+                widget = mark_const(translate_node(ir, self.resolver, tokens=refs, sublayouts=nested),
+                                    const_classes)
+            entry = SubLayout(name, path, ir, widget, bool(refs and refs.used), nested.uses_shared,
+                              nested.usages(), nested.item_fields())
+            log.info(f"Translated sub-layout R.layout.{name} -> {entry.method}()")
+        except Exception as e:
+            log.error(f"Failed to translate R.layout.{name}: {e}")
+            entry = None
+        finally:
+            self._busy.discard(name)
+        self._cache[name] = entry
+        return entry
+
+    def includes_of(self, ir: IRNode) -> List[SubLayout]:
+        """ir が <include> で取り込むレイアウト（入れ子の include も含む。ハンドラ収集用）"""
+        found: Dict[str, SubLayout] = {}
+        stack = [ir]
+        while stack:
+            for node in iter_nodes(stack.pop()):
+                if node.type != "include":
+                    continue
+                name = include_layout_name(node.attrs)
+                entry = self.translate(name) if name else None
+                if entry is not None and entry.name not in found:
+                    found[entry.name] = entry
+                    stack.append(entry.ir)
+        return list(found.values())
+
+class SubLayouts:
+    """1 画面分の builder メソッド（登録順）"""
+    def __init__(self, library: Optional[LayoutLibrary], java_index: Optional[JavaIndex] = None,
+                 scope: Optional[Set[int]] = None, shared=None):
+        self.library = library
+        self.java_index = java_index
+        self.scope = scope
+        self.shared = shared  # この IR の SharedRefs（None なら共有ウィジェットを使わない）
+        self._used: Dict[str, SubLayout] = {}
+        self._kinds: Dict[str, Set[str]] = {}
+        self._list_items: List[str] = []  # リストビューのデータのフィールド名（出現順）
+
+    def list_adapter(self, view_id: str) -> Optional[ListAdapter]:
+        if self.java_index is None or not view_id:
+            return None
+        return self.java_index.list_adapter(view_id, self.scope)
+
+    def item_builder(self, layout_name: str) -> Optional[str]:
+        """1 行分のレイアウトの builder メソッド名（変換できなければ None）"""
+        entry = self.library.translate(layout_name) if self.library else None
+        if entry is None:
+            return None
+        if entry.merge:
+            log.warn(f"R.layout.{layout_name} has a <merge> root and cannot be a list item")
+            return None
+        self._use(entry, ITEM)
+        return entry.method
+
+    def list_items(self, view_id: str) -> str:
+        """リストビュー 1 つ分のデータを持つフィールド名（同じ名前が続けば _list2Items 等）"""
+        base = items_field_name(view_id)
+        name, n = base, 2
+        while name in self._list_items:
+            name = f"{base[:-len('Items')]}{n}Items"
+            n += 1
+        self._list_items.append(name)
+        return name
+
+    def item_fields(self) -> List[str]:
+        """画面に宣言するリストのデータ（この IR のものと、使った item / include 先のもの）"""
+        names = list(self._list_items)
+        for e in self._used.values():
+            names += [f for f in e.list_items if f not in names]
+        return names
+
+    def shared_widget(self, node) -> Optional[str]:
+        """node を共有ウィジェットで置き換えるならそのクラス名"""
+        return self.shared.lookup(node) if self.shared is not None else None
+
+    def include(self, layout_name: str) -> Optional[SubLayout]:
+        """<include> 先のレイアウト（変換できなければ None）"""
+        entry = self.library.translate(layout_name) if self.library else None
+        if entry is not None:
+            self._use(entry, INCLUDE)
+        return entry
+
+    def _use(self, entry: SubLayout, kind: str) -> None:
+        stack = [(entry, kind)]
+        while stack:
+            e, k = stack.pop()
+            self._kinds.setdefault(e.name, set()).add(k)
+            if e.name not in self._used:
+                self._used[e.name] = e
+                stack.extend(e.deps)
+
+    def entries(self) -> List[SubLayout]:
+        return list(self._used.values())
+
+    def usages(self) -> List[Tuple[SubLayout, str]]:
+        return [(e, k) for e in self._used.values() for k in sorted(self._kinds[e.name])]
+
+    def signature(self, entry: SubLayout) -> str:
+        """builder メソッドの宣言（戻り値型 + 名前 + 引数）"""
+        kinds = self._kinds.get(entry.name, {ITEM})
+        if ITEM not in kinds:
+            params = "BuildContext context"
+        elif INCLUDE in kinds:
+            params = "BuildContext context, [int index = 0]"
+        else:
+            params = "BuildContext context, int index"
+        return f"{'List<Widget>' if entry.merge else 'Widget'} {entry.method}({params})"
+
+    @property
+    def uses_tokens(self) -> bool:
+        return any(e.uses_tokens for e in self._used.values())
+
+    @property
+    def uses_shared(self) -> bool:
+        return (self.shared is not None and self.shared.used) or any(e.uses_shared for e in self._used.values())
+
+    def dep_paths(self) -> List[str]:
+        """この画面の出力が依存するレイアウト XML（キャッシュの依存関係用）"""
+        return sorted(e.path for e in self._used.values())
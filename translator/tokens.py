@@ -0,0 +1,184 @@
+# android2flutter/translator/tokens.py
+"""
+プロジェクト共通のデザイントークン（tokens.dart）。
+
+バッチ実行時に ResourceResolver の表から 1 度だけ作り、
+  AppColors     : @color/xxx  → static const Color
+  AppDimens     : @dimen/xxx  → static const double
+  AppStrings    : @string/xxx → static const String
+  AppTextStyles : textSize / textColor を持つ style → static const TextStyle
+を出力する。画面側は @color/primary 等の参照を AppColors.primary として書き、値を画面ごとに埋め込まない。
+リテラル値（textSize="18sp" 等）や ?attr/ 参照はこれまでどおり画面にリテラルで書く。
+"""
+import os
+import re
+from typing import Dict, Optional, Set, Tuple, Union
+
+from .. import log
+from ..utils import escape_dart
+from .widget_ast import Widget, print_widget
+
+TOKENS_FILE = "tokens.dart"
+
+_DART_RESERVED = {
+    "abstract", "as", "assert", "async", "await", "break", "case", "catch", "class", "const", "continue",
+    "default", "do", "dynamic", "else", "enum", "export", "extends", "external", "factory", "false",
+    "final", "finally", "for", "get", "if", "implements", "import", "in", "is", "library", "new", "null",
+    "operator", "part", "rethrow", "return", "set", "static", "super", "switch", "this", "throw", "true",
+    "try", "typedef", "var", "void", "while", "with", "yield",
+}
+
+def _dart_ident(name: str, taken: Set[str]) -> str:
+    """brand_blue → brandBlue / Text.Title → textTitle（予約語・数字始まり・重複は回避）"""
+    parts = [p for p in re.split(r'[^0-9A-Za-z]+', name) if p]
+    if not parts:
+        parts = ["value"]
+    ident = parts[0][:1].lower() + parts[0][1:] + "".join(p[:1].upper() + p[1:] for p in parts[1:])
+    if ident[0].isdigit() or ident in _DART_RESERVED:
+        ident = "k" + ident[:1].upper() + ident[1:]
+    base, n = ident, 2
+    while ident in taken:
+        ident = f"{base}{n}"
+        n += 1
+    taken.add(ident)
+    return ident
+
+def _ref_name(raw, rtype: str) -> Optional[str]:
+    """'@color/primary' → 'primary'（rtype の参照でなければ None）"""
+    if isinstance(raw, str) and raw.startswith(f"@{rtype}/"):
+        return raw[len(rtype) + 2:]
+    return None
+
+class DesignTokens:
+    """resource name → (Dart 識別子, 値の Dart 式)"""
+    def __init__(self):
+        self.colors: Dict[str, Tuple[str, str]] = {}
+        self.dimens: Dict[str, Tuple[str, str]] = {}
+        self.strings: Dict[str, Tuple[str, str]] = {}
+        self.text_styles: Dict[str, Tuple[str, str]] = {}
+
+    @classmethod
+    def from_resolver(cls, resolver) -> "DesignTokens":
+        tokens = cls()
+        if resolver is None:
+            return tokens
+        taken: Set[str] = set()
+        for name in sorted(resolver.colors):
+            hexv = resolver.android_color_to_flutter(resolver.resolve(f"@color/{name}"))
+            if hexv:
+                tokens.colors[name] = (_dart_ident(name, taken), f"Color({hexv})")
+        taken = set()
+        for name in sorted(resolver.dimens):
+            px = resolver.parse_dimen_to_px(resolver.resolve(f"@dimen/{name}"))
+            if px is not None:
+                tokens.dimens[name] = (_dart_ident(name, taken), f"{px}")
+        # 別名（<color name="primary">@color/brand_blue</color>）は値ではなく元のトークンを指す
+        for rtype, table in (("color", tokens.colors), ("dimen", tokens.dimens)):
+            for name, (ident, _) in list(table.items()):
+                target = table.get(_ref_name(resolver.values.get((rtype, name)), rtype))
+                if target is not None and target[0] != ident:
+                    table[name] = (ident, target[0])
+        taken = set()
+        for name in sorted(resolver.strings):
+            ref = f"@string/{name}"
+            text = resolver.resolve(ref)
+            if isinstance(text, str) and text != ref:
+                tokens.strings[name] = (_dart_ident(name, taken), f'"{escape_dart(text)}"')
+
+        # style の値は tokens.dart 内で AppColors / AppDimens を参照する
+        refs = TokenRefs(tokens)
+        taken = set()
+        for (rtype, name) in sorted(k for k in resolver.values if k[0] == "style"):
+            items = resolver.style_items(name)
+            size_raw = items.get("android:textSize") or items.get("textSize")
+            color_raw = items.get("android:textColor") or items.get("textColor")
+            named = []
+            size = dimen_expr(size_raw, resolver, refs) if size_raw else None
+            color = color_expr(color_raw, resolver, refs) if color_raw else None
+            if size is not None:
+                named.append(f"fontSize: {size}")
+            if color is not None:
+                named.append(f"color: {color if isinstance(color, str) else print_widget(color)}")
+            if named:
+                tokens.text_styles[name] = (_dart_ident(name, taken), f"TextStyle({', '.join(named)})")
+        return tokens
+
+    def is_empty(self) -> bool:
+        return not (self.colors or self.dimens or self.strings or self.text_styles)
+
+    def render(self) -> str:
+        out = ["import 'package:flutter/material.dart';", "", "// ===== Auto-Generated Design Tokens ====="]
+        for cls, dart_type, table in (
+            ("AppColors", "Color", self.colors),
+            ("AppDimens", "double", self.dimens),
+            ("AppStrings", "String", self.strings),
+            ("AppTextStyles", "TextStyle", self.text_styles),
+        ):
+            out.append("")
+            out.append(f"class {cls} {{")
+            out.append(f"  {cls}._();")
+            for ident, expr in table.values():
+                out.append(f"  static const {dart_type} {ident} = {expr};")
+            out.append("}")
+        return "\n".join(out) + "\n"
+
+    def write(self, out_dir: str) -> Optional[str]:
+        """out_dir/tokens.dart を書く（内容が同じなら触らない）。return: 書いたパス or None"""
+        path = os.path.join(out_dir, TOKENS_FILE)
+        code = self.render()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                if f.read() == code:
+                    return None
+        except OSError:
+            pass
+        os.makedirs(out_dir, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(code)
+        log.info(f"Generated design tokens: {path}", tag="DONE")
+        return path
+
+class TokenRefs:
+    """1 画面分のトークン参照。参照したら used を立てる（tokens.dart の import 判定用）"""
+    def __init__(self, tokens: DesignTokens):
+        self.tokens = tokens
+        self.used = False
+
+    def _ref(self, table: Dict[str, Tuple[str, str]], cls: str, raw, rtype: str) -> Optional[str]:
+        entry = table.get(_ref_name(raw, rtype))
+        if entry is None:
+            return None
+        self.used = True
+        return f"{cls}.{entry[0]}"
+
+    def color(self, raw) -> Optional[str]:
+        return self._ref(self.tokens.colors, "AppColors", raw, "color")
+
+    def dimen(self, raw) -> Optional[str]:
+        return self._ref(self.tokens.dimens, "AppDimens", raw, "dimen")
+
+    def string(self, raw) -> Optional[str]:
+        return self._ref(self.tokens.strings, "AppStrings", raw, "string")
+
+    def text_style(self, raw) -> Optional[str]:
+        return self._ref(self.tokens.text_styles, "AppTextStyles", raw, "style")
+
+# =============================================================
+# value expressions（トークンがあれば参照、無ければリテラル）
+# =============================================================
+
+def dimen_expr(raw, resolver, tokens: Optional[TokenRefs] = None) -> Optional[str]:
+    """'@dimen/pad' → 'AppDimens.pad' / '16dp' → '16.0'（解釈できなければ None）"""
+    ref = tokens.dimen(raw) if tokens else None
+    if ref:
+        return ref
+    px = resolver.parse_dimen_to_px(resolver.resolve(raw)) if resolver else None
+    return f"{px}" if px is not None else None
+
+def color_expr(raw, resolver, tokens: Optional[TokenRefs] = None) -> Union[str, Widget, None]:
+    """'@color/primary' → 'AppColors.primary' / '#2196F3' → Color(0xFF2196F3)"""
+    ref = tokens.color(raw) if tokens else None
+    if ref:
+        return ref
+    hexv = resolver.android_color_to_flutter(resolver.resolve(raw)) if resolver else None
+    return Widget("Color", hexv) if hexv else None
@@ -1,5 +1,11 @@
+from typing import Optional
+
+from .. import metrics
 from ..parser.resource_resolver import ResourceResolver
-from ..utils import indent, apply_layout_modifiers, escape_dart
+from ..utils import apply_layout_modifiers, escape_dart
+from .controllers import ControllerRegistry, controller_role
+from .tokens import TokenRefs, color_expr, dimen_expr
+from .widget_ast import Widget, wrap
 
 # --- helpers -------------------------------------------------
 
@@ -40,23 +46,118 @@ def _find_handler(logic_map: dict, xml_id: str):
             return logic_map[k]
     return None
 
-def _text_style(attrs: dict, resolver: ResourceResolver) -> str:
-    size = resolver.parse_dimen_to_px(resolver.resolve(attrs.get("textSize", ""))) or None
-    color_raw = resolver.resolve(attrs.get("textColor", "")) or None
-    color_hex = resolver.android_color_to_flutter(color_raw) if color_raw else None
-    style_parts = []
-    if size is not None:
-        style_parts.append(f"fontSize: {size}")
-    if color_hex:
-        style_parts.append(f"color: Color({color_hex})")
-    return f", style: TextStyle({', '.join(style_parts)})" if style_parts else ""
+def _text_style(attrs, resolver: ResourceResolver, tokens: Optional[TokenRefs] = None) -> dict:
+    """
+    Text の style 引数（無ければ空 dict）。
+    style="@style/Xxx" は AppTextStyles.xxx（トークンが無ければ style の textSize / textColor）を土台にし、
+    textSize / textColor 属性で上書きする。
+    """
+    size_raw = attrs.get("textSize") or ""
+    color_raw = attrs.get("textColor") or ""
+    style_ref = attrs.get("style") or ""
+    base = tokens.text_style(style_ref) if tokens else None
+    if base is None and style_ref.startswith("@style/"):
+        items = resolver.style_items(style_ref.split("/", 1)[1])
+        size_raw = size_raw or items.get("android:textSize") or items.get("textSize") or ""
+        color_raw = color_raw or items.get("android:textColor") or items.get("textColor") or ""
+
+    # 0 は「指定なし」と同じ扱い（従来どおり）
+    size = dimen_expr(size_raw, resolver, tokens) if size_raw else None
+    color = color_expr(color_raw, resolver, tokens) if color_raw else None
+    style = {}
+    if size is not None and size != "0.0":
+        style["fontSize"] = size
+    if color is not None:
+        style["color"] = color
+    if base:
+        return {"style": Widget(f"{base}.copyWith", **style) if style else base}
+    return {"style": Widget("TextStyle", **style)} if style else {}
+
+def _string_expr(raw, resolver: ResourceResolver, tokens: Optional[TokenRefs] = None, default: str = "") -> str:
+    """@string/xxx → AppStrings.xxx、それ以外は解決した文字列のリテラル"""
+    ref = tokens.string(raw) if tokens else None
+    if ref:
+        return ref
+    return f'"{escape_dart(resolver.resolve(raw) or default)}"'
+
+def _text_field(hint_expr: Optional[str], obscure: bool, controller: Optional[str] = None) -> Widget:
+    dec = Widget("InputDecoration", hintText=hint_expr) if hint_expr else "null"
+    field = Widget("TextField", decoration=dec)
+    if controller:
+        field.set_arg("controller", controller, first=True)
+    if obscure:
+        field.set_arg("obscureText", "true")
+    return field
+
+def _bind_controller(controllers: Optional[ControllerRegistry], view_attrs, hint: str, input_type: str):
+    """入力欄の controller を決める。return: (controller 名 or None, 役割がパスワードか)"""
+    if controllers is None:
+        return None, False
+    view_id = _id_base(view_attrs.get("id", ""))
+    # 役割判定は未解決の @string/xxx 名と表示文字列の両方を見る
+    role = controller_role((view_attrs.get("hint") or "") + hint, view_id, input_type)
+    name = controllers.bind(view_id, role)
+    return name, name is not None and role in ("_passwordController", "_confirmPasswordController")
+
+# リスト系ビュー（型名の末尾）→ 既定がグリッドか
+_LIST_VIEWS = {"RecyclerView": False, "ListView": False, "GridView": True}
+
+def _list_view(list_type: str, attrs, resolver: ResourceResolver, sublayouts=None,
+               tokens: Optional[TokenRefs] = None) -> Widget:
+    """
+    RecyclerView / ListView / GridView → ListView.builder / GridView.builder（表示範囲だけを遅延生成）。
+    1 行分のレイアウトは Java のアダプタ（setAdapter(new XxxAdapter) → inflate(R.layout.item_x)）から探し、
+    画面の builder メソッド（_buildItemX）として 1 度だけ変換する。
+    itemCount はデータを持つ画面のフィールド（_rvUsersItems.length）。データの供給元は TODO として残す。
+    """
+    view_id = _id_base(attrs.get("id", ""))
+    adapter = sublayouts.list_adapter(view_id) if sublayouts else None
+    method = None
+    if adapter and adapter.item_layout and not adapter.framework_layout:
+        method = sublayouts.item_builder(adapter.item_layout)
+    if method:
+        builder = f"(context, index) => {method}(context, index)"
+    elif adapter and adapter.framework_layout:
+        # android.R.layout.simple_list_item_1 等は 1 行テキストとして扱う
+        builder = '(context, index) => ListTile(title: Text("Item $index"))'
+    else:
+        builder = "(context, index) => const SizedBox()"
+
+    span = adapter.grid_span if adapter else None
+    if span is None and _LIST_VIEWS[list_type]:
+        cols = attrs.get("numColumns") or ""
+        span = int(cols) if cols.isdigit() else 2
+    named = {}
+    if span is not None:
+        named["gridDelegate"] = Widget("SliverGridDelegateWithFixedCrossAxisCount", crossAxisCount=f"{span}")
+    # 高さが内容依存（wrap_content）なら親のスクロールに合わせて縮める。match_parent / weight は親側で Expanded になる
+    height = (attrs.get("layout_height") or "").lower()
+    if height == "wrap_content":
+        named["shrinkWrap"] = "true"
+    items = sublayouts.list_items(view_id) if sublayouts else None
+    named["itemCount"] = f"{items}.length" if items else "0"
+    named["itemBuilder"] = builder
+    source = adapter.adapter_class if adapter and adapter.adapter_class else "the adapter"
+    body = Widget("GridView.builder" if span is not None else "ListView.builder",
+                  comment=f"TODO: fill {items} from {source}" if items else f"TODO: itemCount from {source}",
+                  **named)
+    if height not in ("", "wrap_content", "match_parent", "fill_parent", "0dp"):
+        h = resolver.parse_dimen_to_px(resolver.resolve(attrs.get("layout_height")))
+        if h:
+            body = wrap(body, "SizedBox", height=f"{h}")
+    return apply_layout_modifiers(body, attrs, resolver, tokens)
 
 # --- main ----------------------------------------------------
 
-def translate_view(node: dict, resolver: ResourceResolver, logic_map=None) -> str:
+def translate_view(node, resolver: ResourceResolver, logic_map=None,
+                   controllers: Optional[ControllerRegistry] = None,
+                   tokens: Optional[TokenRefs] = None, sublayouts=None) -> Widget:
     """
-    単一 View を Flutter ウィジェットへ変換（dict-IR 専用）。
+    単一 View を Flutter ウィジェットへ変換。
     logic_map: {view_id -> handler_name}
+    controllers: 入力欄の controller 割り当て（画面ごと）。None なら controller を付けない
+    tokens: デザイントークンの参照（バッチ実行時）。None なら値をリテラルで書く
+    sublayouts: 画面の SubLayouts（リストの 1 行分レイアウトを builder メソッドとして記録）
     """
     logic_map = (logic_map or {})
     t = (node.get("type") or "")
@@ -69,15 +170,16 @@ def translate_view(node: dict, resolver: ResourceResolver, logic_map=None) -> st
         raw_id = attrs.get("id") or ""
         xml_id = _id_base(raw_id)
         label_raw = attrs.get("text", "")
-        label = resolver.resolve(label_raw) or "Button"
 
         handler_name = _find_handler(logic_map, xml_id) or _fallback_handler_name(xml_id)
-        body = f'ElevatedButton(onPressed: () => {handler_name}(context), child: Text("{escape_dart(label)}"))'
-        return apply_layout_modifiers(body, attrs, resolver)
+        body = Widget("ElevatedButton", onPressed=f"() => {handler_name}(context)",
+                      child=Widget("Text", _string_expr(label_raw, resolver, tokens, default="Button")))
+        return apply_layout_modifiers(body, attrs, resolver, tokens)
 
     # ================== TextInputLayout（親） ==================
     if t.endswith("TextInputLayout") or t == "com.google.android.material.textfield.TextInputLayout":
-        parent_hint = resolver.resolve(attrs.get("hint", "")) or ""
+        hint_raw = attrs.get("hint", "")
+        parent_hint = resolver.resolve(hint_raw) or ""
         child = None
         for ch in children:
             ct = ch.get("type")
@@ -87,55 +189,64 @@ def translate_view(node: dict, resolver: ResourceResolver, logic_map=None) -> st
 
         hint = parent_hint
         obscure = False
+        itype = ""
+        field_attrs = attrs
         if child:
             cattr = child.get("attrs", {}) or {}
-            hint = resolver.resolve(cattr.get("hint", "")) or hint
+            if resolver.resolve(cattr.get("hint", "")):
+                hint_raw = cattr.get("hint")
+                hint = resolver.resolve(hint_raw)
             itype = (cattr.get("inputType") or "").lower()
             if "textpassword" in itype or "password" in (hint or "").lower():
                 obscure = True
+            if cattr.get("id"):
+                field_attrs = cattr
 
-        dec = f'InputDecoration(hintText: "{escape_dart(hint)}")' if hint else "null"
-        body = f'TextField(decoration: {dec}{", obscureText: true" if obscure else ""})'
-        return apply_layout_modifiers(body, attrs, resolver)
+        controller, secret = _bind_controller(controllers, field_attrs, hint, itype)
+        hint_expr = _string_expr(hint_raw, resolver, tokens) if hint else None
+        return apply_layout_modifiers(_text_field(hint_expr, obscure or secret, controller), attrs, resolver, tokens)
 
     # ================== TextView ==================
     if t == "TextView":
         xml_id = _id_base(attrs.get("id", ""))
         handler_name = _find_handler(logic_map, xml_id)
 
-        text = resolver.resolve(attrs.get("text", "")) or ""
-        body = f'Text("{escape_dart(text)}"{_text_style(attrs, resolver)})'
+        body = Widget("Text", _string_expr(attrs.get("text", ""), resolver, tokens),
+                      **_text_style(attrs, resolver, tokens))
 
         # XML の android:onClick を拾ってフォールバック名へ接続
         xml_onclick = attrs.get("onClick") or attrs.get("android:onClick")
         if handler_name:
-            body = f'InkWell(onTap: () => {handler_name}(context), child: {body})'
+            body = wrap(body, "InkWell", onTap=f"() => {handler_name}(context)")
         elif xml_onclick:
-            camel = _to_camel(xml_id)
-            fallback = f"_on{camel[:1].upper()}{camel[1:]}Pressed" if camel else "_onUnknownPressed"
-            body = f'InkWell(onTap: () => {fallback}(context), child: {body})'
+            # Button と同じ既定名（item / include 先では画面側がこの名前で転送・スタブを用意する）
+            body = wrap(body, "InkWell", onTap=f"() => {_fallback_handler_name(xml_id)}(context)")
         elif (attrs.get("clickable", "") or "").lower() == "true":
             # clickable=true だが Java 側で検出できなかった場合は見た目だけボタン化（論理は null）
-            body = f'TextButton(onPressed: null, child: {body})'
+            body = wrap(body, "TextButton", onPressed="null")
 
-        return apply_layout_modifiers(body, attrs, resolver)
+        return apply_layout_modifiers(body, attrs, resolver, tokens)
 
     # ================== EditText / TextInputEditText ==================
     if t in ("EditText", "AppCompatEditText", "TextInputEditText", "com.google.android.material.textfield.TextInputEditText"):
         hint = resolver.resolve(attrs.get("hint", "")) or ""
         input_type = (attrs.get("inputType") or "").lower()
         obscure = ("textpassword" in input_type) or ("password" in hint.lower())
-        dec = f'InputDecoration(hintText: "{escape_dart(hint)}")' if hint else "null"
-        parts = [f"decoration: {dec}"]
-        if obscure:
-            parts.append("obscureText: true")
-        body = f"TextField({', '.join(parts)})"
-        return apply_layout_modifiers(body, attrs, resolver)
+        controller, secret = _bind_controller(controllers, attrs, hint, input_type)
+        hint_expr = _string_expr(attrs.get("hint", ""), resolver, tokens) if hint else None
+        return apply_layout_modifiers(_text_field(hint_expr, obscure or secret, controller), attrs, resolver, tokens)
+
+    # ================== RecyclerView / ListView / GridView ==================
+    list_type = t.rsplit(".", 1)[-1]
+    if list_type in _LIST_VIEWS:
+        return _list_view(list_type, attrs, resolver, sublayouts, tokens)
 
     # ================== ImageView（簡易） ==================
     if t.endswith("ImageView"):
         # 画像リソースは省略（TODO）
-        return apply_layout_modifiers("/* TODO: translate ImageView */ SizedBox()", attrs, resolver)
+        metrics.count(metrics.FALLBACK_VIEWS, t)
+        return apply_layout_modifiers(Widget("SizedBox", comment="TODO: translate ImageView"), attrs, resolver, tokens)
 
     # ================== fallback ==================
-    return apply_layout_modifiers(f"/* TODO: translate {t} */ SizedBox()", attrs, resolver)
+    metrics.count(metrics.FALLBACK_VIEWS, t)
+    return apply_layout_modifiers(Widget("SizedBox", comment=f"TODO: translate {t}"), attrs, resolver, tokens)
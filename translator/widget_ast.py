@@ -0,0 +1,207 @@
+# android2flutter/translator/widget_ast.py
+"""
+Dart ウィジェットの軽量 AST と整形プリンタ。
+
+Widget = コンストラクタ呼び出し 1 つ（Text / Padding / EdgeInsets.all / InputDecoration ...）
+  name    : "Padding" / "EdgeInsets.only" など
+  args    : 位置引数（Dart 式の文字列 or Widget）
+  named   : 名前付き引数（挿入順を保つ）。値は Dart 式の文字列 / Widget / Widget の list
+  const   : 先頭に const を付ける
+  comment : 直前に付ける /* ... */（未対応ビューの TODO 等）
+  multiline: 名前付き引数を 1 行ずつ（末尾カンマ付き）で書く（Scaffold 等）
+
+変換ルールはこの木を返し、スクロール判定・Expanded の有無・コントローラ結線などは
+生成した Dart テキストを正規表現で読み直さずに木を引いて行う。文字列化は print_widget の 1 回だけ。
+"""
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from .emitter import DartEmitter
+
+class Widget:
+    __slots__ = ("name", "args", "named", "const", "comment", "multiline")
+
+    def __init__(self, name: str, *args, const: bool = False, comment: Optional[str] = None,
+                 multiline: bool = False, **named):
+        self.name = name
+        self.args: List[Union[str, "Widget"]] = list(args)
+        self.named: Dict[str, Union[str, "Widget", List["Widget"]]] = named
+        self.const = const
+        self.comment = comment
+        self.multiline = multiline
+
+    # ---------------------------------------------------------
+    # tree queries
+    # ---------------------------------------------------------
+    def sub_widgets(self) -> Iterator["Widget"]:
+        """直下の Widget（位置引数・名前付き引数・children の要素）"""
+        for v in self.args:
+            if isinstance(v, Widget):
+                yield v
+        for v in self.named.values():
+            if isinstance(v, Widget):
+                yield v
+            elif isinstance(v, list):
+                yield from v
+
+    def walk(self) -> Iterator["Widget"]:
+        """前順で全ノード（再帰しない）"""
+        stack = [self]
+        while stack:
+            w = stack.pop()
+            yield w
+            stack.extend(reversed(list(w.sub_widgets())))
+
+    def find(self, pred: Callable[["Widget"], bool]) -> Optional["Widget"]:
+        for w in self.walk():
+            if pred(w):
+                return w
+        return None
+
+    def any(self, pred: Callable[["Widget"], bool]) -> bool:
+        return self.find(pred) is not None
+
+    # ---------------------------------------------------------
+    # editing
+    # ---------------------------------------------------------
+    def set_arg(self, key: str, value, first: bool = False) -> "Widget":
+        if first and key not in self.named:
+            self.named = {key: value, **self.named}
+        else:
+            self.named[key] = value
+        return self
+
+    def __repr__(self) -> str:
+        return f"Widget({self.name!r}, args={len(self.args)}, named={list(self.named)})"
+
+def wrap(child: Widget, name: str, **named) -> Widget:
+    """name(**named, child: child)"""
+    named["child"] = child
+    return Widget(name, **named)
+
+# =============================================================
+# const
+# =============================================================
+
+# const コンストラクタを持つもの（引数がすべて定数なら const にできる）
+CONST_CONSTRUCTORS = frozenset({
+    "Text", "SizedBox", "Padding", "Center", "Align", "Expanded", "Flexible", "Spacer", "Divider",
+    "Column", "Row", "Stack", "Wrap", "ConstrainedBox", "SingleChildScrollView", "Icon", "Placeholder",
+    "TextField", "TextButton", "ElevatedButton", "InkWell", "InputDecoration",
+    "Color", "TextStyle", "BoxConstraints",
+    "EdgeInsets.all", "EdgeInsets.only", "EdgeInsets.symmetric", "EdgeInsets.fromLTRB",
+})
+
+# 定数式として扱う引数: 数値 / 16 進 / true・false・null / double.infinity /
+# Enum.value・AppColors.x（static const）/ 補間を含まない文字列リテラル
+_CONST_EXPR_RE = re.compile(
+    r'^(?:-?\d+(?:\.\d+)?|0x[0-9A-Fa-f]+|true|false|null|double\.infinity|[A-Z]\w*\.\w+'
+    r'|"(?:[^"\\$]|\\.)*"' r"|'(?:[^'\\$]|\\.)*')$"
+)
+
+def _is_const_value(value, is_const: Dict[int, bool]) -> bool:
+    if isinstance(value, Widget):
+        return is_const[id(value)]
+    if isinstance(value, list):
+        return all(_is_const_value(v, is_const) for v in value)
+    return bool(_CONST_EXPR_RE.match(value))
+
+def mark_const(root: Widget, const_classes: Iterable[str] = ()) -> Widget:
+    """
+    定数の部分木を下から求め、極大な部分木の根にだけ const を付ける
+    （const の内側は暗黙に const なので重ねて書かない）。
+    controller・ハンドラ（クロージャ）・copyWith などを含む部分木は const にならない。
+    const_classes: 生成した const コンストラクタを持つクラス（shared_widgets.dart の SharedXxx 等）
+    """
+    const_names = CONST_CONSTRUCTORS | frozenset(const_classes)
+    is_const: Dict[int, bool] = {}
+    for w in reversed(list(root.walk())):  # 前順の逆 = 子が親より先
+        is_const[id(w)] = w.name in const_names and all(
+            _is_const_value(v, is_const) for v in (*w.args, *w.named.values())
+        )
+    stack = [(root, False)]
+    while stack:
+        w, in_const = stack.pop()
+        c = is_const[id(w)]
+        w.const = c and not in_const
+        for sub in w.sub_widgets():
+            stack.append((sub, in_const or c))
+    return root
+
+# =============================================================
+# printer
+# =============================================================
+
+# 命令: 書き出しは再帰せず、命令のスタックを後ろから実行する（深いレイアウトでも再帰上限に当たらない）
+_TEXT, _NEWLINE, _INDENT, _DEDENT, _VALUE = range(5)
+
+def _widget_ops(w: Widget) -> list:
+    """name(args..., key: value...) を書く命令列（実行順）"""
+    ops = []
+    if w.comment:
+        ops.append((_TEXT, f"/* {w.comment} */ "))
+    ops.append((_TEXT, f"const {w.name}(" if w.const else f"{w.name}("))
+    if w.multiline:
+        ops.append((_INDENT, None))
+        for v in w.args:
+            ops += [(_NEWLINE, None), (_VALUE, v), (_TEXT, ",")]
+        for k, v in w.named.items():
+            ops += [(_NEWLINE, None), (_TEXT, f"{k}: "), (_VALUE, v), (_TEXT, ",")]
+        ops += [(_DEDENT, None), (_NEWLINE, None), (_TEXT, ")")]
+        return ops
+    first = True
+    for v in w.args:
+        if not first:
+            ops.append((_TEXT, ", "))
+        ops.append((_VALUE, v))
+        first = False
+    for k, v in w.named.items():
+        if not first:
+            ops.append((_TEXT, ", "))
+        ops += [(_TEXT, f"{k}: "), (_VALUE, v)]
+        first = False
+    ops.append((_TEXT, ")"))
+    return ops
+
+def _list_ops(items: list) -> list:
+    """[ の後に要素を 1 段深い行に書いて ] で閉じる（DartEmitter.children と同じ形）"""
+    ops = [(_TEXT, "["), (_INDENT, None)]
+    for i, v in enumerate(items):
+        if i:
+            ops.append((_TEXT, ","))
+        ops += [(_NEWLINE, None), (_VALUE, v)]
+    ops.append((_DEDENT, None))
+    if items:
+        ops.append((_NEWLINE, None))
+    ops.append((_TEXT, "]"))
+    return ops
+
+def _emit_value(em: DartEmitter, value) -> None:
+    stack = [(_VALUE, value)]
+    while stack:
+        op, arg = stack.pop()
+        if op == _TEXT:
+            em.write(arg)
+        elif op == _NEWLINE:
+            em.newline()
+        elif op == _INDENT:
+            em.indent()
+        elif op == _DEDENT:
+            em.dedent()
+        elif isinstance(arg, Widget):
+            stack.extend(reversed(_widget_ops(arg)))
+        elif isinstance(arg, list):
+            stack.extend(reversed(_list_ops(arg)))
+        else:
+            em.write(arg)
+
+def print_widget(w: Widget, level: int = 0) -> str:
+    em = DartEmitter(level)
+    _emit_value(em, w)
+    return em.getvalue()
+
+def print_widget_list(ws: List[Widget], level: int = 0) -> str:
+    """[w1, w2, ...]（<merge> レイアウトの builder が返す list）"""
+    em = DartEmitter(level)
+    _emit_value(em, list(ws))
+    return em.getvalue()
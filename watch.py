@@ -0,0 +1,284 @@
+# android2flutter/watch.py
+"""
+--watch モード。
+
+プロジェクト（values / Java ソース / 各レイアウトの IR）をメモリに保持したまま
+res/layout, res/values, Java ルートをポーリングし、変更の影響を受ける画面だけを再生成する。
+標準ライブラリのみ（os.stat ポーリング）で動く。
+"""
+import os
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from . import log
+from .batch import discover_layouts, layout_name_of, plan_screens, screen_class_files
+from .parser.ir import IRNode, iter_nodes
+from .parser.java_index import JavaIndex
+from .parser.resource_resolver import ResourceResolver
+from .parser.resource_table import discover_values_dirs
+from .parser.xml_parser import parse_layout_xml
+from .translator.generator import _gather_java_files, render_screen
+from .translator.shared_widgets import MIN_NODES, SHARED_FILE, SharedWidgets
+from .translator.sublayouts import LayoutLibrary
+from .translator.tokens import DesignTokens
+
+Snapshot = Dict[str, Tuple[int, int]]
+
+def _snapshot_dir(root: Optional[str], suffix: str, recursive: bool) -> Snapshot:
+    snap: Snapshot = {}
+    if not root or not os.path.exists(root):
+        return snap
+    if os.path.isfile(root):
+        st = os.stat(root)
+        return {root: (st.st_mtime_ns, st.st_size)}
+    walker = os.walk(root) if recursive else [(root, [], os.listdir(root))]
+    for base, dirs, files in walker:
+        dirs.sort()  # _gather_java_files と同じ順序
+        for fn in sorted(files):
+            if fn.endswith(suffix):
+                p = os.path.join(base, fn)
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                snap[p] = (st.st_mtime_ns, st.st_size)
+    return snap
+
+def _diff(old: Snapshot, new: Snapshot) -> Set[str]:
+    return {p for p in old.keys() | new.keys() if old.get(p) != new.get(p)}
+
+def _resource_refs(ir: IRNode) -> Set[str]:
+    """IR 中の @type/name・?attr/ 参照を集める（values 変更の影響判定用）"""
+    refs: Set[str] = set()
+    for n in iter_nodes(ir):
+        for v in n.attrs.values():
+            if v.startswith(("@", "?")) and not v.startswith(("@+id/", "@id/")):
+                refs.add(v)
+    return refs
+
+class ProjectWatcher:
+    def __init__(self, res_dir: str, out_dir: str, java_root: Optional[str] = None,
+                 values_dir: Optional[str] = None, class_prefix: str = "Converted",
+                 interval: float = 0.1, res_config: Tuple[str, ...] = (), share_min_nodes: int = MIN_NODES):
+        self.res_dir = res_dir
+        self.layout_dir = os.path.join(res_dir, "layout")
+        self.values_dir = values_dir or os.path.join(res_dir, "values")
+        self.java_root = java_root
+        self.out_dir = out_dir
+        self.class_prefix = class_prefix
+        self.interval = interval
+        self.res_config = res_config
+        self.share_min_nodes = share_min_nodes
+
+        self.resolver: Optional[ResourceResolver] = None
+        self.tokens: Optional[DesignTokens] = None
+        # shared_widgets.dart（バッチと同じく、レイアウト / values が変わったら走査し直す）
+        self.shared: Optional[SharedWidgets] = None
+        self._shared_memo: Dict[str, Dict] = {}  # 部分木の走査結果（変わっていない XML は読み直さない）
+        # item レイアウト等の変換済みキャッシュ（values / Java / layout が変わったら作り直す）
+        self.layouts: Optional[LayoutLibrary] = None
+        # xml_path -> その画面が使った他のレイアウト XML
+        self.deps: Dict[str, List[str]] = {}
+        self.java_files: Dict[str, str] = {}
+        self.java_index: Optional[JavaIndex] = None
+        # xml_path -> (output_path, class_name, ir, resource_refs)
+        self.screens: Dict[str, Tuple[str, str, IRNode, Set[str]]] = {}
+        # 画面クラス → Dart ファイル（遷移先 import 用。レイアウトの増減時だけ作り直す）
+        self.class_files: Dict[str, str] = {}
+        self._snaps: Dict[str, Snapshot] = {}
+
+    # ---------------------------------------------------------
+    # state loading
+    # ---------------------------------------------------------
+    def _scan(self) -> Dict[str, Snapshot]:
+        return {
+            "layout": _snapshot_dir(self.layout_dir, ".xml", recursive=False),
+            "values": {p: st for (_, d) in discover_values_dirs(self.values_dir)
+                       for p, st in _snapshot_dir(d, ".xml", recursive=False).items()},
+            "java": _snapshot_dir(self.java_root, ".java", recursive=True),
+        }
+
+    def _load_resolver(self) -> None:
+        self.resolver = ResourceResolver(self.values_dir if os.path.isdir(self.values_dir) else None,
+                                         config=self.res_config)
+        self.tokens = DesignTokens.from_resolver(self.resolver)
+        self.tokens.write(self.out_dir)
+
+    def _load_shared(self) -> bool:
+        """部分木を走査し直して shared_widgets.dart を書く。return: 共有する部分木の集合が変わったか"""
+        before = self.shared.fingerprint() if self.shared is not None else None
+        self.shared = None
+        if self.share_min_nodes > 0:
+            if SHARED_FILE in self.class_files.values():
+                log.warn(f"A screen is generated as {SHARED_FILE}; shared widgets are not used")
+            else:
+                self.shared = SharedWidgets.scan(discover_layouts(self.res_dir), self.resolver,
+                                                 min_nodes=self.share_min_nodes, memo=self._shared_memo)
+                if self.shared.names:
+                    self.shared.write(self.out_dir, self.tokens)
+        return (self.shared.fingerprint() if self.shared is not None else None) != before
+
+    def _reset_layouts(self) -> None:
+        self.layouts = LayoutLibrary(self.layout_dir, self.resolver, self.tokens, self.java_index, self.shared)
+
+    def _load_java(self) -> None:
+        self.java_files = dict(_gather_java_files(self.java_root)) if self.java_root and os.path.exists(self.java_root) else {}
+        self._reindex_java()
+
+    def _reindex_java(self) -> None:
+        # 走査順は _gather_java_files と同じ（スナップショットの挿入順）
+        order = list(self._snaps.get("java", {})) or sorted(self.java_files)
+        paths = [p for p in order if p in self.java_files]
+        self.java_index = JavaIndex.build([self.java_files[p] for p in paths], paths)
+
+    def _java_sources(self) -> Optional[List[str]]:
+        if not (self.java_root and os.path.exists(self.java_root)):
+            return None
+        return self.java_index.sources
+
+    def _related_paths(self) -> Dict[str, Optional[Set[str]]]:
+        """xml_path -> 画面が解析する Java ファイル（None = 全ファイル）"""
+        out: Dict[str, Optional[Set[str]]] = {}
+        for xml_path in self.screens:
+            related = self.java_index.related_sources(layout_name_of(xml_path)) if self.java_index else None
+            out[xml_path] = None if related is None else {self.java_index.paths[i] for i in related}
+        return out
+
+    def _parse_screen(self, xml_path: str, out_path: str, cls: str) -> None:
+        ir, _ = parse_layout_xml(xml_path, resolver=self.resolver)
+        self.screens[xml_path] = (out_path, cls, ir, _resource_refs(ir))
+
+    def _render(self, xml_paths: List[str]) -> None:
+        java_sources = self._java_sources()
+        for xml_path in sorted(xml_paths):
+            out_path, cls, ir, _ = self.screens[xml_path]
+            try:
+                self.deps[xml_path] = render_screen(
+                    ir=ir,
+                    resolver=self.resolver,
+                    logic_map={},
+                    java_path=self.java_root,
+                    output_path=out_path,
+                    class_name=cls,
+                    java_sources=java_sources,
+                    java_index=self.java_index,
+                    layout_name=layout_name_of(xml_path),
+                    class_files=self.class_files,
+                    tokens=self.tokens,
+                    layouts=self.layouts,
+                    shared=self.shared,
+                )
+            except Exception as e:
+                log.error(f"{xml_path}: {e}")
+
+    def build_all(self) -> None:
+        self._snaps = self._scan()
+        self._load_resolver()
+        self._load_java()
+        self.screens.clear()
+        plan = plan_screens(self.res_dir, self.out_dir, self.class_prefix)
+        self.class_files = screen_class_files(plan)
+        self._load_shared()
+        self._reset_layouts()
+        for (xml_path, out_path, cls) in plan:
+            try:
+                self._parse_screen(xml_path, out_path, cls)
+            except Exception as e:
+                log.error(f"Failed to parse XML {xml_path}: {e}")
+        self._render(list(self.screens))
+
+    # ---------------------------------------------------------
+    # change handling
+    # ---------------------------------------------------------
+    def poll_once(self) -> Set[str]:
+        """1 回分の変更検出と再生成。return: 再生成した xml_path 集合"""
+        new = self._scan()
+        changed = {kind: _diff(self._snaps.get(kind, {}), snap) for kind, snap in new.items()}
+        self._snaps = new
+        if not any(changed.values()):
+            return set()
+
+        affected: Set[str] = set()
+
+        # values: 各画面が参照しているリソースの解決結果が変わったものだけ
+        if changed["values"]:
+            old_resolver = self.resolver
+            self._load_resolver()
+            for xml_path, (_, _, _, refs) in self.screens.items():
+                # item レイアウト側の参照までは追わず、使っている画面はまとめて対象にする
+                if self.deps.get(xml_path) or any(old_resolver.resolve(r) != self.resolver.resolve(r) for r in refs):
+                    affected.add(xml_path)
+
+        # Java: 変更ファイルを解析対象に含む画面だけ（対応不明の画面は全 Java を見るので常に対象）
+        if changed["java"]:
+            before = self._related_paths()
+            for p in changed["java"]:
+                if p in new["java"]:
+                    try:
+                        with open(p, "r", encoding="utf-8") as f:
+                            self.java_files[p] = f.read()
+                    except Exception:
+                        self.java_files.pop(p, None)
+                else:
+                    self.java_files.pop(p, None)
+            self._reindex_java()
+            after = self._related_paths()
+            for xml_path in self.screens:
+                old_rel, new_rel = before.get(xml_path), after.get(xml_path)
+                if old_rel is None or new_rel is None or old_rel != new_rel or (new_rel & changed["java"]):
+                    affected.add(xml_path)
+
+        # layout: 変更・追加された XML だけ再パース
+        if changed["layout"]:
+            plan = plan_screens(self.res_dir, self.out_dir, self.class_prefix)
+            planned = {x: (o, c) for (x, o, c) in plan}
+            class_files = screen_class_files(plan)
+            if class_files != self.class_files:
+                # 画面の追加・削除: 遷移先 import が変わりうるので全画面を対象にする
+                self.class_files = class_files
+                affected |= set(self.screens)
+            for xml_path in changed["layout"]:
+                if xml_path not in planned:
+                    if self.screens.pop(xml_path, None):
+                        log.info(f"layout removed: {xml_path}", tag="WATCH")
+                    affected.discard(xml_path)
+                    continue
+                try:
+                    self._parse_screen(xml_path, *planned[xml_path])
+                    affected.add(xml_path)
+                except Exception as e:
+                    # 保存途中の壊れた XML 等。次の変更で再試行する
+                    log.error(f"Failed to parse XML {xml_path}: {e}")
+                    affected.discard(xml_path)
+
+        # item / include 先のレイアウト: それを使っている画面も作り直す
+        if changed["layout"]:
+            for xml_path, deps in self.deps.items():
+                if changed["layout"] & set(deps):
+                    affected.add(xml_path)
+
+        # 共有する部分木: 集合が変わったら置き換え先が変わりうるので全画面を対象にする
+        if (changed["layout"] or changed["values"]) and self._load_shared():
+            affected |= set(self.screens)
+        self._reset_layouts()
+
+        affected &= set(self.screens)
+        if affected:
+            self._render(list(affected))
+        return affected
+
+    def run(self) -> None:
+        started = time.perf_counter()
+        self.build_all()
+        log.info(f"{len(self.screens)} screens ready in {time.perf_counter() - started:.2f}s; "
+                 f"watching for changes (Ctrl+C to stop)", tag="WATCH")
+        try:
+            while True:
+                time.sleep(self.interval)
+                t0 = time.perf_counter()
+                done = self.poll_once()
+                if done:
+                    ms = (time.perf_counter() - t0) * 1000
+                    log.info(f"regenerated {len(done)} screen(s) in {ms:.0f} ms", tag="WATCH")
+        except KeyboardInterrupt:
+            log.info("stopped", tag="WATCH")